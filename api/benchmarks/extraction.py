@@ -0,0 +1,54 @@
+"""Benchmark PDF extraction throughput: serial vs. process-pool sharding.
+
+Usage:
+    python benchmarks/extraction.py [--pdf PATH] [--workers 2 4 8] [--repeat 3]
+"""
+
+import argparse
+import json
+import os
+import sys
+import time
+
+# Add project root to path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+
+def _time_extraction(pdf_path: str, workers: int, repeat: int) -> dict:
+    from src.rag.ingest import extract_pages_with_tables
+
+    best = float("inf")
+    documents = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        documents = extract_pages_with_tables(pdf_path, workers=workers)
+        best = min(best, time.perf_counter() - start)
+    return {"workers": workers, "seconds": round(best, 3), "documents": len(documents)}
+
+
+def main() -> None:
+    from src.rag.ingest import page_count
+
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--pdf", default=os.path.join("data", "manual-politicas-viagem-blis.pdf"))
+    parser.add_argument("--workers", type=int, nargs="+", default=[2, 4, os.cpu_count() or 1])
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    pages = page_count(args.pdf)
+    runs = [_time_extraction(args.pdf, 1, args.repeat)]
+    runs += [_time_extraction(args.pdf, w, args.repeat) for w in sorted(set(args.workers)) if w > 1]
+
+    serial = runs[0]["seconds"]
+    print(f"{args.pdf}: {pages} pages (best of {args.repeat})")
+    for run in runs:
+        run["pages_per_sec"] = round(pages / run["seconds"], 1) if run["seconds"] else None
+        run["speedup"] = round(serial / run["seconds"], 2) if run["seconds"] else None
+        label = "serial" if run["workers"] == 1 else f"{run['workers']} workers"
+        print(f"  {label:>10}: {run['seconds']:.3f}s  {run['pages_per_sec']} pages/s  "
+              f"x{run['speedup']}")
+    print(json.dumps({"pdf": args.pdf, "pages": pages, "runs": runs}))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,97 @@
+"""Deterministic local stand-ins for OpenAI used by the load-test harness.
+
+``FakeChatModel`` answers with a fixed latency to the first token and a fixed
+token rate, and routes intents by hashing the question. ``HashEmbeddings`` derives
+each vector from a hash of the text. Neither does any network I/O, so runs are
+free and repeatable.
+"""
+
+import asyncio
+import hashlib
+import time
+import zlib
+from collections.abc import AsyncIterator, Iterator
+
+import numpy as np
+from langchain_core.embeddings import Embeddings
+from langchain_core.language_models import BaseChatModel
+from langchain_core.messages import AIMessage, AIMessageChunk, BaseMessage
+from langchain_core.outputs import ChatGeneration, ChatGenerationChunk, ChatResult
+
+from src.rag.prompts import CLASSIFY_INTENT_SYSTEM
+
+ROUTES = ("FAQ", "SEARCH", "BOTH")
+
+
+class FakeChatModel(BaseChatModel):
+    """Chat model with configurable time-to-first-token and tokens/sec."""
+
+    first_token_latency: float = 0.3
+    tokens_per_second: float = 60.0
+    reply_tokens: int = 80
+
+    @property
+    def _llm_type(self) -> str:
+        return "fake-benchmark"
+
+    def _tokens(self, messages: list[BaseMessage]) -> list[str]:
+        query = str(messages[-1].content)
+        if messages[0].content == CLASSIFY_INTENT_SYSTEM:
+            return [ROUTES[zlib.crc32(query.encode("utf-8")) % len(ROUTES)]]
+        seed = zlib.crc32(query.encode("utf-8"))
+        return [f"palavra{(seed + i) % 997} " for i in range(self.reply_tokens)]
+
+    def _delays(self, count: int) -> Iterator[float]:
+        yield self.first_token_latency
+        for _ in range(count - 1):
+            yield 1.0 / self.tokens_per_second
+
+    def _generate(self, messages, stop=None, run_manager=None, **kwargs) -> ChatResult:
+        tokens = self._tokens(messages)
+        time.sleep(sum(self._delays(len(tokens))))
+        return ChatResult(generations=[ChatGeneration(message=AIMessage(content="".join(tokens)))])
+
+    async def _agenerate(self, messages, stop=None, run_manager=None, **kwargs) -> ChatResult:
+        tokens = self._tokens(messages)
+        await asyncio.sleep(sum(self._delays(len(tokens))))
+        return ChatResult(generations=[ChatGeneration(message=AIMessage(content="".join(tokens)))])
+
+    async def _astream(
+        self, messages, stop=None, run_manager=None, **kwargs
+    ) -> AsyncIterator[ChatGenerationChunk]:
+        tokens = self._tokens(messages)
+        for token, delay in zip(tokens, self._delays(len(tokens))):
+            await asyncio.sleep(delay)
+            chunk = ChatGenerationChunk(message=AIMessageChunk(content=token))
+            if run_manager is not None:
+                await run_manager.on_llm_new_token(token, chunk=chunk)
+            yield chunk
+
+
+class HashEmbeddings(Embeddings):
+    """Unit vectors seeded by a SHA-256 of the text, with an optional per-call latency."""
+
+    def __init__(self, size: int = 256, latency: float = 0.0) -> None:
+        self.size = size
+        self.latency = latency
+
+    def _vector(self, text: str) -> list[float]:
+        seed = int.from_bytes(hashlib.sha256(text.encode("utf-8")).digest()[:8], "little")
+        vector = np.random.default_rng(seed).normal(size=self.size).astype(np.float32)
+        return (vector / np.linalg.norm(vector)).tolist()
+
+    def embed_documents(self, texts: list[str]) -> list[list[float]]:
+        return [self._vector(text) for text in texts]
+
+    def embed_query(self, text: str) -> list[float]:
+        return self._vector(text)
+
+    async def aembed_documents(self, texts: list[str]) -> list[list[float]]:
+        if self.latency:
+            await asyncio.sleep(self.latency)
+        return self.embed_documents(texts)
+
+    async def aembed_query(self, text: str) -> list[float]:
+        if self.latency:
+            await asyncio.sleep(self.latency)
+        return self._vector(text)
@@ -0,0 +1,320 @@
+"""Offline load test of POST /api/v1/chat or GET /api/v1/chat/stream.
+
+Boots the real app and ``build_graph`` with local fakes in place of OpenAI and
+Tavily: ``FakeChatModel`` (fixed time-to-first-token and tokens/sec),
+``HashEmbeddings`` and the stub search backend. The index is built from the policy
+PDF with the fake embeddings, so retrieval, BM25, the caches, the checkpointer
+and the SSE path all run as in production. Concurrent sessions each send
+``--turns`` questions in a row. The run reports RPS, p50/p95/p99 latency,
+time-to-first-token (stream), mean time per graph node and memory, and writes them
+to a JSON file tagged with the current commit. Pass ``--compare`` with an earlier
+result to print the deltas.
+
+Usage:
+    python benchmarks/load_test.py [--endpoint chat|stream] [--sessions 20] [--turns 5]
+        [--llm-latency 0.3] [--tokens-per-second 60] [--search-latency 0.2]
+        [--llm-concurrency 32]
+        [--output FILE] [--compare FILE]
+"""
+
+import argparse
+import asyncio
+import json
+import logging
+import os
+import resource
+import subprocess
+import sys
+import time
+from datetime import UTC, datetime
+
+import numpy as np
+import structlog
+
+# Add project root to path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+os.environ.setdefault("OPENAI_API_KEY", "offline-benchmark")
+os.environ.setdefault("TAVILY_API_KEY", "offline-benchmark")
+
+QUESTIONS = [
+    "Qual o limite de bagagem de mão?",
+    "Como funciona o check-in online?",
+    "Posso levar meu cachorro na cabine?",
+    "Quais documentos preciso para viajar para a Europa?",
+    "Qual a política de cancelamento e reembolso?",
+    "Quanto está a passagem de São Paulo para Lisboa em março?",
+    "Tem promoção de voos para Buenos Aires?",
+    "Quero levar meu gato para Portugal, quanto custa e o que preciso?",
+    "Como despachar bagagem extra e qual o preço hoje?",
+    "Qual a franquia de bagagem para voos internacionais?",
+]
+
+SUMMARY_KEYS = ("rps", "latency_p50_ms", "latency_p95_ms", "latency_p99_ms", "ttft_p50_ms")
+
+
+def _percentiles(values: list[float]) -> dict[str, float]:
+    if not values:
+        return {}
+    ms = np.asarray(values) * 1000
+    return {
+        "p50": round(float(np.percentile(ms, 50)), 2),
+        "p95": round(float(np.percentile(ms, 95)), 2),
+        "p99": round(float(np.percentile(ms, 99)), 2),
+        "mean": round(float(ms.mean()), 2),
+    }
+
+
+def _peak_rss_mb() -> float:
+    # ru_maxrss is in KiB on Linux
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def _commit() -> str:
+    try:
+        return subprocess.check_output(
+            ["git", "rev-parse", "--short", "HEAD"], text=True, stderr=subprocess.DEVNULL
+        ).strip()
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+
+
+def _build_app(args):
+    """The FastAPI app with its state wired to the fakes, as the lifespan would."""
+    from fakes import FakeChatModel, HashEmbeddings
+    from langchain_community.vectorstores import FAISS
+    from langgraph.checkpoint.memory import MemorySaver
+
+    from src.agents.history import HistorySummarizer
+    from src.agents.orchestrator import build_graph, create_chat_model
+    from src.config import Settings
+    from src.core.admission import configure_admission
+    from src.core.checkpointer import strip_transient_fields
+    from src.core.metrics import instrument_checkpointer
+    from src.main import create_app
+    from src.rag.bm25 import BM25Index
+    from src.rag.index_holder import VectorStoreHolder
+    from src.rag.ingest import chunk_for_index, extract_pages_with_tables
+    from src.rag.sections import ParentStore
+
+    settings = Settings(
+        _env_file=None,
+        search_backend="stub",
+        search_stub_latency_seconds=args.search_latency,
+        answer_cache_backend="memory" if args.answer_cache else "none",
+        index_watch_interval_seconds=0,
+        llm_max_concurrency=args.llm_concurrency,
+    )
+    configure_admission(settings)
+
+    documents = extract_pages_with_tables(args.pdf, workers=settings.ingest_workers)
+    chunks, parents = chunk_for_index(documents, settings)
+    embeddings = HashEmbeddings(latency=args.embedding_latency)
+    vectorstore = FAISS.from_documents(chunks, embeddings)
+    holder = VectorStoreHolder()
+    holder.attach(
+        vectorstore,
+        "benchmark",
+        BM25Index.build([c.page_content for c in chunks]),
+        parents=ParentStore.build(parents) if parents is not None else None,
+    )
+
+    llm = FakeChatModel(
+        first_token_latency=args.llm_latency,
+        tokens_per_second=args.tokens_per_second,
+        reply_tokens=args.reply_tokens,
+    )
+    checkpointer = instrument_checkpointer(strip_transient_fields(MemorySaver()))
+
+    app = create_app()
+    app.state.settings = settings
+    app.state.vectorstore_holder = holder
+    app.state.ingestion = None
+    app.state.checkpointer = checkpointer
+    app.state.graph = build_graph(settings, holder, checkpointer, llm=llm)
+    app.state.history_summarizer = HistorySummarizer(
+        app.state.graph, create_chat_model(settings, llm, disable_streaming=True), settings
+    )
+    # No rate limiter: every simulated session shares one client address
+    app.state.rate_limiter = None
+    return app, len(chunks)
+
+
+async def _chat(client, session_id: str, message: str) -> dict:
+    start = time.perf_counter()
+    response = await client.post(
+        "/api/v1/chat", json={"session_id": session_id, "message": message}
+    )
+    elapsed = time.perf_counter() - start
+    body = response.json() if response.status_code == 200 else {}
+    return {
+        "ok": response.status_code == 200,
+        "latency": elapsed,
+        "ttft": None,
+        "route": body.get("agent_used"),
+    }
+
+
+async def _stream(client, session_id: str, message: str) -> dict:
+    start = time.perf_counter()
+    ttft = None
+    route = None
+    ok = False
+    params = {"session_id": session_id, "message": message}
+    async with client.stream("GET", "/api/v1/chat/stream", params=params) as response:
+        event = None
+        async for line in response.aiter_lines():
+            if line.startswith("event:"):
+                event = line.split(":", 1)[1].strip()
+                if event == "token" and ttft is None:
+                    ttft = time.perf_counter() - start
+            elif line.startswith("data:") and event == "done":
+                route = json.loads(line.split(":", 1)[1]).get("agent_used")
+                ok = True
+    return {"ok": ok, "latency": time.perf_counter() - start, "ttft": ttft, "route": route}
+
+
+async def _session(client, send, index: int, turns: int) -> list[dict]:
+    results = []
+    for turn in range(turns):
+        message = QUESTIONS[(index + turn) % len(QUESTIONS)]
+        try:
+            results.append(await send(client, f"load-{index}", message))
+        except Exception as e:
+            results.append({"ok": False, "latency": 0.0, "ttft": None, "error": str(e)})
+    return results
+
+
+def _node_means_ms() -> dict[str, float]:
+    """Mean time per graph node from the Prometheus histograms of this run."""
+    from src.core.metrics import GRAPH_NODE_SECONDS
+
+    totals: dict[str, list[float]] = {}
+    for metric in GRAPH_NODE_SECONDS.collect():
+        for sample in metric.samples:
+            if sample.name.endswith(("_sum", "_count")):
+                sums = totals.setdefault(sample.labels["node"], [0.0, 0.0])
+                sums[0 if sample.name.endswith("_sum") else 1] += sample.value
+    return {node: round(s / c * 1000, 2) for node, (s, c) in sorted(totals.items()) if c}
+
+
+async def run(args) -> dict:
+    import uvicorn
+    from httpx import AsyncClient, Limits
+
+    rss_before = _peak_rss_mb()
+    app, chunks = _build_app(args)
+    send = _stream if args.endpoint == "stream" else _chat
+
+    # A real HTTP server: the in-process ASGI transport buffers whole responses,
+    # which would hide time-to-first-token
+    server = uvicorn.Server(
+        uvicorn.Config(app, host="127.0.0.1", port=0, lifespan="off", log_level="warning")
+    )
+    serving = asyncio.create_task(server.serve())
+    while not server.started:
+        await asyncio.sleep(0.01)
+    port = server.servers[0].sockets[0].getsockname()[1]
+
+    try:
+        async with AsyncClient(
+            base_url=f"http://127.0.0.1:{port}",
+            timeout=120,
+            limits=Limits(max_connections=args.sessions),
+        ) as client:
+            start = time.perf_counter()
+            sessions = await asyncio.gather(
+                *(_session(client, send, i, args.turns) for i in range(args.sessions))
+            )
+            wall = time.perf_counter() - start
+    finally:
+        server.should_exit = True
+        await serving
+
+    results = [r for session in sessions for r in session]
+    ok = [r for r in results if r["ok"]]
+    routes: dict[str, int] = {}
+    for r in ok:
+        routes[r["route"]] = routes.get(r["route"], 0) + 1
+    latency = _percentiles([r["latency"] for r in ok])
+    ttft = _percentiles([r["ttft"] for r in ok if r["ttft"] is not None])
+
+    return {
+        "commit": _commit(),
+        "timestamp": datetime.now(UTC).isoformat(),
+        "config": {**vars(args), "chunks": chunks},
+        "requests": len(results),
+        "errors": len(results) - len(ok),
+        "wall_seconds": round(wall, 3),
+        "rps": round(len(ok) / wall, 2) if wall else 0.0,
+        "latency_ms": latency,
+        "ttft_ms": ttft,
+        "latency_p50_ms": latency.get("p50"),
+        "latency_p95_ms": latency.get("p95"),
+        "latency_p99_ms": latency.get("p99"),
+        "ttft_p50_ms": ttft.get("p50"),
+        "routes": routes,
+        "node_mean_ms": _node_means_ms(),
+        "memory": {
+            "peak_rss_mb": round(_peak_rss_mb(), 1),
+            "peak_rss_growth_mb": round(_peak_rss_mb() - rss_before, 1),
+        },
+    }
+
+
+def _compare(result: dict, baseline_path: str) -> None:
+    with open(baseline_path, encoding="utf-8") as f:
+        baseline = json.load(f)
+    print(f"vs {baseline_path} (commit {baseline.get('commit')}):")
+    for key in SUMMARY_KEYS:
+        old, new = baseline.get(key), result.get(key)
+        if not old or new is None:
+            continue
+        print(f"  {key:>15}: {old:>9} -> {new:>9} ({(new - old) / old * 100:+.1f}%)")
+
+
+def main() -> None:
+    from src.rag.auto_ingest import DEFAULT_PDF_PATH
+
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--endpoint", choices=("chat", "stream"), default="chat")
+    parser.add_argument("--sessions", type=int, default=20)
+    parser.add_argument("--turns", type=int, default=5)
+    parser.add_argument("--llm-latency", type=float, default=0.3)
+    parser.add_argument("--tokens-per-second", type=float, default=60.0)
+    parser.add_argument("--reply-tokens", type=int, default=80)
+    parser.add_argument("--llm-concurrency", type=int, default=32, help="0 = unbounded")
+    parser.add_argument("--embedding-latency", type=float, default=0.05)
+    parser.add_argument("--search-latency", type=float, default=0.2)
+    parser.add_argument("--no-answer-cache", dest="answer_cache", action="store_false")
+    parser.add_argument("--pdf", default=DEFAULT_PDF_PATH)
+    parser.add_argument("--output", default=None)
+    parser.add_argument("--compare", default=None)
+    args = parser.parse_args()
+
+    # Per-request info logs would dominate the output and the timings
+    structlog.configure(wrapper_class=structlog.make_filtering_bound_logger(logging.WARNING))
+    result = asyncio.run(run(args))
+    output = args.output or os.path.join(
+        "benchmarks", "results", f"load_{args.endpoint}_{result['commit']}.json"
+    )
+    os.makedirs(os.path.dirname(output) or ".", exist_ok=True)
+    with open(output, "w", encoding="utf-8") as f:
+        json.dump(result, f, indent=2, ensure_ascii=False)
+
+    print(
+        f"{result['requests']} requests ({result['errors']} errors) in "
+        f"{result['wall_seconds']} s: {result['rps']} req/s"
+    )
+    print(f"  latency ms: {result['latency_ms']}")
+    if result["ttft_ms"]:
+        print(f"  ttft ms:    {result['ttft_ms']}")
+    print(f"  node mean ms: {result['node_mean_ms']}")
+    print(f"  routes: {result['routes']}  memory: {result['memory']}")
+    print(f"  saved to {output}")
+    if args.compare:
+        _compare(result, args.compare)
+
+
+if __name__ == "__main__":
+    main()
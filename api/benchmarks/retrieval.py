@@ -0,0 +1,108 @@
+"""Microbenchmark dense MMR: LangChain's loop vs. the vectorized RetrievalEngine.
+
+End-to-end, both paths run one FAISS search for ``fetch_k`` candidates and pick
+``k`` by MMR over the same index. The ``mmr`` columns time only the selection step
+on the same candidate matrix.
+
+Usage:
+    python benchmarks/retrieval.py [--chunks 5000] [--dim 1536] [--k 5] [--repeat 50]
+"""
+
+import argparse
+import json
+import os
+import sys
+import time
+
+import numpy as np
+
+# Add project root to path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+FETCH_KS = (25, 100, 500)
+
+
+def _build_store(chunks: int, dim: int):
+    import faiss
+    from langchain_community.docstore.in_memory import InMemoryDocstore
+    from langchain_community.vectorstores import FAISS
+    from langchain_core.documents import Document
+    from langchain_core.embeddings import DeterministicFakeEmbedding
+
+    rng = np.random.default_rng(0)
+    index = faiss.IndexFlatL2(dim)
+    index.add(rng.normal(size=(chunks, dim)).astype(np.float32))
+    ids = [str(i) for i in range(chunks)]
+    return FAISS(
+        embedding_function=DeterministicFakeEmbedding(size=dim),
+        index=index,
+        docstore=InMemoryDocstore({i: Document(id=i, page_content=f"chunk {i}") for i in ids}),
+        index_to_docstore_id=dict(enumerate(ids)),
+    )
+
+
+def _per_call_ms(fn, repeat: int) -> float:
+    fn()  # warm-up
+    start = time.perf_counter()
+    for _ in range(repeat):
+        fn()
+    return (time.perf_counter() - start) / repeat * 1000
+
+
+def main() -> None:
+    from langchain_community.vectorstores.utils import maximal_marginal_relevance
+
+    from src.rag.retrieval import RetrievalEngine, mmr_select
+
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--chunks", type=int, default=5000)
+    parser.add_argument("--dim", type=int, default=1536)
+    parser.add_argument("--k", type=int, default=5)
+    parser.add_argument("--lambda-mult", type=float, default=0.6)
+    parser.add_argument("--repeat", type=int, default=50)
+    args = parser.parse_args()
+
+    store = _build_store(args.chunks, args.dim)
+    engine = RetrievalEngine(store)
+    query = np.random.default_rng(1).normal(size=args.dim).astype(np.float32)
+
+    print(f"{args.chunks} chunks x {args.dim} dims, k={args.k}, lambda={args.lambda_mult}")
+    results = []
+    for fetch_k in FETCH_KS:
+        langchain_ms = _per_call_ms(
+            lambda: store.max_marginal_relevance_search_with_score_by_vector(
+                query.tolist(), k=args.k, fetch_k=fetch_k, lambda_mult=args.lambda_mult
+            ),
+            args.repeat,
+        )
+        engine_ms = _per_call_ms(
+            lambda: engine.mmr_rows(query, args.k, fetch_k, args.lambda_mult), args.repeat
+        )
+        _, found = store.index.search(query.reshape(1, -1), fetch_k)
+        candidates = store.index.reconstruct_batch(found[0])
+        mmr_langchain_ms = _per_call_ms(
+            lambda: maximal_marginal_relevance(
+                query, list(candidates), args.lambda_mult, k=args.k
+            ),
+            args.repeat,
+        )
+        mmr_engine_ms = _per_call_ms(
+            lambda: mmr_select(query, candidates, args.k, args.lambda_mult), args.repeat
+        )
+        results.append({
+            "fetch_k": fetch_k,
+            "langchain_ms": round(langchain_ms, 3),
+            "engine_ms": round(engine_ms, 3),
+            "mmr_langchain_ms": round(mmr_langchain_ms, 3),
+            "mmr_engine_ms": round(mmr_engine_ms, 3),
+        })
+        print(
+            f"  fetch_k={fetch_k:>3}: end-to-end langchain {langchain_ms:7.3f} ms  "
+            f"engine {engine_ms:7.3f} ms | mmr langchain {mmr_langchain_ms:7.3f} ms  "
+            f"engine {mmr_engine_ms:7.3f} ms"
+        )
+    print(json.dumps({"chunks": args.chunks, "dim": args.dim, "k": args.k, "runs": results}))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,94 @@
+"""CLI script to answer a file of questions offline, without the API.
+
+Input is JSONL (``{"id": ..., "message": ...}`` per line) or plain text (one
+question per line, numbered from 1). Results are written as NDJSON, one line per
+question in completion order (logs go to stdout, so results get their own file).
+
+Usage:
+    python scripts/batch_chat.py questions.jsonl answers.ndjson
+    python scripts/batch_chat.py questions.jsonl answers.ndjson --tenant agencia-x
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import sys
+import time
+
+# Add project root to path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+
+def read_questions(path: str) -> list:
+    from src.agents.batch import BatchQuestion
+
+    questions = []
+    with open(path, encoding="utf-8") as f:
+        for number, line in enumerate(f, start=1):
+            line = line.strip()
+            if not line:
+                continue
+            if line.startswith("{"):
+                item = json.loads(line)
+                questions.append(BatchQuestion(str(item.get("id", number)), item["message"]))
+            else:
+                questions.append(BatchQuestion(str(number), line))
+    return questions
+
+
+async def run(args) -> int:
+    from src.agents.batch import BatchAnswerer
+    from src.config import get_settings
+    from src.core.admission import configure_admission
+    from src.core.logging import setup_logging
+    from src.rag.index_holder import VectorStoreHolder
+    from src.tools.web_search import close_search_client
+
+    settings = get_settings()
+    setup_logging(debug=settings.debug)
+    configure_admission(settings)
+
+    questions = read_questions(args.input)
+    if args.tenant:
+        from src.rag.tenants import tenant_settings
+
+        settings = tenant_settings(settings, args.tenant)
+    holder = VectorStoreHolder()
+    if not await holder.reload(settings):
+        print("Vectorstore not found, answering every question with web search")
+
+    answerer = BatchAnswerer(settings, holder)
+    errors = 0
+    start = time.perf_counter()
+    try:
+        with open(args.output, "w", encoding="utf-8") as output:
+            async for result in answerer.answer(questions):
+                errors += "error" in result
+                output.write(json.dumps(result, ensure_ascii=False) + "\n")
+                output.flush()
+    finally:
+        await close_search_client()
+
+    elapsed = time.perf_counter() - start
+    print(
+        f"Answered {len(questions) - errors}/{len(questions)} questions "
+        f"in {elapsed:.1f}s ({errors} errors), results in {args.output}"
+    )
+    return 1 if errors else 0
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("input", help="JSONL or plain-text file of questions")
+    parser.add_argument("output", help="NDJSON file for the results")
+    parser.add_argument(
+        "--tenant",
+        metavar="ID",
+        help="answer from the index of this tenant (TENANTS_PATH/<ID>)",
+    )
+    sys.exit(asyncio.run(run(parser.parse_args())))
+
+
+if __name__ == "__main__":
+    main()
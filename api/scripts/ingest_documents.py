@@ -1,5 +1,13 @@
-"""CLI script to ingest PDF documents into FAISS vectorstore."""
+"""CLI script to ingest PDF documents into FAISS vectorstore.
 
+Usage:
+    python scripts/ingest_documents.py
+    python scripts/ingest_documents.py --precompute-answers --generate-questions 3
+    python scripts/ingest_documents.py --tenant agencia-x  # every PDF in data/tenants/agencia-x
+"""
+
+import argparse
+import asyncio
 import os
 import sys
 
@@ -7,34 +15,94 @@ import sys
 sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
 
 
+def precompute(settings, generate_per_section: int) -> None:
+    from src.core.admission import configure_admission
+    from src.rag.precomputed import precompute_answers
+
+    questions_path = settings.precomputed_questions_path
+    if not os.path.exists(questions_path):
+        questions_path = None
+    configure_admission(settings)
+    print("Precomputing answers for canonical questions...")
+    count = asyncio.run(precompute_answers(settings, questions_path, generate_per_section))
+    print(f"Precomputed {count} answers into {settings.vectorstore_path}")
+
+
 def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument(
+        "--precompute-answers",
+        action="store_true",
+        help="answer the canonical questions (PRECOMPUTED_QUESTIONS_PATH) and store them",
+    )
+    parser.add_argument(
+        "--generate-questions",
+        type=int,
+        default=0,
+        metavar="N",
+        help="with --precompute-answers, also generate N questions per manual section",
+    )
+    parser.add_argument(
+        "--tenant",
+        metavar="ID",
+        help="ingest the PDFs of this tenant (TENANTS_PATH/<ID>) into its own index",
+    )
+    args = parser.parse_args()
+
     from src.config import get_settings
     from src.core.logging import setup_logging
-    from src.rag.ingest import build_vectorstore, chunk_documents, extract_pages_with_tables
+    from src.rag.ingest import build_vectorstore, chunk_for_index, extract_pages_with_tables
+    from src.rag.tables import collect_table_rows
+    from src.rag.vectorstore import index_lock
 
     settings = get_settings()
     setup_logging(debug=settings.debug)
 
-    pdf_path = os.path.join("data", "manual-politicas-viagem-blis.pdf")
-    if not os.path.exists(pdf_path):
-        print(f"Error: PDF not found at {pdf_path}")
-        sys.exit(1)
+    if args.tenant:
+        from src.rag.tenants import tenant_documents, tenant_settings
 
-    print(f"Extracting pages from {pdf_path}...")
-    documents = extract_pages_with_tables(pdf_path)
-    print(f"Extracted {len(documents)} pages")
+        pdf_paths = tenant_documents(settings, args.tenant)
+        settings = tenant_settings(settings, args.tenant)
+        if not pdf_paths:
+            print(f"Error: no PDFs found for tenant {args.tenant}")
+            sys.exit(1)
+    else:
+        pdf_paths = [os.path.join("data", "manual-politicas-viagem-blis.pdf")]
+        if not os.path.exists(pdf_paths[0]):
+            print(f"Error: PDF not found at {pdf_paths[0]}")
+            sys.exit(1)
 
-    print(f"Chunking documents (size={settings.chunk_size}, overlap={settings.chunk_overlap})...")
-    chunks = chunk_documents(
-        documents,
-        chunk_size=settings.chunk_size,
-        chunk_overlap=settings.chunk_overlap,
-    )
-    print(f"Created {len(chunks)} chunks")
+    documents = []
+    for pdf_path in pdf_paths:
+        print(f"Extracting pages from {pdf_path}...")
+        documents += extract_pages_with_tables(pdf_path, workers=settings.ingest_workers)
+    print(f"Extracted {len(documents)} pages from {len(pdf_paths)} document(s)")
+    table_rows = collect_table_rows(documents)
+    print(f"Found {len(table_rows)} table rows")
+
+    print(f"Chunking documents (strategy={settings.chunking_strategy})...")
+    chunks, parents = chunk_for_index(documents, settings)
+    if parents is None:
+        print(f"Created {len(chunks)} chunks")
+    else:
+        print(f"Created {len(chunks)} chunks from {len(parents)} sections")
+
+    print("Building FAISS vectorstore (incremental)...")
+    # Running APIs hot-reload the index; the lock keeps them from loading it mid-write
+    with index_lock(settings.vectorstore_path):
+        report = build_vectorstore(chunks, settings, tables=table_rows, parents=parents)
+    if not report.changed:
+        print(f"Vectorstore at {settings.vectorstore_path} is already up to date")
+    else:
+        print(
+            f"Embedded {report.embedded} new/changed chunks, reused {report.reused}, "
+            f"removed {report.removed}"
+        )
+        print(f"Vectorstore saved to {settings.vectorstore_path}")
 
-    print("Building FAISS vectorstore...")
-    build_vectorstore(chunks, settings)
-    print(f"Vectorstore saved to {settings.vectorstore_path}")
+    # Outside the lock: answering takes LLM calls, and the stage locks only to write
+    if args.precompute_answers:
+        precompute(settings, args.generate_questions)
 
 
 if __name__ == "__main__":
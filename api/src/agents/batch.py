@@ -0,0 +1,247 @@
+"""Bulk question answering without the per-request graph.
+
+Nightly jobs send thousands of standalone questions. Running each one through
+``POST /chat`` means an HTTP round trip, a checkpoint, a query embedding, a FAISS
+search and one router call per question. ``BatchAnswerer`` processes the
+questions in chunks instead. Per chunk, the keyword classifier routes what it can
+and only the rest goes to the LLM router. The FAQ queries are then embedded in one
+request and searched with one FAISS call. Answers are generated by the LLM with
+bounded concurrency, and each result is yielded as soon as it is ready. Questions
+are independent: there is no history, checkpoint or answer cache. A batch bound
+to a tenant (``bind_tenant``) is answered from that tenant's index.
+"""
+
+from __future__ import annotations
+
+import asyncio
+from collections import deque
+from collections.abc import AsyncIterator
+from dataclasses import dataclass
+from typing import TYPE_CHECKING
+
+import structlog
+from langchain_core.messages import HumanMessage, SystemMessage
+
+from src.agents.intent_classifier import KeywordIntentClassifier, intent_stats
+from src.core.admission import external_call
+from src.rag.prompts import (
+    CLASSIFY_INTENT_SYSTEM,
+    FAQ_AGENT_SYSTEM,
+    SEARCH_AGENT_SYSTEM,
+    SYNTHESIZER_SYSTEM,
+)
+from src.rag.tenants import current_tenant
+from src.state.graph_state import AgentRoute
+
+if TYPE_CHECKING:
+    from langchain_core.documents import Document
+    from langchain_core.language_models import BaseChatModel
+
+    from src.config import Settings
+    from src.rag.index_holder import VectorStoreHolder
+
+logger = structlog.get_logger()
+
+
+@dataclass(frozen=True)
+class BatchQuestion:
+    """One question of a batch; ``id`` is echoed back with its result."""
+
+    id: str
+    message: str
+
+
+@dataclass
+class _Prepared:
+    """A question after the vectorized stages: its route and retrieved chunks."""
+
+    question: BatchQuestion
+    route: AgentRoute | None = None
+    docs: list[Document] | None = None
+    error: str | None = None
+
+
+class BatchAnswerer:
+    """Answers batches of standalone questions against the current index."""
+
+    def __init__(
+        self,
+        settings: Settings,
+        holder: VectorStoreHolder,
+        llm: BaseChatModel | None = None,
+    ) -> None:
+        from src.agents.orchestrator import create_chat_model
+
+        self.settings = settings
+        self.holder = holder
+        # Nothing is streamed token by token: results are sent whole
+        self.llm = create_chat_model(settings, llm, disable_streaming=True)
+        self.fast_path = (
+            KeywordIntentClassifier(threshold=settings.intent_fast_path_threshold)
+            if settings.intent_fast_path_enabled
+            else None
+        )
+
+    async def _complete(self, semaphore: asyncio.Semaphore, system: str, query: str) -> str:
+        async with semaphore, external_call("llm"):
+            response = await self.llm.ainvoke(
+                [SystemMessage(content=system), HumanMessage(content=query)]
+            )
+        return response.content
+
+    async def _classify(self, semaphore: asyncio.Semaphore, query: str) -> AgentRoute:
+        if self.fast_path is not None:
+            route = self.fast_path.classify(query)
+            if route is not None:
+                intent_stats.record(route.value, fast_path=True)
+                return route
+        route_text = await self._complete(semaphore, CLASSIFY_INTENT_SYSTEM, query)
+        route_text = route_text.strip().upper()
+        if route_text not in ("FAQ", "SEARCH", "BOTH"):
+            route_text = "FAQ"
+        intent_stats.record(route_text, fast_path=False)
+        return AgentRoute(route_text)
+
+    async def _prepare(
+        self,
+        questions: list[BatchQuestion],
+        semaphore: asyncio.Semaphore,
+        route: AgentRoute | None = None,
+    ) -> list[_Prepared]:
+        """Route a chunk of questions and retrieve chunks for the FAQ ones in one pass."""
+        prepared = [_Prepared(question) for question in questions]
+        tenant = current_tenant()
+        holder = self.holder if tenant is None else tenant.holder
+        engine = holder.current.engine
+        if engine is None:
+            # Degraded mode, as in the graph: no index, every question goes to search
+            for item in prepared:
+                item.route = AgentRoute.SEARCH
+            return prepared
+
+        if route is not None:
+            routes = [route] * len(questions)
+        else:
+            routes = await asyncio.gather(
+                *(self._classify(semaphore, q.message) for q in questions),
+                return_exceptions=True,
+            )
+        for item, item_route in zip(prepared, routes):
+            if isinstance(item_route, BaseException):
+                item.error = f"classification failed: {item_route}"
+            else:
+                item.route = item_route
+
+        needs_docs = [
+            item for item in prepared if item.route in (AgentRoute.FAQ, AgentRoute.BOTH)
+        ]
+        if needs_docs:
+            try:
+                docs = await engine.aretrieve_batch(
+                    [item.question.message for item in needs_docs], self.settings
+                )
+            except Exception as e:
+                await logger.awarning("Batch retrieval failed", error=str(e))
+                for item in needs_docs:
+                    item.error = f"retrieval failed: {e}"
+            else:
+                for item, item_docs in zip(needs_docs, docs):
+                    item.docs = item_docs
+        return prepared
+
+    async def _faq(self, semaphore: asyncio.Semaphore, item: _Prepared) -> tuple[str, list[dict]]:
+        from src.agents.faq_agent import format_documents
+
+        context, sources = format_documents(item.docs or [])
+        system = FAQ_AGENT_SYSTEM.format(context=context)
+        return await self._complete(semaphore, system, item.question.message), sources
+
+    async def _search(
+        self, semaphore: asyncio.Semaphore, item: _Prepared
+    ) -> tuple[str, list[dict]]:
+        from src.agents.search_agent import format_results
+        from src.tools.web_search import search_web
+
+        # Tavily calls share the batch's concurrency budget with the LLM calls
+        async with semaphore:
+            results = await search_web(item.question.message, self.settings)
+        search_text, sources = format_results(results)
+        system = SEARCH_AGENT_SYSTEM.format(search_results=search_text)
+        return await self._complete(semaphore, system, item.question.message), sources
+
+    async def _answer(self, semaphore: asyncio.Semaphore, item: _Prepared) -> dict:
+        question = item.question
+        if item.error is not None:
+            return {"id": question.id, "error": item.error}
+        try:
+            if item.route == AgentRoute.FAQ:
+                response, sources = await self._faq(semaphore, item)
+            elif item.route == AgentRoute.SEARCH:
+                response, sources = await self._search(semaphore, item)
+            else:
+                (faq, faq_sources), (found, search_sources) = await asyncio.gather(
+                    self._faq(semaphore, item), self._search(semaphore, item)
+                )
+                system = SYNTHESIZER_SYSTEM.format(faq_response=faq, search_response=found)
+                response = await self._complete(semaphore, system, question.message)
+                sources = faq_sources + search_sources
+        except Exception as e:
+            return {"id": question.id, "error": str(e) or type(e).__name__}
+        return {
+            "id": question.id,
+            "response": response,
+            "agent_used": item.route.value.lower(),
+            "sources": sources,
+        }
+
+    async def answer(
+        self, questions: list[BatchQuestion], route: AgentRoute | None = None
+    ) -> AsyncIterator[dict]:
+        """Yield one result per question, in completion order.
+
+        A result has ``response``, ``agent_used`` and ``sources``, or ``error`` when
+        that question failed; a failure never stops the rest of the batch. While the
+        answers of one chunk are generated, the next chunk is being routed and
+        retrieved; the chunk after that waits until the first one is answered, so
+        at most two chunks are held at once. ``route`` skips classification and
+        sends every question there.
+        Closing the iterator early cancels the pending work.
+        """
+        settings = self.settings
+        semaphore = asyncio.Semaphore(settings.batch_llm_concurrency)
+        results: asyncio.Queue[dict | None] = asyncio.Queue()
+        tasks: set[asyncio.Task] = set()
+
+        async def answer_one(item: _Prepared) -> None:
+            results.put_nowait(await self._answer(semaphore, item))
+
+        async def produce() -> None:
+            chunk_size = settings.batch_chunk_size
+            in_flight: deque[list[asyncio.Task]] = deque()
+            try:
+                for start in range(0, len(questions), chunk_size):
+                    # Look ahead by one chunk only
+                    while len(in_flight) > 1:
+                        await asyncio.gather(*in_flight.popleft())
+                    chunk = questions[start : start + chunk_size]
+                    chunk_tasks = []
+                    for item in await self._prepare(chunk, semaphore, route):
+                        task = asyncio.create_task(answer_one(item))
+                        tasks.add(task)
+                        task.add_done_callback(tasks.discard)
+                        chunk_tasks.append(task)
+                    in_flight.append(chunk_tasks)
+                if tasks:
+                    await asyncio.gather(*tasks)
+            finally:
+                results.put_nowait(None)
+
+        producer = asyncio.create_task(produce())
+        try:
+            while (result := await results.get()) is not None:
+                yield result
+            await producer
+        finally:
+            producer.cancel()
+            for task in list(tasks):
+                task.cancel()
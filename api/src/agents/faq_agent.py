@@ -4,69 +4,172 @@ from __future__ import annotations
 
 from typing import TYPE_CHECKING
 
+import numpy as np
 import structlog
 
-from src.rag.prompts import FAQ_AGENT_SYSTEM
+from src.core.admission import external_call
+from src.core.metrics import record_precomputed_answer, record_table_lookup
+from src.rag.prompts import FAQ_AGENT_SYSTEM, TABLE_ANSWER_SYSTEM
 
 if TYPE_CHECKING:
-    from langchain_community.vectorstores import FAISS
+    from langchain_core.documents import Document
     from langchain_openai import ChatOpenAI
 
     from src.config import Settings
+    from src.rag.answer_cache import SemanticAnswerCache
+    from src.rag.precomputed import PrecomputedAnswers
+    from src.rag.retrieval import RetrievalEngine
+    from src.rag.tables import TableRow, TableStore
     from src.state.graph_state import GraphState
 
 logger = structlog.get_logger()
 
 
+def format_documents(docs: list[Document]) -> tuple[str, list[dict]]:
+    """Prompt context and source entries for the retrieved chunks."""
+    context_parts = []
+    sources: list[dict] = []
+    for doc in docs:
+        page = doc.metadata.get("page_number", "?")
+        section = doc.metadata.get("section", "")
+        source_label = f"[Página {page}]"
+        if section:
+            source_label = f"[{section} - Página {page}]"
+        context_parts.append(f"{source_label}\n{doc.page_content}")
+        sources.append({
+            "type": "document",
+            "title": f"Manual de Políticas - Página {page}" + (f" ({section})" if section else ""),
+            "content_preview": doc.page_content[:200],
+            "url": None,
+        })
+
+    context = (
+        "\n\n---\n\n".join(context_parts)
+        if context_parts
+        else "Nenhum documento relevante encontrado."
+    )
+    return context, sources
+
+
+async def answer_from_table(
+    row: TableRow, query: str, llm: ChatOpenAI, use_llm: bool = True
+) -> tuple[str, list[dict]]:
+    """Answer from one table row: a short LLM pass over the row, or a fixed template."""
+    title = f"Manual de Políticas - Página {row.page}"
+    if row.section:
+        title += f" ({row.section})"
+    sources = [{
+        "type": "document",
+        "title": title,
+        "content_preview": row.render()[:200],
+        "url": None,
+    }]
+    if not use_llm:
+        facts = "; ".join(f"{name}: {value}" for name, value in row.pairs())
+        where = f"{row.section}, página {row.page}" if row.section else f"página {row.page}"
+        return f"Segundo o manual de políticas ({where}): {facts}.", sources
+
+    from langchain_core.messages import HumanMessage, SystemMessage
+
+    system = TABLE_ANSWER_SYSTEM.format(
+        section=row.section or "-", page=row.page, table=row.render()
+    )
+    async with external_call("llm"):
+        response = await llm.ainvoke([SystemMessage(content=system), HumanMessage(content=query)])
+    return response.content, sources
+
+
 async def run_faq_agent(
     state: GraphState,
     llm: ChatOpenAI,
-    vectorstore: FAISS | None,
+    engine: RetrievalEngine | None,
     settings: Settings,
+    answer_cache: SemanticAnswerCache | None = None,
+    precomputed: PrecomputedAnswers | None = None,
+    tables: TableStore | None = None,
 ) -> dict:
-    """Retrieve relevant documents and generate FAQ response."""
+    """Retrieve relevant documents and generate FAQ response.
+
+    Only the sources found by this agent are returned; the ``sources`` reducer in
+    ``GraphState`` merges them with those of other agents. First-turn questions are
+    first looked up in the structured ``tables``: a row that pins down the answer is
+    answered from that row alone. Then they are matched against the ``precomputed``
+    canonical answers built with the index and looked up in the semantic answer
+    cache; those hits skip retrieval and the LLM.
+    ``engine`` is the retrieval engine of the index version this request runs on.
+    """
     user_query = state["user_query"]
-    sources: list[dict] = list(state.get("sources") or [])
+    sources: list[dict] = []
 
-    if vectorstore is None:
+    if engine is None:
         await logger.awarning("Vectorstore not available for FAQ agent")
         return {
             "faq_response": "A base de conhecimento não está disponível no momento.",
             "sources": sources,
         }
 
-    from langchain_core.messages import HumanMessage, SystemMessage
-
-    from src.rag.vectorstore import get_retriever
+    # Follow-ups depend on the conversation, so only standalone questions are cached
+    history = state.get("messages", [])
+    standalone = len(history) <= 1
+    cache_vector = None
+    if tables is not None and standalone:
+        hit = tables.lookup(user_query, settings.table_lookup_min_coverage)
+        if hit is not None and not settings.table_lookup_use_llm and not hit.row.intact():
+            # The template would repeat values the PDF extraction cut across cells
+            hit = None
+        record_table_lookup(hit is not None)
+        if hit is not None:
+            response, sources = await answer_from_table(
+                hit.row, user_query, llm, settings.table_lookup_use_llm
+            )
+            await logger.ainfo(
+                "FAQ answer served from table row",
+                page=hit.row.page,
+                coverage=round(hit.coverage, 2),
+            )
+            return {"faq_response": response, "sources": sources}
+
+    if precomputed is not None and standalone:
+        # Retrieval embeds the same query, so a miss costs no extra embedding call
+        cache_vector = await engine.vectorstore.embeddings.aembed_query(user_query)
+        matched = precomputed.match(cache_vector, settings.precomputed_answer_threshold)
+        if matched is not None:
+            record_precomputed_answer()
+            await logger.ainfo(
+                "FAQ answer served from precomputed set",
+                similarity=round(matched.similarity, 4),
+            )
+            return {"faq_response": matched.answer, "sources": matched.sources}
+
+    if answer_cache is not None and standalone:
+        if cache_vector is None:
+            cache_vector = await answer_cache.embed(user_query)
+        else:
+            cache_vector = np.asarray(cache_vector, dtype=np.float32)
+        cached = await answer_cache.lookup(cache_vector)
+        if cached is not None:
+            await logger.ainfo(
+                "FAQ answer served from cache", similarity=round(cached.similarity, 4)
+            )
+            return {"faq_response": cached.answer, "sources": list(cached.sources)}
 
-    retriever = get_retriever(vectorstore, top_k=settings.retrieval_top_k)
-    docs = await retriever.ainvoke(user_query)
+    from langchain_core.messages import HumanMessage, SystemMessage
 
-    context_parts = []
-    for doc in docs:
-        page = doc.metadata.get("page_number", "?")
-        section = doc.metadata.get("section", "")
-        source_label = f"[Página {page}]"
-        if section:
-            source_label = f"[{section} - Página {page}]"
-        context_parts.append(f"{source_label}\n{doc.page_content}")
-        sources.append({
-            "type": "document",
-            "title": f"Manual de Políticas - Página {page}" + (f" ({section})" if section else ""),
-            "content_preview": doc.page_content[:200],
-            "url": None,
-        })
+    from src.agents.history import select_history
 
-    context = "\n\n---\n\n".join(context_parts) if context_parts else "Nenhum documento relevante encontrado."
+    docs = await engine.aretrieve(user_query, settings)
+    context, sources = format_documents(docs)
 
     system_prompt = FAQ_AGENT_SYSTEM.format(context=context)
-    # Build messages with conversation history for context continuity
-    history = state.get("messages", [])
+    # Build messages with a token-budgeted window of the conversation
     llm_messages: list = [SystemMessage(content=system_prompt)]
-    for msg in history[:-1]:  # Previous conversation turns
-        llm_messages.append(msg)
+    llm_messages.extend(select_history(state, settings.history_budget_agent_tokens))
     llm_messages.append(HumanMessage(content=user_query))
-    response = await llm.ainvoke(llm_messages)
+    async with external_call("llm"):
+        response = await llm.ainvoke(llm_messages)
+
+    if answer_cache is not None and cache_vector is not None and docs:
+        await answer_cache.store(cache_vector, response.content, sources)
 
     await logger.ainfo("FAQ agent completed", docs_found=len(docs))
     return {
@@ -0,0 +1,163 @@
+"""Conversation-history management: token-budgeted windows and rolling summary.
+
+The checkpointer keeps every message of a session, but prompts only receive the most
+recent turns that fit a per-node token budget. Turns that fall out of the window are
+folded into ``history_summary`` by ``HistorySummarizer`` once the response has been
+sent, so per-request cost no longer grows with session length.
+"""
+
+from __future__ import annotations
+
+import asyncio
+from typing import TYPE_CHECKING
+
+import structlog
+from langchain_core.messages import BaseMessage, HumanMessage, RemoveMessage, SystemMessage
+
+from src.core.admission import OverloadedError, external_call
+from src.core.text import CHARS_PER_TOKEN, estimate_tokens
+from src.rag.prompts import HISTORY_SUMMARY_SYSTEM
+
+if TYPE_CHECKING:
+    from langchain_core.language_models import BaseChatModel
+
+    from src.config import Settings
+    from src.state.graph_state import GraphState
+
+logger = structlog.get_logger()
+
+
+def _content(message: BaseMessage) -> str:
+    return message.content if isinstance(message.content, str) else str(message.content)
+
+
+def _unsummarized(
+    messages: list[BaseMessage], summarized_until: str | None
+) -> list[BaseMessage]:
+    """Messages after the last one already folded into the summary."""
+    if summarized_until:
+        for idx, message in enumerate(messages):
+            if message.id == summarized_until:
+                return messages[idx + 1:]
+    return messages
+
+
+def _window(messages: list[BaseMessage], budget_tokens: int) -> list[BaseMessage]:
+    """Most recent messages that fit ``budget_tokens``; an oversized last one is truncated."""
+    window: list[BaseMessage] = []
+    remaining = budget_tokens
+    for message in reversed(messages):
+        cost = estimate_tokens(_content(message))
+        if cost > remaining:
+            if not window and remaining > 0:
+                tail = _content(message)[-remaining * CHARS_PER_TOKEN:]
+                window.append(message.model_copy(update={"content": "…" + tail}))
+            break
+        window.append(message)
+        remaining -= cost
+    window.reverse()
+    return window
+
+
+def select_history(
+    state: GraphState, budget_tokens: int, include_summary: bool = True
+) -> list[BaseMessage]:
+    """Build the history prefix for a node prompt within ``budget_tokens``."""
+    history: list[BaseMessage] = []
+    summary = state.get("history_summary")
+    if include_summary and summary:
+        history.append(SystemMessage(content=f"Resumo da conversa até aqui:\n{summary}"))
+    # The last message is the current query, which every node adds itself
+    prior = list(state.get("messages", []))[:-1]
+    history.extend(_window(_unsummarized(prior, state.get("summarized_until")), budget_tokens))
+    return history
+
+
+async def update_history_summary(
+    state: GraphState, llm: BaseChatModel, settings: Settings
+) -> dict:
+    """Fold turns that left the agent window into the rolling summary.
+
+    Returns the state update; ``HistorySummarizer`` runs it after the response is
+    sent. The summary is only refreshed once the overflow reaches
+    ``history_summary_trigger_tokens``, which batches several turns into one
+    summarization call.
+
+    With ``checkpoint_prune_summarized`` the folded messages are also removed from
+    ``messages``, so the checkpointed list stays bounded by the agent window plus
+    the trigger instead of growing with the session.
+    """
+    # Include the current turn: it is part of the history from the next turn on
+    messages = list(state.get("messages", []))
+    pending = _unsummarized(messages, state.get("summarized_until"))
+    window = _window(pending, settings.history_budget_agent_tokens)
+    overflow = pending[: len(pending) - len(window)]
+    overflow_tokens = sum(estimate_tokens(_content(m)) for m in overflow)
+    if not overflow or overflow_tokens < settings.history_summary_trigger_tokens:
+        return {}
+
+    transcript = "\n".join(
+        f"{'Cliente' if m.type == 'human' else 'Assistente'}: {_content(m)}" for m in overflow
+    )
+    previous = state.get("history_summary") or "(vazio)"
+    async with external_call("llm"):
+        response = await llm.ainvoke([
+            SystemMessage(content=HISTORY_SUMMARY_SYSTEM),
+            HumanMessage(
+                content=f"Resumo atual:\n{previous}\n\nNovas mensagens:\n{transcript}"
+            ),
+        ])
+
+    await logger.ainfo(
+        "History summary updated", folded_messages=len(overflow), folded_tokens=overflow_tokens
+    )
+    update = {"history_summary": response.content, "summarized_until": overflow[-1].id}
+    if settings.checkpoint_prune_summarized:
+        # Everything up to the newest folded message, including turns summarized
+        # before pruning was enabled
+        folded = messages[: len(messages) - len(pending) + len(overflow)]
+        update["messages"] = [RemoveMessage(id=m.id) for m in folded if m.id]
+    return update
+
+
+class HistorySummarizer:
+    """Runs ``update_history_summary`` for a session after its response is sent.
+
+    ``schedule`` starts the summary as a background task, so neither POST /chat nor
+    the SSE ``done`` event waits for the summarization call. The update is written
+    to the session's latest checkpoint with ``aupdate_state``. One summary runs per
+    session at a time; a turn that ends meanwhile is covered by the next one. A turn
+    already running may checkpoint over the update, in which case the overflow is
+    simply folded again after a later turn.
+    """
+
+    def __init__(self, graph, llm: BaseChatModel, settings: Settings) -> None:
+        self.graph = graph
+        self.llm = llm
+        self.settings = settings
+        self._running: dict[str, asyncio.Task] = {}
+
+    def schedule(self, config: dict) -> None:
+        """Summarize the session of ``config`` in the background, unless already doing so."""
+        thread_id = config["configurable"]["thread_id"]
+        if thread_id in self._running:
+            return
+        task = asyncio.create_task(self._run(config))
+        self._running[thread_id] = task
+        task.add_done_callback(lambda _: self._running.pop(thread_id, None))
+
+    async def _run(self, config: dict) -> None:
+        try:
+            snapshot = await self.graph.aget_state(config)
+            update = await update_history_summary(snapshot.values, self.llm, self.settings)
+            if update:
+                await self.graph.aupdate_state(config, update, as_node="synthesize_response")
+        except OverloadedError:
+            # Only postpones the summary to a later turn
+            await logger.awarning("History summary skipped, LLM overloaded")
+        except Exception as e:
+            await logger.awarning("History summary failed", error=str(e))
+
+    async def aclose(self) -> None:
+        """Wait for the summaries in flight."""
+        await asyncio.gather(*self._running.values(), return_exceptions=True)
@@ -0,0 +1,143 @@
+"""Local fast-path intent classifier that runs before the LLM router.
+
+Keyword rules mirror the hints in ``CLASSIFY_INTENT_SYSTEM``: policy topics point to
+FAQ, while prices, fees, routes, availability and promotions point to SEARCH. Each
+matched rule contributes a weight and the class confidence is ``1 - Π(1 - w)``.
+Only predictions above the configured threshold skip the LLM call.
+"""
+
+from __future__ import annotations
+
+import re
+import threading
+from dataclasses import dataclass, field
+
+from src.core.metrics import INTENT_CLASSIFICATIONS
+from src.core.text import normalize_text
+from src.state.graph_state import AgentRoute
+
+# (pattern, weight) — patterns match accent-free, lowercased text
+FAQ_RULES: list[tuple[str, float]] = [
+    (r"\bbagage(m|ns)\b", 0.85),
+    (r"\bfranquia\b", 0.85),
+    (r"\bmala(s)?\b", 0.6),
+    (r"\b(peso|dimens(ao|oes)|medidas)\b", 0.5),
+    (r"\bcheck-?in\b", 0.85),
+    (r"\b(passaporte|visto|documenta(cao|coes)|documento(s)?|rg)\b", 0.8),
+    (r"\b(reembolso|estorno|remarca(cao|r)|cancelamento|cancelar)\b", 0.85),
+    (r"\b(pet|pets|animal|animais|cachorro|cao|gato)\b", 0.85),
+    (r"\b(necessidades especiais|cadeira de rodas|mobilidade reduzida|gestante)\b", 0.85),
+    (r"\b(fidelidade|programa de pontos)\b", 0.7),
+    (r"\b(politica|regra(s)?|permitido|posso levar|pode levar)\b", 0.6),
+    (r"\b(crianca(s)?|menor(es)? de idade|bebe)\b", 0.5),
+]
+
+SEARCH_RULES: list[tuple[str, float]] = [
+    (r"\b(preco(s)?|quanto custa|quanto esta|quanto sai|valor(es)?|custo(s)?)\b", 0.85),
+    (r"\b(tarifa(s)?|taxa(s)?)\b", 0.75),
+    (r"\b(promo(cao|coes)|oferta(s)?|desconto(s)?|barat(o|a|os|as))\b", 0.9),
+    (r"\b(disponibilidade|disponive(l|is)|horario(s)?|assento(s)? livre(s)?)\b", 0.85),
+    (r"\b(noticia(s)?|hoje|amanha|agora|atualmente|essa semana)\b", 0.6),
+    (r"\bpassage(m|ns)\b", 0.6),
+    (r"\b(voo|voos)\b", 0.4),
+    # Explicit routes: "SP-Lisboa", "GRU-LIS", "Rio → Miami", "de São Paulo para Orlando".
+    # "de X para Y" also matches plain prose, so it stays below any sane threshold.
+    (r"\b([a-z]{2}\s*-\s*[a-z]{3,}|[a-z]{3}\s*-\s*[a-z]{3})\b", 0.6),
+    (r"\b[a-z]{2,}\s*(→|->)\s*[a-z]{2,}\b", 0.6),
+    (r"\bde [a-z]+( [a-z]+)? (para|pra|ate) [a-z]+", 0.5),
+]
+
+# Matched before accents are stripped: "é" ("É permitido...?") is not the conjunction "e"
+_FOLLOW_UP = re.compile(r"^(e|mas|ent[aã]o)\b")
+
+_COMPILED_FAQ = [(re.compile(p), w) for p, w in FAQ_RULES]
+_COMPILED_SEARCH = [(re.compile(p), w) for p, w in SEARCH_RULES]
+
+
+def _score(text: str, rules: list[tuple[re.Pattern, float]]) -> float:
+    miss = 1.0
+    for pattern, weight in rules:
+        if pattern.search(text):
+            miss *= 1.0 - weight
+    return 1.0 - miss
+
+
+@dataclass
+class IntentPrediction:
+    """Result of the local classifier."""
+
+    route: AgentRoute | None
+    confidence: float
+
+
+@dataclass
+class IntentStats:
+    """Counters for fast-path hit rate and LLM fallback rate."""
+
+    fast_path_hits: int = 0
+    llm_fallbacks: int = 0
+    by_route: dict[str, int] = field(default_factory=dict)
+    _lock: threading.Lock = field(default_factory=threading.Lock, repr=False)
+
+    def record(self, route: str, fast_path: bool) -> None:
+        INTENT_CLASSIFICATIONS.labels(
+            route=route, source="fast_path" if fast_path else "llm"
+        ).inc()
+        with self._lock:
+            if fast_path:
+                self.fast_path_hits += 1
+            else:
+                self.llm_fallbacks += 1
+            self.by_route[route] = self.by_route.get(route, 0) + 1
+
+    @property
+    def total(self) -> int:
+        return self.fast_path_hits + self.llm_fallbacks
+
+    @property
+    def hit_rate(self) -> float:
+        return self.fast_path_hits / self.total if self.total else 0.0
+
+    @property
+    def fallback_rate(self) -> float:
+        return self.llm_fallbacks / self.total if self.total else 0.0
+
+
+intent_stats = IntentStats()
+"""Process-wide classifier counters."""
+
+
+class KeywordIntentClassifier:
+    """Rule-based intent classifier for confident, unambiguous queries."""
+
+    def __init__(self, threshold: float = 0.8) -> None:
+        self.threshold = threshold
+
+    def predict(self, query: str, has_history: bool = False) -> IntentPrediction:
+        """Score the query; ``route`` is None when no rule matched.
+
+        Short follow-ups ("e para crianças?") depend on the conversation, so they
+        get zero confidence when there is history and always go to the LLM.
+        """
+        if has_history and _FOLLOW_UP.match(" ".join(query.casefold().split())):
+            return IntentPrediction(route=None, confidence=0.0)
+
+        text = normalize_text(query)
+        faq = _score(text, _COMPILED_FAQ)
+        search = _score(text, _COMPILED_SEARCH)
+
+        if faq and search:
+            # Mixed signals are inherently less certain than a single topic
+            return IntentPrediction(route=AgentRoute.BOTH, confidence=min(faq, search) * 0.9)
+        if faq:
+            return IntentPrediction(route=AgentRoute.FAQ, confidence=faq)
+        if search:
+            return IntentPrediction(route=AgentRoute.SEARCH, confidence=search)
+        return IntentPrediction(route=None, confidence=0.0)
+
+    def classify(self, query: str, has_history: bool = False) -> AgentRoute | None:
+        """Return the route when confident enough, otherwise None (use the LLM)."""
+        prediction = self.predict(query, has_history=has_history)
+        if prediction.route is not None and prediction.confidence >= self.threshold:
+            return prediction.route
+        return None
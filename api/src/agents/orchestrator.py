@@ -2,6 +2,7 @@
 
 from __future__ import annotations
 
+import asyncio
 from typing import TYPE_CHECKING, Literal
 
 import structlog
@@ -9,57 +10,196 @@ from langchain_core.messages import AIMessage, HumanMessage, SystemMessage
 from langchain_openai import ChatOpenAI
 from langgraph.graph import END, StateGraph
 
+from src.agents.history import select_history
+from src.agents.intent_classifier import KeywordIntentClassifier, intent_stats
+from src.core.admission import external_call
+from src.core.metrics import timed_node
+from src.rag.index_holder import VectorStoreHolder
 from src.rag.prompts import CLASSIFY_INTENT_SYSTEM, SYNTHESIZER_SYSTEM
+from src.rag.tenants import current_tenant
 from src.state.graph_state import AgentRoute, GraphState
 
 if TYPE_CHECKING:
     from langchain_community.vectorstores import FAISS
+    from langchain_core.language_models import BaseChatModel
 
     from src.config import Settings
+    from src.rag.answer_cache import AnswerCacheBackend
 
 logger = structlog.get_logger()
 
 
-def build_graph(settings: Settings, vectorstore: FAISS | None, checkpointer=None):
-    """Build and compile the LangGraph StateGraph."""
-    llm = ChatOpenAI(
+def create_chat_model(
+    settings: Settings, llm: BaseChatModel | None = None, **overrides
+) -> BaseChatModel:
+    """The configured OpenAI chat model, or a copy of ``llm`` when one is injected."""
+    if llm is not None:
+        return llm.model_copy(update=overrides) if overrides else llm
+    return ChatOpenAI(
         model=settings.llm_model,
         temperature=settings.llm_temperature,
         openai_api_key=settings.openai_api_key.get_secret_value(),
+        **overrides,
+    )
+
+
+def build_graph(
+    settings: Settings,
+    vectorstore: FAISS | VectorStoreHolder | None,
+    checkpointer=None,
+    llm: BaseChatModel | None = None,
+):
+    """Build and compile the LangGraph StateGraph.
+
+    ``vectorstore`` may be a ``VectorStoreHolder`` whose store is attached later;
+    while it is empty every question is routed to web search (degraded mode). It
+    serves the default tenant; a run bound to another tenant (``bind_tenant``) uses
+    that tenant's index and answer cache instead.
+    ``llm`` replaces the configured OpenAI model (e.g. a local fake for load tests).
+    """
+    if isinstance(vectorstore, VectorStoreHolder):
+        holder = vectorstore
+    else:
+        version = ""
+        if vectorstore is not None:
+            from src.rag.vectorstore import get_index_version
+
+            version = get_index_version(settings.vectorstore_path)
+        holder = VectorStoreHolder(vectorstore, version)
+
+    # Nodes whose tokens never reach the client (router, BOTH branches)
+    # call the model without streaming, so they emit no per-token events
+    quiet_llm = create_chat_model(settings, llm, disable_streaming=True)
+    llm = create_chat_model(settings, llm)
+
+    from src.rag.answer_cache import create_answer_cache_backend
+
+    default_answer_cache = create_answer_cache_backend(settings)
+
+    def request_index() -> tuple[VectorStoreHolder, AnswerCacheBackend | None]:
+        """Index holder and answer cache of the tenant this run is bound to."""
+        tenant = current_tenant()
+        if tenant is None:
+            return holder, default_answer_cache
+        return tenant.holder, tenant.answer_cache
+
+    fast_path = (
+        KeywordIntentClassifier(threshold=settings.intent_fast_path_threshold)
+        if settings.intent_fast_path_enabled
+        else None
     )
 
     async def classify_intent(state: GraphState) -> dict:
-        """Classify user query intent into FAQ, SEARCH, or BOTH."""
+        """Classify user query intent into FAQ, SEARCH, or BOTH.
+
+        Confident cases are resolved by the local fast path; the LLM router is only
+        called when the rules are unsure.
+        """
         user_query = state["user_query"]
         history = state.get("messages", [])
 
-        # Build messages: system + conversation history (for context) + current query
+        if not request_index()[0].ready:
+            await logger.ainfo("Knowledge base not ready, routing to search", query=user_query[:80])
+            return {"route": AgentRoute.SEARCH.value}
+
+        if fast_path is not None:
+            fast_route = fast_path.classify(user_query, has_history=len(history) > 1)
+            if fast_route is not None:
+                intent_stats.record(fast_route.value, fast_path=True)
+                await logger.ainfo(
+                    "Intent classified",
+                    route=fast_route.value,
+                    source="rules",
+                    query=user_query[:80],
+                )
+                return {"route": fast_route.value}
+
+        # Build messages: system + last turn or two (for follow-ups) + current query
         llm_messages: list = [SystemMessage(content=CLASSIFY_INTENT_SYSTEM)]
-        # Include recent history so the classifier understands follow-up questions
-        for msg in history[:-1]:  # All except current (last) message
-            llm_messages.append(msg)
+        llm_messages.extend(
+            select_history(
+                state, settings.history_budget_classifier_tokens, include_summary=False
+            )
+        )
         llm_messages.append(HumanMessage(content=user_query))
 
-        response = await llm.ainvoke(llm_messages)
+        async with external_call("llm"):
+            response = await quiet_llm.ainvoke(llm_messages)
         route_text = response.content.strip().upper()
 
         if route_text not in ("FAQ", "SEARCH", "BOTH"):
             route_text = "FAQ"
 
-        await logger.ainfo("Intent classified", route=route_text, query=user_query[:80])
+        intent_stats.record(route_text, fast_path=False)
+        await logger.ainfo(
+            "Intent classified",
+            route=route_text,
+            source="llm",
+            query=user_query[:80],
+            fast_path_hit_rate=round(intent_stats.hit_rate, 3),
+        )
         return {"route": route_text}
 
-    async def faq_agent(state: GraphState) -> dict:
-        """Answer from policy documents via RAG."""
+    async def run_faq(state: GraphState, model: BaseChatModel) -> dict:
         from src.agents.faq_agent import run_faq_agent
 
-        return await run_faq_agent(state, llm, vectorstore, settings)
+        # One snapshot per request: a concurrent swap never mixes index versions
+        request_holder, answer_cache_backend = request_index()
+        snapshot = request_holder.current
+        answer_cache = None
+        if snapshot.vectorstore is not None and answer_cache_backend is not None:
+            from src.rag.answer_cache import SemanticAnswerCache
+
+            answer_cache = SemanticAnswerCache(
+                answer_cache_backend, snapshot.vectorstore.embeddings, snapshot.version
+            )
+        return await run_faq_agent(
+            state,
+            model,
+            snapshot.engine,
+            settings,
+            answer_cache,
+            snapshot.answers,
+            snapshot.tables,
+        )
+
+    async def run_search(state: GraphState, model: BaseChatModel) -> dict:
+        from src.agents.search_agent import run_search_agent
+
+        return await run_search_agent(state, model, settings)
+
+    async def faq_agent(state: GraphState) -> dict:
+        """Answer from policy documents via RAG."""
+        return await run_faq(state, llm)
 
     async def search_agent(state: GraphState) -> dict:
         """Answer using web search results."""
-        from src.agents.search_agent import run_search_agent
+        return await run_search(state, llm)
 
-        return await run_search_agent(state, llm, settings)
+    async def both_faq(state: GraphState) -> dict:
+        """FAQ branch of the BOTH route, cut off after ``faq_branch_timeout``.
+
+        Only the synthesized answer is streamed on BOTH, so the branch is not.
+        """
+        try:
+            return await asyncio.wait_for(
+                run_faq(state, quiet_llm), timeout=settings.faq_branch_timeout
+            )
+        except TimeoutError:
+            await logger.awarning("FAQ branch timed out", timeout=settings.faq_branch_timeout)
+            return {"faq_response": None, "sources": []}
+
+    async def both_search(state: GraphState) -> dict:
+        """Search branch of the BOTH route, cut off after ``search_branch_timeout``."""
+        try:
+            return await asyncio.wait_for(
+                run_search(state, quiet_llm), timeout=settings.search_branch_timeout
+            )
+        except TimeoutError:
+            await logger.awarning(
+                "Search branch timed out", timeout=settings.search_branch_timeout
+            )
+            return {"search_response": None, "sources": []}
 
     async def synthesize_response(state: GraphState) -> dict:
         """Synthesize final response from agent outputs."""
@@ -72,10 +212,11 @@ def build_graph(settings: Settings, vectorstore: FAISS | None, checkpointer=None
                 faq_response=faq_resp,
                 search_response=search_resp,
             )
-            response = await llm.ainvoke([
-                SystemMessage(content=system_prompt),
-                HumanMessage(content=state["user_query"]),
-            ])
+            async with external_call("llm"):
+                response = await llm.ainvoke([
+                    SystemMessage(content=system_prompt),
+                    HumanMessage(content=state["user_query"]),
+                ])
             final = response.content
         elif faq_resp:
             final = faq_resp
@@ -90,12 +231,17 @@ def build_graph(settings: Settings, vectorstore: FAISS | None, checkpointer=None
             "messages": [AIMessage(content=final)],
         }
 
-    def route_by_intent(state: GraphState) -> Literal["faq_agent", "search_agent", "both_faq"]:
-        """Route to appropriate agent based on classified intent."""
+    def route_by_intent(state: GraphState) -> str | list[str]:
+        """Route to appropriate agent(s) based on classified intent.
+
+        In parallel mode the BOTH route fans out to both branches at once.
+        """
         route = state["route"]
         if route == AgentRoute.SEARCH:
             return "search_agent"
         elif route == AgentRoute.BOTH:
+            if settings.both_route_parallel:
+                return ["both_faq", "both_search"]
             return "both_faq"
         return "faq_agent"
 
@@ -107,18 +253,22 @@ def build_graph(settings: Settings, vectorstore: FAISS | None, checkpointer=None
     graph = StateGraph(GraphState)
 
     # Add nodes
-    graph.add_node("classify_intent", classify_intent)
-    graph.add_node("faq_agent", faq_agent)
-    graph.add_node("search_agent", search_agent)
-    graph.add_node("both_faq", faq_agent)
-    graph.add_node("both_search", search_agent)
-    graph.add_node("synthesize_response", synthesize_response)
+    graph.add_node("classify_intent", timed_node("classify_intent", classify_intent))
+    graph.add_node("faq_agent", timed_node("faq_agent", faq_agent))
+    graph.add_node("search_agent", timed_node("search_agent", search_agent))
+    graph.add_node("both_faq", timed_node("both_faq", both_faq))
+    graph.add_node("both_search", timed_node("both_search", both_search))
+    graph.add_node("synthesize_response", timed_node("synthesize_response", synthesize_response))
 
     # Set entry point
     graph.set_entry_point("classify_intent")
 
     # Add conditional routing
-    graph.add_conditional_edges("classify_intent", route_by_intent)
+    graph.add_conditional_edges(
+        "classify_intent",
+        route_by_intent,
+        ["faq_agent", "search_agent", "both_faq", "both_search"],
+    )
 
     # FAQ route: faq_agent → synthesize → END
     graph.add_edge("faq_agent", "synthesize_response")
@@ -126,11 +276,17 @@ def build_graph(settings: Settings, vectorstore: FAISS | None, checkpointer=None
     # SEARCH route: search_agent → synthesize → END
     graph.add_edge("search_agent", "synthesize_response")
 
-    # BOTH route: both_faq → both_search → synthesize → END
-    graph.add_edge("both_faq", "both_search")
-    graph.add_edge("both_search", "synthesize_response")
-
-    # Synthesize → END
+    if settings.both_route_parallel:
+        # BOTH route: (both_faq ∥ both_search) → synthesize → END
+        # synthesize_response waits for both branches before running.
+        graph.add_edge(["both_faq", "both_search"], "synthesize_response")
+    else:
+        # BOTH route: both_faq → both_search → synthesize → END
+        graph.add_edge("both_faq", "both_search")
+        graph.add_edge("both_search", "synthesize_response")
+
+    # Synthesize → END; the history summary runs after the response is sent
+    # (see ``HistorySummarizer``)
     graph.add_edge("synthesize_response", END)
 
     compiled = graph.compile(checkpointer=checkpointer)
@@ -6,6 +6,7 @@ from typing import TYPE_CHECKING
 
 import structlog
 
+from src.core.admission import external_call
 from src.rag.prompts import SEARCH_AGENT_SYSTEM
 
 if TYPE_CHECKING:
@@ -17,14 +18,40 @@ if TYPE_CHECKING:
 logger = structlog.get_logger()
 
 
+def format_results(results: list[dict]) -> tuple[str, list[dict]]:
+    """Prompt text and source entries for the web search results."""
+    search_parts = []
+    sources: list[dict] = []
+    for result in results:
+        title = result.get("title", "Sem título")
+        url = result.get("url", "")
+        content = result.get("content", "")
+        search_parts.append(f"**{title}**\n{content}\nFonte: {url}")
+        sources.append({
+            "type": "web",
+            "title": title,
+            "content_preview": content[:200],
+            "url": url,
+        })
+
+    search_text = (
+        "\n\n---\n\n".join(search_parts) if search_parts else "Nenhum resultado encontrado."
+    )
+    return search_text, sources
+
+
 async def run_search_agent(
     state: GraphState,
     llm: ChatOpenAI,
     settings: Settings,
 ) -> dict:
-    """Search the web and generate response from search results."""
+    """Search the web and generate response from search results.
+
+    Only the sources found by this agent are returned; the ``sources`` reducer in
+    ``GraphState`` merges them with those of other agents.
+    """
     user_query = state["user_query"]
-    sources: list[dict] = list(state.get("sources") or [])
+    sources: list[dict] = []
 
     try:
         from src.tools.web_search import search_web
@@ -37,31 +64,19 @@ async def run_search_agent(
             "sources": sources,
         }
 
-    search_parts = []
-    for result in results:
-        title = result.get("title", "Sem título")
-        url = result.get("url", "")
-        content = result.get("content", "")
-        search_parts.append(f"**{title}**\n{content}\nFonte: {url}")
-        sources.append({
-            "type": "web",
-            "title": title,
-            "content_preview": content[:200],
-            "url": url,
-        })
-
-    search_text = "\n\n---\n\n".join(search_parts) if search_parts else "Nenhum resultado encontrado."
+    search_text, sources = format_results(results)
 
     from langchain_core.messages import HumanMessage, SystemMessage
 
+    from src.agents.history import select_history
+
     system_prompt = SEARCH_AGENT_SYSTEM.format(search_results=search_text)
-    # Build messages with conversation history for context continuity
-    history = state.get("messages", [])
+    # Build messages with a token-budgeted window of the conversation
     llm_messages: list = [SystemMessage(content=system_prompt)]
-    for msg in history[:-1]:  # Previous conversation turns
-        llm_messages.append(msg)
+    llm_messages.extend(select_history(state, settings.history_budget_agent_tokens))
     llm_messages.append(HumanMessage(content=user_query))
-    response = await llm.ainvoke(llm_messages)
+    async with external_call("llm"):
+        response = await llm.ainvoke(llm_messages)
 
     await logger.ainfo("Search agent completed", results_found=len(results))
     return {
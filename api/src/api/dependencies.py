@@ -2,7 +2,9 @@
 
 from __future__ import annotations
 
-from fastapi import Depends, Request
+import secrets
+
+from fastapi import Depends, Header, Request
 
 from src.config import Settings
 
@@ -20,3 +22,80 @@ def get_graph(request: Request):
 
         raise HTTPException(status_code=503, detail="Serviço temporariamente indisponível")
     return graph
+
+
+def get_batch_answerer(request: Request):
+    """Get the batch answerer from app state."""
+    answerer = getattr(request.app.state, "batch_answerer", None)
+    if answerer is None:
+        from fastapi import HTTPException
+
+        raise HTTPException(status_code=503, detail="Serviço temporariamente indisponível")
+    return answerer
+
+
+def get_history_summarizer(request: Request):
+    """Get the background history summarizer from app state, if any."""
+    return getattr(request.app.state, "history_summarizer", None)
+
+
+def get_vectorstore_holder(request: Request):
+    """Get the vectorstore holder from app state."""
+    holder = getattr(request.app.state, "vectorstore_holder", None)
+    if holder is None:
+        from fastapi import HTTPException
+
+        raise HTTPException(status_code=503, detail="Serviço temporariamente indisponível")
+    return holder
+
+
+async def get_tenant_index(request: Request, tenant_id: str | None):
+    """The tenant's index, loaded on first use; None for the default tenant, 404 if unknown."""
+    registry = getattr(request.app.state, "tenant_registry", None)
+    if registry is None or not tenant_id:
+        return None
+    from fastapi import HTTPException
+
+    from src.rag.tenants import UnknownTenantError
+
+    try:
+        return await registry.get(tenant_id)
+    except UnknownTenantError:
+        raise HTTPException(status_code=404, detail="Tenant não encontrado")
+
+
+async def enforce_rate_limit(request: Request, session_id: str) -> None:
+    """Count the request against its IP and session quotas; 429 once either is spent."""
+    limiter = getattr(request.app.state, "rate_limiter", None)
+    if limiter is None:
+        return
+    from fastapi import HTTPException
+
+    from src.core.rate_limit import Quota
+
+    settings = request.app.state.settings
+    client_ip = request.client.host if request.client else "unknown"
+    decision = await limiter.hit([
+        Quota("ip", client_ip, settings.rate_limit_ip_requests),
+        Quota("session", session_id, settings.rate_limit_session_requests),
+    ])
+    if not decision.allowed:
+        raise HTTPException(
+            status_code=429,
+            detail="Muitas requisições. Tente novamente em instantes.",
+            headers={"Retry-After": str(decision.retry_after)},
+        )
+
+
+def require_admin(
+    x_admin_token: str = Header(default=""),
+    settings: Settings = Depends(get_settings),
+) -> None:
+    """Check the ``X-Admin-Token`` header; the endpoints don't exist without a token."""
+    from fastapi import HTTPException
+
+    expected = settings.admin_token.get_secret_value()
+    if not expected:
+        raise HTTPException(status_code=404, detail="Not Found")
+    if not secrets.compare_digest(x_admin_token, expected):
+        raise HTTPException(status_code=403, detail="Acesso negado")
@@ -0,0 +1,38 @@
+"""Admin API routes: POST /admin/reload-index."""
+
+from __future__ import annotations
+
+import structlog
+from fastapi import APIRouter, Depends, HTTPException
+
+from src.api.dependencies import get_settings, get_vectorstore_holder, require_admin
+from src.api.schemas import ReloadIndexResponse
+from src.config import Settings
+
+logger = structlog.get_logger()
+
+router = APIRouter(prefix="/admin")
+
+
+@router.post(
+    "/reload-index",
+    response_model=ReloadIndexResponse,
+    dependencies=[Depends(require_admin)],
+)
+async def reload_index(
+    force: bool = False,
+    holder=Depends(get_vectorstore_holder),
+    settings: Settings = Depends(get_settings),
+):
+    """Load the on-disk index and swap it in; in-flight requests keep the old one."""
+    previous = holder.version
+    try:
+        reloaded = await holder.reload(settings, force=force)
+    except Exception as e:
+        await logger.aerror("Index reload failed", error=str(e))
+        raise HTTPException(status_code=500, detail="Falha ao recarregar o índice")
+
+    await logger.ainfo("Index reload requested", reloaded=reloaded, version=holder.version)
+    return ReloadIndexResponse(
+        reloaded=reloaded, version=holder.version, previous_version=previous
+    )
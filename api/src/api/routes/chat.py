@@ -1,23 +1,43 @@
-"""Chat API routes: POST /chat and GET /chat/stream."""
+"""Chat API routes: POST /chat, GET /chat/stream and POST /chat/batch."""
 
 from __future__ import annotations
 
 import json
+import time
 from datetime import datetime, timezone
 
 import structlog
 from fastapi import APIRouter, Depends, HTTPException, Query, Request
-from fastapi.responses import JSONResponse
-from slowapi import Limiter
-from slowapi.util import get_remote_address
+from fastapi.responses import StreamingResponse
 from sse_starlette.sse import EventSourceResponse
 
-from src.api.dependencies import get_graph, get_settings
-from src.api.schemas import ChatRequest, ChatResponse, Source
+from src.api.dependencies import (
+    enforce_rate_limit,
+    get_batch_answerer,
+    get_graph,
+    get_history_summarizer,
+    get_settings,
+    get_tenant_index,
+    require_admin,
+)
+from src.api.schemas import ChatBatchRequest, ChatBatchResult, ChatRequest, ChatResponse, Source
 from src.config import Settings
+from src.core.admission import OverloadedError
+from src.core.metrics import CHAT_REQUEST_SECONDS, STREAM_TTFT_SECONDS, start_request
+from src.rag.tenants import TENANT_ID_PATTERN, bind_tenant, tenant_thread_id
 
-limiter = Limiter(key_func=get_remote_address)
-"""Rate limiter: 20 requests/minute per IP on chat endpoints."""
+SILENT_NODES = frozenset({"classify_intent", "both_faq", "both_search"})
+"""Graph nodes whose LLM tokens are never forwarded to the SSE stream."""
+
+PROGRESS_STAGES = {
+    "classify_intent": "classifying",
+    "faq_agent": "searching_documents",
+    "both_faq": "searching_documents",
+    "search_agent": "searching_web",
+    "both_search": "searching_web",
+    "synthesize_response": "synthesizing",
+}
+"""Graph node → stage name sent in ``progress`` events when the node starts."""
 
 logger = structlog.get_logger()
 
@@ -25,24 +45,27 @@ router = APIRouter()
 
 
 @router.post("/chat", response_model=ChatResponse)
-@limiter.limit("20/minute")
 async def chat(
     request: Request,
     body: ChatRequest,
     graph=Depends(get_graph),
+    summarizer=Depends(get_history_summarizer),
     settings: Settings = Depends(get_settings),
 ):
     """Process a chat message and return the response."""
+    await enforce_rate_limit(request, body.session_id)
+    tenant = await get_tenant_index(request, body.tenant_id)
     await logger.ainfo(
         "Chat request received",
         session_id=body.session_id,
+        tenant=body.tenant_id,
         message_length=len(body.message),
     )
 
     try:
         from langchain_core.messages import HumanMessage
 
-        config = {"configurable": {"thread_id": body.session_id}}
+        config = {"configurable": {"thread_id": tenant_thread_id(body.session_id, body.tenant_id)}}
         initial_state = {
             "messages": [HumanMessage(content=body.message)],
             "user_query": body.message,
@@ -50,10 +73,20 @@ async def chat(
             "faq_response": None,
             "search_response": None,
             "final_response": "",
-            "sources": [],
+            "sources": None,  # resets the accumulated sources for this turn
         }
 
-        result = await graph.ainvoke(initial_state, config=config)
+        start = time.perf_counter()
+        labels = start_request()
+        bind_tenant(tenant)
+        result = await graph.ainvoke(
+            initial_state, config=config, durability=settings.checkpoint_durability
+        )
+        CHAT_REQUEST_SECONDS.labels(
+            endpoint="chat", route=labels.route, cache=labels.cache
+        ).observe(time.perf_counter() - start)
+        if summarizer is not None:
+            summarizer.schedule(config)
 
         route = result.get("route", "faq").lower()
         agent_used = route if route in ("faq", "search", "both") else "faq"
@@ -69,27 +102,46 @@ async def chat(
             timestamp=datetime.now(timezone.utc),
         )
 
+    except OverloadedError as e:
+        await logger.awarning("Chat request shed", dependency=e.dependency)
+        raise HTTPException(
+            status_code=503,
+            detail="Serviço sobrecarregado. Tente novamente em instantes.",
+            headers={"Retry-After": str(e.retry_after)},
+        )
     except Exception as e:
         await logger.aerror("Chat processing failed", error=str(e))
         raise HTTPException(status_code=503, detail="Serviço temporariamente indisponível")
 
 
 @router.get("/chat/stream")
-@limiter.limit("20/minute")
 async def chat_stream(
     request: Request,
     session_id: str = Query(..., min_length=1, max_length=128),
     message: str = Query(..., min_length=1, max_length=4096),
+    progress: bool | None = Query(None),
+    tenant_id: str | None = Query(None, pattern=TENANT_ID_PATTERN),
     graph=Depends(get_graph),
+    summarizer=Depends(get_history_summarizer),
     settings: Settings = Depends(get_settings),
 ):
-    """Stream chat response via Server-Sent Events."""
+    """Stream chat response via Server-Sent Events.
+
+    With ``progress`` (default ``stream_progress_events``), a ``progress`` event is
+    sent as each stage starts, so the client has feedback before the first token.
+    """
+    await enforce_rate_limit(request, session_id)
+    tenant = await get_tenant_index(request, tenant_id)
+    send_progress = settings.stream_progress_events if progress is None else progress
 
     async def event_generator():
+        start = time.perf_counter()
+        labels = start_request()
+        bind_tenant(tenant)
         try:
             from langchain_core.messages import HumanMessage
 
-            config = {"configurable": {"thread_id": session_id}}
+            config = {"configurable": {"thread_id": tenant_thread_id(session_id, tenant_id)}}
             initial_state = {
                 "messages": [HumanMessage(content=message)],
                 "user_query": message,
@@ -97,28 +149,59 @@ async def chat_stream(
                 "faq_response": None,
                 "search_response": None,
                 "final_response": "",
-                "sources": [],
+                "sources": None,  # resets the accumulated sources for this turn
             }
 
             final_state = {}
+            streamed = False
             async for event in graph.astream_events(
-                initial_state, config=config, version="v2"
+                initial_state,
+                config=config,
+                version="v2",
+                durability=settings.checkpoint_durability,
             ):
                 if event["event"] == "on_chat_model_stream":
-                    # Filter out classify_intent tokens (route labels leak)
+                    # Filter out classify_intent tokens (route labels leak) and the
+                    # BOTH branches, which run concurrently and would interleave;
+                    # only the synthesized answer is streamed on that route.
                     node = event.get("metadata", {}).get("langgraph_node", "")
-                    if node == "classify_intent":
+                    if node in SILENT_NODES:
                         continue
                     token = event["data"]["chunk"].content
                     if token:
+                        if not streamed:
+                            STREAM_TTFT_SECONDS.labels(route=labels.route).observe(
+                                time.perf_counter() - start
+                            )
+                        streamed = True
                         yield {
                             "event": "token",
                             "data": json.dumps({"token": token}),
                         }
 
+                if (
+                    send_progress
+                    and event["event"] == "on_chain_start"
+                    and event.get("name") in PROGRESS_STAGES
+                    and event.get("metadata", {}).get("langgraph_node") == event.get("name")
+                ):
+                    yield {
+                        "event": "progress",
+                        "data": json.dumps({"stage": PROGRESS_STAGES[event["name"]]}),
+                    }
+
                 if event["event"] == "on_chain_end" and event.get("name") == "LangGraph":
                     final_state = event.get("data", {}).get("output", {})
 
+            # Responses produced without a streamed LLM call (e.g. a timed-out BOTH
+            # branch) are sent as a single token so the client still renders them.
+            final_response = final_state.get("final_response", "")
+            if not streamed and final_response:
+                yield {
+                    "event": "token",
+                    "data": json.dumps({"token": final_response}),
+                }
+
             route = final_state.get("route", "faq")
             agent_used = route.lower() if route.lower() in ("faq", "search", "both") else "faq"
 
@@ -131,7 +214,21 @@ async def chat_stream(
                     "timestamp": datetime.now(timezone.utc).isoformat(),
                 }),
             }
+            CHAT_REQUEST_SECONDS.labels(
+                endpoint="stream", route=labels.route, cache=labels.cache
+            ).observe(time.perf_counter() - start)
+            if summarizer is not None:
+                summarizer.schedule(config)
 
+        except OverloadedError as e:
+            await logger.awarning("Stream request shed", dependency=e.dependency)
+            yield {
+                "event": "error",
+                "data": json.dumps({
+                    "detail": "Serviço sobrecarregado. Tente novamente em instantes.",
+                    "retry_after": e.retry_after,
+                }),
+            }
         except Exception as e:
             await logger.aerror("Stream processing failed", error=str(e))
             yield {
@@ -140,3 +237,38 @@ async def chat_stream(
             }
 
     return EventSourceResponse(event_generator())
+
+
+@router.post("/chat/batch", dependencies=[Depends(require_admin)])
+async def chat_batch(
+    request: Request,
+    body: ChatBatchRequest,
+    answerer=Depends(get_batch_answerer),
+    settings: Settings = Depends(get_settings),
+):
+    """Answer many standalone questions; one NDJSON line per item, in completion order.
+
+    For bulk jobs, behind the admin token instead of the per-client rate limit. A
+    failed item gets a line with ``error`` and does not stop the batch. With
+    ``tenant_id``, questions are answered from that tenant's index.
+    """
+    if len(body.items) > settings.batch_max_items:
+        raise HTTPException(
+            status_code=413,
+            detail=f"Lote excede o limite de {settings.batch_max_items} perguntas",
+        )
+    tenant = await get_tenant_index(request, body.tenant_id)
+    from src.agents.batch import BatchQuestion
+
+    questions = [
+        BatchQuestion(id=item_id, message=item.message)
+        for item_id, item in zip(body.item_ids(), body.items)
+    ]
+    await logger.ainfo("Chat batch received", items=len(questions), tenant=body.tenant_id)
+
+    async def lines():
+        bind_tenant(tenant)
+        async for result in answerer.answer(questions):
+            yield ChatBatchResult(**result).model_dump_json(exclude_none=True) + "\n"
+
+    return StreamingResponse(lines(), media_type="application/x-ndjson")
@@ -3,7 +3,9 @@
 from datetime import datetime, timezone
 from typing import Literal
 
-from pydantic import BaseModel, ConfigDict, Field
+from pydantic import BaseModel, ConfigDict, Field, model_validator
+
+from src.rag.tenants import TENANT_ID_PATTERN
 
 
 class ChatRequest(BaseModel):
@@ -13,6 +15,37 @@ class ChatRequest(BaseModel):
 
     session_id: str = Field(..., min_length=1, max_length=128)
     message: str = Field(..., min_length=1, max_length=4096)
+    tenant_id: str | None = Field(None, pattern=TENANT_ID_PATTERN)
+
+
+class ChatBatchItem(BaseModel):
+    """One question of a batch; ``id`` defaults to its position in the batch."""
+
+    model_config = ConfigDict(extra="forbid")
+
+    id: str | None = Field(None, min_length=1, max_length=128)
+    message: str = Field(..., min_length=1, max_length=4096)
+
+
+class ChatBatchRequest(BaseModel):
+    """Batch chat endpoint request body."""
+
+    model_config = ConfigDict(extra="forbid")
+
+    items: list[ChatBatchItem] = Field(..., min_length=1)
+    tenant_id: str | None = Field(None, pattern=TENANT_ID_PATTERN)
+
+    def item_ids(self) -> list[str]:
+        """The id of every item: its own, or its position in the batch."""
+        return [item.id or str(i) for i, item in enumerate(self.items)]
+
+    @model_validator(mode="after")
+    def _unique_ids(self) -> "ChatBatchRequest":
+        # Results come back in completion order, matched to questions only by id
+        ids = self.item_ids()
+        if len(set(ids)) != len(ids):
+            raise ValueError("ids duplicados no lote (itens sem id usam a posição)")
+        return self
 
 
 class Source(BaseModel):
@@ -34,6 +67,31 @@ class ChatResponse(BaseModel):
     timestamp: datetime = Field(default_factory=lambda: datetime.now(timezone.utc))
 
 
+class ChatBatchResult(BaseModel):
+    """One NDJSON line of the batch response: an answer, or the error for that item."""
+
+    id: str
+    response: str | None = None
+    agent_used: Literal["faq", "search", "both"] | None = None
+    sources: list[Source] | None = None
+    error: str | None = None
+
+
+class IngestionStatus(BaseModel):
+    """Progress of the background index build."""
+
+    state: Literal[
+        "pending", "waiting_for_lock", "extracting", "chunking", "embedding", "loading",
+        "ready", "failed",
+    ]
+    pages: int = 0
+    chunks: int = 0
+    embedded: int = 0
+    to_embed: int = 0
+    error: str | None = None
+    elapsed_seconds: float = 0.0
+
+
 class HealthResponse(BaseModel):
     """Health check endpoint response."""
 
@@ -41,3 +99,12 @@ class HealthResponse(BaseModel):
     redis_connected: bool
     vectorstore_loaded: bool
     version: str
+    ingestion: IngestionStatus | None = None
+
+
+class ReloadIndexResponse(BaseModel):
+    """Admin index reload result."""
+
+    reloaded: bool
+    version: str
+    previous_version: str
@@ -18,8 +18,35 @@ class Settings(BaseSettings):
     llm_model: str = "gpt-4o-mini"
     llm_temperature: float = 0.1
 
-    # Web Search
+    # Web Search — backend: tavily | stub (offline canned results)
     tavily_api_key: SecretStr
+    search_backend: str = "tavily"
+    search_stub_latency_seconds: float = 0.0  # simulated Tavily latency for the stub
+    search_max_results: int = 5
+    search_cache_ttl_seconds: int = 600
+    search_cache_max_entries: int = 512
+
+    # Rate limiting — sliding window shared through Redis (backend: redis | memory)
+    rate_limit_enabled: bool = True
+    rate_limit_backend: str = "redis"
+    rate_limit_window_seconds: int = 60
+    rate_limit_ip_requests: int = 20
+    rate_limit_session_requests: int = 10
+
+    # Admission control — concurrent calls per upstream (0 = unbounded) and how long a
+    # call may wait for a slot before the request is rejected with 503
+    llm_max_concurrency: int = 32
+    tavily_max_concurrency: int = 16
+    admission_queue_timeout_seconds: float = 5.0
+
+    # Batch answering (POST /chat/batch, scripts/batch_chat.py) — questions routed and
+    # retrieved together per chunk; LLM/Tavily calls in flight per batch
+    batch_max_items: int = 1000
+    batch_chunk_size: int = 64
+    batch_llm_concurrency: int = 8
+
+    # Admin endpoints (e.g. index reload) — disabled while empty
+    admin_token: SecretStr = SecretStr("")
 
     # CORS
     allowed_origins: str = "http://localhost:3457"
@@ -27,14 +54,79 @@ class Settings(BaseSettings):
     # Redis
     redis_url: str = "redis://localhost:6379"
 
+    # Checkpointing — "exit" writes one checkpoint per turn instead of one per step
+    checkpoint_durability: str = "exit"  # exit | async | sync
+    checkpoint_prune_summarized: bool = True  # drop messages folded into the summary
+
     # Vector Store
     vectorstore_path: str = "./data/vectorstore"
+    # Other tenants: <tenants_path>/<tenant_id>/ holds its PDFs and its vectorstore/
+    tenants_path: str = "./data/tenants"
+    tenant_memory_budget_mb: int = 2048  # resident tenant indexes, evicted LRU
+    index_watch_interval_seconds: float = 30.0  # 0 disables hot reload polling
     embedding_model: str = "text-embedding-3-small"
 
+    # Embedding cache: LRU in memory plus optional persistent tier (memory | disk | redis)
+    embedding_cache_size: int = 2048
+    embedding_cache_backend: str = "memory"
+    embedding_cache_path: str = "./data/embedding_cache/embeddings"
+    embedding_batch_max_tokens: int = 20000
+    embedding_batch_max_items: int = 256
+    embedding_concurrency: int = 4
+    embedding_max_retries: int = 6
+    embedding_checkpoint_path: str = "./data/embedding_checkpoint"
+
     # RAG
-    chunk_size: int = 1500
+    chunking_strategy: str = "sections"  # sections | fixed
+    chunk_size: int = 1500  # fixed strategy
     chunk_overlap: int = 200
+    # Sections strategy: small child chunks are indexed, their sections fill the prompt
+    child_chunk_size: int = 400
+    child_chunk_overlap: int = 40
+    parent_max_chars: int = 4000
+    context_budget_tokens: int = 1000
+    ingest_workers: int = 0  # PDF extraction processes; 0 = one per CPU
     retrieval_top_k: int = 5
+    retrieval_fetch_k_multiplier: int = 5  # MMR candidates = top_k * multiplier
+    retrieval_lambda_mult: float = 0.6  # MMR relevance/diversity trade-off
+    # Hybrid retrieval: dense MMR + BM25 fused by reciprocal rank fusion
+    retrieval_hybrid: bool = True
+    retrieval_rrf_k: int = 60
+    retrieval_sparse_fast_path: bool = False  # full keyword match skips the query embedding
+
+    # Semantic answer cache (FAQ route): memory | redis | none
+    answer_cache_backend: str = "memory"
+    answer_cache_threshold: float = 0.95
+    answer_cache_ttl_seconds: int = 3600
+    answer_cache_max_entries: int = 1000
+
+    # Precomputed answers to canonical questions, built by the optional ingestion stage
+    # (scripts/ingest_documents.py --precompute-answers) and served from the index dir
+    precomputed_answers_enabled: bool = True
+    precomputed_answer_threshold: float = 0.92
+    precomputed_questions_path: str = "./data/canonical_questions.txt"
+
+    # Structured table lookups tried before retrieval (answers from a single table row)
+    table_lookup_enabled: bool = True
+    table_lookup_min_coverage: float = 0.6
+    table_lookup_use_llm: bool = True
+
+    # Intent fast path — local rules skip the LLM router when confident enough
+    intent_fast_path_enabled: bool = True
+    intent_fast_path_threshold: float = 0.8
+
+    # Conversation history — per-node token budgets and rolling summary trigger
+    history_budget_classifier_tokens: int = 200
+    history_budget_agent_tokens: int = 1500
+    history_summary_trigger_tokens: int = 600
+
+    # Orchestration — BOTH route runs FAQ and Search concurrently when enabled
+    both_route_parallel: bool = True
+    faq_branch_timeout: float = 30.0
+    search_branch_timeout: float = 15.0
+
+    # Streaming — emit "progress" SSE events per graph stage before the first token
+    stream_progress_events: bool = False
 
 
 def get_settings() -> Settings:
@@ -0,0 +1,137 @@
+"""Admission control: bounded concurrency per upstream with a queue deadline.
+
+Each upstream (LLM, Tavily) has its own gate, configured once per process by
+``configure_admission``. A gate admits at most ``max_concurrency`` calls at a time.
+Callers queue for a free slot for up to ``queue_timeout`` seconds. A call whose
+expected wait (queue position x recent service time) already exceeds the deadline
+is rejected at once instead of queueing. Rejections raise ``OverloadedError``, which the
+API turns into 503 + Retry-After. A burst therefore degrades into quick rejections
+instead of hundreds of concurrent calls that all hit provider 429s and time out
+together.
+
+Queue depth, in-flight calls and wait time are exported as Prometheus metrics for
+autoscaling.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import math
+import time
+from collections.abc import AsyncIterator
+from contextlib import asynccontextmanager
+from typing import TYPE_CHECKING
+
+from src.core.metrics import (
+    ADMISSION_IN_FLIGHT,
+    ADMISSION_QUEUE_DEPTH,
+    ADMISSION_REJECTED,
+    ADMISSION_WAIT_SECONDS,
+    track_call,
+)
+
+if TYPE_CHECKING:
+    from src.config import Settings
+
+# Weight of the newest sample in the moving average of service time
+SERVICE_TIME_ALPHA = 0.2
+
+
+class OverloadedError(Exception):
+    """An upstream is saturated; retry after ``retry_after`` seconds."""
+
+    def __init__(self, dependency: str, retry_after: int) -> None:
+        super().__init__(f"{dependency} is overloaded, retry after {retry_after}s")
+        self.dependency = dependency
+        self.retry_after = retry_after
+
+
+class AdmissionGate:
+    """Concurrency slots for one upstream, with a bounded wait for a slot."""
+
+    def __init__(self, dependency: str, max_concurrency: int, queue_timeout: float) -> None:
+        self.dependency = dependency
+        self.max_concurrency = max_concurrency
+        self.queue_timeout = queue_timeout
+        self.waiting = 0
+        self.in_flight = 0
+        self.service_time = 0.0
+        self._semaphore = asyncio.Semaphore(max_concurrency)
+
+    def expected_wait(self) -> float:
+        """Seconds a new caller would wait, from queue position and service time."""
+        if not self._semaphore.locked():
+            return 0.0
+        return (self.waiting + 1) / self.max_concurrency * self.service_time
+
+    def _reject(self) -> OverloadedError:
+        ADMISSION_REJECTED.labels(dependency=self.dependency).inc()
+        retry_after = max(1, math.ceil(self.expected_wait()))
+        return OverloadedError(self.dependency, retry_after)
+
+    def _set_waiting(self, delta: int) -> None:
+        self.waiting += delta
+        ADMISSION_QUEUE_DEPTH.labels(dependency=self.dependency).set(self.waiting)
+
+    def _set_in_flight(self, delta: int) -> None:
+        self.in_flight += delta
+        ADMISSION_IN_FLIGHT.labels(dependency=self.dependency).set(self.in_flight)
+
+    @asynccontextmanager
+    async def slot(self) -> AsyncIterator[None]:
+        """Hold a slot for the block; raises ``OverloadedError`` if none frees up in time."""
+        if self.expected_wait() > self.queue_timeout:
+            raise self._reject()
+
+        self._set_waiting(1)
+        start = time.perf_counter()
+        try:
+            await asyncio.wait_for(self._semaphore.acquire(), timeout=self.queue_timeout)
+        except TimeoutError:
+            raise self._reject() from None
+        finally:
+            self._set_waiting(-1)
+            ADMISSION_WAIT_SECONDS.labels(dependency=self.dependency).observe(
+                time.perf_counter() - start
+            )
+
+        self._set_in_flight(1)
+        held = time.perf_counter()
+        try:
+            yield
+        finally:
+            self._semaphore.release()
+            self._set_in_flight(-1)
+            elapsed = time.perf_counter() - held
+            self.service_time += SERVICE_TIME_ALPHA * (elapsed - self.service_time)
+
+
+_gates: dict[str, AdmissionGate] = {}
+
+
+def configure_admission(settings: Settings) -> None:
+    """Create the process-wide gates; a concurrency of 0 leaves an upstream unbounded."""
+    _gates.clear()
+    limits = {"llm": settings.llm_max_concurrency, "tavily": settings.tavily_max_concurrency}
+    for dependency, max_concurrency in limits.items():
+        if max_concurrency > 0:
+            _gates[dependency] = AdmissionGate(
+                dependency, max_concurrency, settings.admission_queue_timeout_seconds
+            )
+
+
+def get_gate(dependency: str) -> AdmissionGate | None:
+    return _gates.get(dependency)
+
+
+@asynccontextmanager
+async def external_call(dependency: str) -> AsyncIterator[None]:
+    """Admit (if ``dependency`` has a gate) and time one call to ``dependency``."""
+    gate = _gates.get(dependency)
+    if gate is None:
+        with track_call(dependency):
+            yield
+        return
+    async with gate.slot():
+        with track_call(dependency):
+            yield
@@ -4,9 +4,35 @@ from __future__ import annotations
 
 import structlog
 
+from src.state.graph_state import TRANSIENT_FIELDS
+
 logger = structlog.get_logger()
 
 
+def strip_transient_fields(checkpointer, fields: frozenset[str] = TRANSIENT_FIELDS):
+    """Drop per-turn channels from each checkpoint before the saver writes it.
+
+    The agent answers, sources and route are rewritten by every turn's input, so
+    persisting them only adds to the payload. The graph's output is unaffected:
+    it is read from memory, not from the checkpoint. ``put``/``aput`` are replaced
+    on the instance, so the saver keeps its type.
+    """
+    for method in ("put", "aput"):
+        original = getattr(checkpointer, method)
+
+        def put(config, checkpoint, metadata, new_versions, _original=original):
+            values = checkpoint.get("channel_values", {})
+            if not fields.isdisjoint(values):
+                checkpoint = {
+                    **checkpoint,
+                    "channel_values": {k: v for k, v in values.items() if k not in fields},
+                }
+            return _original(config, checkpoint, metadata, new_versions)
+
+        setattr(checkpointer, method, put)
+    return checkpointer
+
+
 async def create_checkpointer(redis_url: str):
     """Create an AsyncRedisSaver checkpointer, falling back to MemorySaver."""
     try:
@@ -20,9 +46,9 @@ async def create_checkpointer(redis_url: str):
             checkpointer = saver
             if hasattr(checkpointer, 'asetup'):
                 await checkpointer.asetup()
-        return checkpointer
+        return strip_transient_fields(checkpointer)
     except Exception as e:
         logger.warning("Redis checkpointer failed, using MemorySaver", error=str(e))
         from langgraph.checkpoint.memory import MemorySaver
 
-        return MemorySaver()
+        return strip_transient_fields(MemorySaver())
@@ -0,0 +1,232 @@
+"""Prometheus metrics: latency histograms per graph node, dependency and request.
+
+Everything is registered on the default ``prometheus_client`` registry and exported
+by ``GET /metrics``. Node timings carry the route and the answer-cache status of the
+request, so p99 can be split by path; external calls (LLM, embeddings, FAISS, BM25,
+Tavily) and checkpointer operations get their own histograms so a slow dependency
+shows up on its own instead of inside a node.
+"""
+
+from __future__ import annotations
+
+import functools
+import time
+from collections.abc import Awaitable, Callable, Iterator
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass
+from typing import TYPE_CHECKING
+
+from prometheus_client import Counter, Gauge, Histogram
+
+if TYPE_CHECKING:
+    from src.state.graph_state import GraphState
+
+# Sub-millisecond lookups up to multi-second LLM generations
+LATENCY_BUCKETS = (
+    0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0,
+)
+
+GRAPH_NODE_SECONDS = Histogram(
+    "blis_graph_node_seconds",
+    "Time spent in each LangGraph node.",
+    ["node", "route", "cache"],
+    buckets=LATENCY_BUCKETS,
+)
+EXTERNAL_CALL_SECONDS = Histogram(
+    "blis_external_call_seconds",
+    "Time spent in calls to LLM, embeddings, vector search and web search.",
+    ["dependency"],
+    buckets=LATENCY_BUCKETS,
+)
+CHECKPOINTER_SECONDS = Histogram(
+    "blis_checkpointer_seconds",
+    "Time spent reading and writing conversation checkpoints.",
+    ["operation"],
+    buckets=LATENCY_BUCKETS,
+)
+CHAT_REQUEST_SECONDS = Histogram(
+    "blis_chat_request_seconds",
+    "End-to-end chat request latency.",
+    ["endpoint", "route", "cache"],
+    buckets=LATENCY_BUCKETS,
+)
+STREAM_TTFT_SECONDS = Histogram(
+    "blis_stream_time_to_first_token_seconds",
+    "Time from request start to the first SSE token.",
+    ["route"],
+    buckets=LATENCY_BUCKETS,
+)
+
+INTENT_CLASSIFICATIONS = Counter(
+    "blis_intent_classifications",
+    "Intent classifications by route and classifier (fast_path or llm).",
+    ["route", "source"],
+)
+TABLE_LOOKUPS = Counter(
+    "blis_table_lookups",
+    "Structured table lookups by result (hit, miss).",
+    ["result"],
+)
+ANSWER_CACHE_LOOKUPS = Counter(
+    "blis_answer_cache_lookups",
+    "Semantic answer cache lookups by result (hit, miss, precomputed).",
+    ["result"],
+)
+EMBEDDING_CACHE_LOOKUPS = Counter(
+    "blis_embedding_cache_lookups",
+    "Embedding cache lookups by tier (memory, store) or miss.",
+    ["result"],
+)
+RATE_LIMITED = Counter(
+    "blis_rate_limited_requests",
+    "Requests rejected by the rate limiter, by exhausted quota (ip, session).",
+    ["scope"],
+)
+SEARCH_CACHE_LOOKUPS = Counter(
+    "blis_search_cache_lookups",
+    "Web search cache lookups by result (hit, miss, coalesced).",
+    ["result"],
+)
+TENANT_INDEX_LOOKUPS = Counter(
+    "blis_tenant_index_lookups",
+    "Tenant index lookups by result (resident, loaded).",
+    ["result"],
+)
+TENANT_INDEX_EVICTIONS = Counter(
+    "blis_tenant_index_evictions",
+    "Tenant indexes evicted to stay within the memory budget.",
+)
+TENANT_INDEX_RESIDENT_BYTES = Gauge(
+    "blis_tenant_index_resident_bytes",
+    "Estimated memory of the resident tenant indexes.",
+)
+
+ADMISSION_QUEUE_DEPTH = Gauge(
+    "blis_admission_queue_depth",
+    "Calls waiting for a concurrency slot, by dependency (llm, tavily).",
+    ["dependency"],
+)
+ADMISSION_IN_FLIGHT = Gauge(
+    "blis_admission_in_flight",
+    "Calls holding a concurrency slot, by dependency.",
+    ["dependency"],
+)
+ADMISSION_WAIT_SECONDS = Histogram(
+    "blis_admission_wait_seconds",
+    "Time spent waiting for a concurrency slot.",
+    ["dependency"],
+    buckets=LATENCY_BUCKETS,
+)
+ADMISSION_REJECTED = Counter(
+    "blis_admission_rejected",
+    "Calls rejected because their wait would exceed the queue deadline.",
+    ["dependency"],
+)
+
+
+@dataclass
+class RequestLabels:
+    """Labels learned while a request runs; shared by the nodes it goes through."""
+
+    route: str = ""
+    cache: str = "none"
+
+
+_request_labels: ContextVar[RequestLabels | None] = ContextVar("request_labels", default=None)
+
+
+def start_request() -> RequestLabels:
+    """Bind fresh labels to the current task; nodes and caches it runs fill them in.
+
+    Each request is served by its own task, so the binding ends with the request.
+    The context variable holds a mutable object, so values set inside child tasks
+    (parallel branches, ``asyncio.wait_for``) are visible to the request.
+    """
+    labels = RequestLabels()
+    _request_labels.set(labels)
+    return labels
+
+
+def current_labels() -> RequestLabels:
+    """Labels of the running request, or a throwaway set outside of one."""
+    return _request_labels.get() or RequestLabels()
+
+
+def record_answer_cache(hit: bool) -> None:
+    result = "hit" if hit else "miss"
+    ANSWER_CACHE_LOOKUPS.labels(result=result).inc()
+    current_labels().cache = result
+
+
+def record_table_lookup(hit: bool) -> None:
+    """A table lookup; a hit answers the query from one table row."""
+    TABLE_LOOKUPS.labels(result="hit" if hit else "miss").inc()
+    if hit:
+        current_labels().cache = "table"
+
+
+def record_precomputed_answer() -> None:
+    """A query answered from the precomputed canonical answers."""
+    ANSWER_CACHE_LOOKUPS.labels(result="precomputed").inc()
+    current_labels().cache = "precomputed"
+
+
+@contextmanager
+def track_call(dependency: str) -> Iterator[None]:
+    """Time one call to ``dependency`` (llm, embedding, faiss, bm25, tavily)."""
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        EXTERNAL_CALL_SECONDS.labels(dependency=dependency).observe(time.perf_counter() - start)
+
+
+def timed_node(
+    name: str, node: Callable[[GraphState], Awaitable[dict]]
+) -> Callable[[GraphState], Awaitable[dict]]:
+    """Wrap a graph node so each run is observed with the request's route and cache."""
+
+    @functools.wraps(node)
+    async def wrapper(state: GraphState) -> dict:
+        labels = current_labels()
+        start = time.perf_counter()
+        result = await node(state)
+        elapsed = time.perf_counter() - start
+        route = (result or {}).get("route") or state.get("route") or ""
+        labels.route = labels.route or route
+        GRAPH_NODE_SECONDS.labels(node=name, route=route, cache=labels.cache).observe(elapsed)
+        return result
+
+    return wrapper
+
+
+_CHECKPOINTER_METHODS = {
+    "aget_tuple": "get",
+    "aput": "put",
+    "aput_writes": "put_writes",
+}
+
+
+def instrument_checkpointer(checkpointer):
+    """Time the checkpointer's async read/write methods in place and return it.
+
+    Methods are replaced on the instance, so the saver keeps its type and the
+    graph sees it unchanged.
+    """
+    for method, operation in _CHECKPOINTER_METHODS.items():
+        original = getattr(checkpointer, method, None)
+        if original is None:
+            continue
+
+        async def timed(*args, _original=original, _operation=operation, **kwargs):
+            start = time.perf_counter()
+            try:
+                return await _original(*args, **kwargs)
+            finally:
+                CHECKPOINTER_SECONDS.labels(operation=_operation).observe(
+                    time.perf_counter() - start
+                )
+
+        setattr(checkpointer, method, timed)
+    return checkpointer
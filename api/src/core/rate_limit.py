@@ -0,0 +1,163 @@
+"""Sliding-window rate limiter shared by all workers through Redis.
+
+Each quota (per IP, per session) is a sliding-window counter: the count of the
+current fixed window plus the previous window's count weighted by how much of it
+still overlaps the sliding window. All quotas of a request are checked and
+incremented by one Lua script, so a request costs a single atomic round trip and
+is either counted against every quota or against none.
+
+When Redis is unreachable the limiter counts in process memory instead and retries
+Redis after ``REDIS_RETRY_SECONDS``, so an outage never fails or slows requests.
+"""
+
+from __future__ import annotations
+
+import math
+import time
+from dataclasses import dataclass
+
+import structlog
+
+from src.core.metrics import RATE_LIMITED
+
+logger = structlog.get_logger()
+
+REDIS_TIMEOUT_SECONDS = 0.25
+REDIS_RETRY_SECONDS = 5.0
+
+# KEYS: (current window, previous window) per quota. ARGV: previous-window weight,
+# key TTL, then one limit per quota. Returns the 1-based quota that is exceeded,
+# or 0 after counting the request against every quota.
+_SLIDING_WINDOW_LUA = """
+local weight = tonumber(ARGV[1])
+local ttl = tonumber(ARGV[2])
+local quotas = #KEYS / 2
+for i = 1, quotas do
+    local current = tonumber(redis.call('GET', KEYS[2 * i - 1]) or '0')
+    local previous = tonumber(redis.call('GET', KEYS[2 * i]) or '0')
+    if previous * weight + current + 1 > tonumber(ARGV[2 + i]) then
+        return i
+    end
+end
+for i = 1, quotas do
+    redis.call('INCR', KEYS[2 * i - 1])
+    redis.call('EXPIRE', KEYS[2 * i - 1], ttl)
+end
+return 0
+"""
+
+
+@dataclass(frozen=True)
+class Quota:
+    """``limit`` requests per window for one identity (e.g. scope "ip", key "1.2.3.4")."""
+
+    scope: str
+    key: str
+    limit: int
+
+
+@dataclass(frozen=True)
+class RateLimitDecision:
+    """Outcome of a hit; ``scope`` and ``retry_after`` are set when rejected."""
+
+    allowed: bool
+    scope: str | None = None
+    retry_after: int = 0
+
+
+class LocalWindowCounter:
+    """In-process sliding-window counters, used when Redis is unavailable."""
+
+    def __init__(self) -> None:
+        self._counts: dict[str, int] = {}
+        self._window = -1
+
+    def hit(
+        self, keys: list[tuple[str, str]], limits: list[int], weight: float, window: int
+    ) -> int:
+        if window != self._window:
+            # Only the current and previous windows are ever read
+            self._counts = {
+                key: count
+                for key, count in self._counts.items()
+                if key.endswith(f":{window - 1}")
+            }
+            self._window = window
+        for i, ((current, previous), limit) in enumerate(zip(keys, limits), start=1):
+            count = self._counts.get(previous, 0) * weight + self._counts.get(current, 0)
+            if count + 1 > limit:
+                return i
+        for current, _ in keys:
+            self._counts[current] = self._counts.get(current, 0) + 1
+        return 0
+
+
+class RateLimiter:
+    """Checks and counts requests against several quotas at once."""
+
+    def __init__(
+        self,
+        window_seconds: int = 60,
+        redis_url: str | None = None,
+        prefix: str = "blis:ratelimit",
+    ) -> None:
+        self.window_seconds = window_seconds
+        self.prefix = prefix
+        self._local = LocalWindowCounter()
+        self._redis = None
+        self._script = None
+        self._redis_retry_at = 0.0
+        if redis_url:
+            from redis.asyncio import Redis
+
+            self._redis = Redis.from_url(
+                redis_url,
+                socket_timeout=REDIS_TIMEOUT_SECONDS,
+                socket_connect_timeout=REDIS_TIMEOUT_SECONDS,
+            )
+            self._script = self._redis.register_script(_SLIDING_WINDOW_LUA)
+
+    def _keys(self, quota: Quota, window: int) -> tuple[str, str]:
+        base = f"{self.prefix}:{quota.scope}:{quota.key}"
+        return f"{base}:{window}", f"{base}:{window - 1}"
+
+    async def _hit_redis(
+        self, keys: list[tuple[str, str]], limits: list[int], weight: float
+    ) -> int | None:
+        """Run the script; None means Redis is unavailable and memory should be used."""
+        if self._script is None or time.monotonic() < self._redis_retry_at:
+            return None
+        flat_keys = [key for pair in keys for key in pair]
+        try:
+            return int(
+                await self._script(keys=flat_keys, args=[weight, 2 * self.window_seconds, *limits])
+            )
+        except Exception as e:
+            self._redis_retry_at = time.monotonic() + REDIS_RETRY_SECONDS
+            await logger.awarning("Rate limiter falling back to local counters", error=str(e))
+            return None
+
+    async def hit(self, quotas: list[Quota], now: float | None = None) -> RateLimitDecision:
+        """Count one request against every quota, unless one of them is exhausted."""
+        now = time.time() if now is None else now
+        window, offset = divmod(now, self.window_seconds)
+        window = int(window)
+        weight = 1.0 - offset / self.window_seconds
+        keys = [self._keys(quota, window) for quota in quotas]
+        limits = [quota.limit for quota in quotas]
+
+        exceeded = await self._hit_redis(keys, limits, weight)
+        if exceeded is None:
+            exceeded = self._local.hit(keys, limits, weight, window)
+        if not exceeded:
+            return RateLimitDecision(allowed=True)
+
+        scope = quotas[exceeded - 1].scope
+        RATE_LIMITED.labels(scope=scope).inc()
+        # Estimate: at the next window boundary the current count starts decaying
+        retry_after = max(1, math.ceil(self.window_seconds - offset))
+        return RateLimitDecision(allowed=False, scope=scope, retry_after=retry_after)
+
+    async def aclose(self) -> None:
+        if self._redis is not None:
+            await self._redis.aclose()
@@ -0,0 +1,17 @@
+"""Text helpers shared by classifiers, cache keys and token budgets."""
+
+import unicodedata
+
+CHARS_PER_TOKEN = 4
+
+
+def normalize_text(text: str) -> str:
+    """Lowercase, strip accents and collapse whitespace."""
+    decomposed = unicodedata.normalize("NFKD", text.casefold())
+    stripped = "".join(ch for ch in decomposed if not unicodedata.combining(ch))
+    return " ".join(stripped.split())
+
+
+def estimate_tokens(text: str) -> int:
+    """Cheap token estimate (~4 characters per token), no tokenizer download."""
+    return len(text) // CHARS_PER_TOKEN + 1
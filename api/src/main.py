@@ -1,20 +1,18 @@
 """FastAPI application entry point with lifespan management."""
 
-import os
+import asyncio
 from contextlib import asynccontextmanager
 from typing import AsyncGenerator
 
 import structlog
 from fastapi import FastAPI, Request
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import JSONResponse
-from slowapi import Limiter, _rate_limit_exceeded_handler
-from slowapi.errors import RateLimitExceeded
-from slowapi.util import get_remote_address
+from fastapi.responses import JSONResponse, Response
 
-from src.api.schemas import HealthResponse
+from src.api.schemas import HealthResponse, IngestionStatus
 from src.config import Settings, get_settings
 from src.core.logging import setup_logging
+from src.core.metrics import instrument_checkpointer
 
 logger = structlog.get_logger()
 
@@ -25,80 +23,141 @@ async def lifespan(app: FastAPI) -> AsyncGenerator[None, None]:
     settings = get_settings()
     setup_logging(debug=settings.debug)
     app.state.settings = settings
-    app.state.vectorstore = None
+    app.state.vectorstore_holder = None
+    app.state.ingestion = None
+    app.state.ingestion_task = None
+    app.state.index_watcher = None
     app.state.checkpointer = None
     app.state.graph = None
+    app.state.history_summarizer = None
+    app.state.rate_limiter = None
+    app.state.batch_answerer = None
+    app.state.tenant_registry = None
 
     log = structlog.get_logger()
     await log.ainfo("Starting application", app_name=settings.app_name, version=settings.app_version)
 
-    # Load vectorstore — auto-ingest PDF if index doesn't exist
+    # Load vectorstore — if the index doesn't exist, build it in the background and
+    # serve SEARCH-only until it is attached
+    from src.rag.index_holder import VectorStoreHolder
+
+    holder = VectorStoreHolder()
+    app.state.vectorstore_holder = holder
     try:
-        from src.rag.vectorstore import load_vectorstore
-
-        vectorstore = load_vectorstore(settings)
-        app.state.vectorstore = vectorstore
-        await log.ainfo("Vectorstore loaded successfully")
-    except FileNotFoundError:
-        await log.ainfo("Vectorstore not found, attempting auto-ingestion...")
-        try:
-            from src.rag.ingest import build_vectorstore, chunk_documents, extract_pages_with_tables
-
-            pdf_path = os.path.join("data", "manual-politicas-viagem-blis.pdf")
-            if os.path.exists(pdf_path):
-                documents = extract_pages_with_tables(pdf_path)
-                chunks = chunk_documents(documents, settings.chunk_size, settings.chunk_overlap)
-                build_vectorstore(chunks, settings)
-                app.state.vectorstore = load_vectorstore(settings)
-                await log.ainfo("Auto-ingestion complete", chunks=len(chunks))
-            else:
-                await log.awarning("PDF not found for auto-ingestion", path=pdf_path)
-        except Exception as ingest_err:
-            await log.awarning("Auto-ingestion failed", error=str(ingest_err))
+        if await holder.reload(settings):
+            await log.ainfo("Vectorstore loaded successfully", version=holder.version)
+        else:
+            from src.rag.auto_ingest import IngestionProgress, run_auto_ingest
+
+            await log.ainfo("Vectorstore not found, starting background ingestion (degraded mode)")
+            app.state.ingestion = IngestionProgress()
+            app.state.ingestion_task = asyncio.create_task(
+                run_auto_ingest(settings, holder, app.state.ingestion)
+            )
     except Exception as e:
         await log.awarning("Vectorstore not available", error=str(e))
 
+    # Other tenants' indexes are loaded on their first request
+    from src.rag.tenants import TenantRegistry
+
+    app.state.tenant_registry = TenantRegistry(settings)
+
+    # Hot reload: swap in a rebuilt index without restarting
+    if settings.index_watch_interval_seconds > 0:
+        app.state.index_watcher = asyncio.create_task(
+            holder.watch(settings, settings.index_watch_interval_seconds)
+        )
+
     # Initialize checkpointer
     try:
         from src.core.checkpointer import create_checkpointer
 
         checkpointer = await create_checkpointer(settings.redis_url)
-        app.state.checkpointer = checkpointer
+        app.state.checkpointer = instrument_checkpointer(checkpointer)
         await log.ainfo("Redis checkpointer initialized")
     except Exception as e:
         await log.awarning("Redis checkpointer not available, using MemorySaver", error=str(e))
         from langgraph.checkpoint.memory import MemorySaver
 
-        app.state.checkpointer = MemorySaver()
+        from src.core.checkpointer import strip_transient_fields
+
+        app.state.checkpointer = instrument_checkpointer(strip_transient_fields(MemorySaver()))
+
+    # Rate limiter — counters shared by every worker through Redis
+    if settings.rate_limit_enabled:
+        from src.core.rate_limit import RateLimiter
+
+        app.state.rate_limiter = RateLimiter(
+            window_seconds=settings.rate_limit_window_seconds,
+            redis_url=settings.redis_url if settings.rate_limit_backend == "redis" else None,
+        )
+
+    # Admission control — bounded concurrency towards the LLM and Tavily
+    from src.core.admission import configure_admission
+
+    configure_admission(settings)
 
     # Build graph
     try:
-        from src.agents.orchestrator import build_graph
+        from src.agents.history import HistorySummarizer
+        from src.agents.orchestrator import build_graph, create_chat_model
 
-        graph = build_graph(settings, app.state.vectorstore, app.state.checkpointer)
+        graph = build_graph(settings, holder, app.state.checkpointer)
         app.state.graph = graph
+        app.state.history_summarizer = HistorySummarizer(
+            graph, create_chat_model(settings, disable_streaming=True), settings
+        )
         await log.ainfo("LangGraph graph built successfully")
+
+        from src.agents.batch import BatchAnswerer
+
+        app.state.batch_answerer = BatchAnswerer(settings, holder)
     except Exception as e:
         await log.aerror("Failed to build graph", error=str(e))
 
     yield
 
     await log.ainfo("Shutting down application")
+    if app.state.index_watcher is not None:
+        app.state.index_watcher.cancel()
+    if app.state.ingestion_task is not None and not app.state.ingestion_task.done():
+        # The executor thread finishes on its own; the file lock is released with it
+        app.state.ingestion_task.cancel()
+    if app.state.history_summarizer is not None:
+        await app.state.history_summarizer.aclose()
+    if app.state.rate_limiter is not None:
+        await app.state.rate_limiter.aclose()
+    if app.state.tenant_registry is not None:
+        await app.state.tenant_registry.aclose()
+    from src.tools.web_search import close_search_client
+
+    await close_search_client()
+
+
+def _ingestion_status(progress) -> IngestionStatus | None:
+    """Snapshot of the background ingestion for ``/health``."""
+    if progress is None:
+        return None
+    return IngestionStatus(
+        state=progress.state,
+        pages=progress.pages,
+        chunks=progress.chunks,
+        embedded=progress.embedded,
+        to_embed=progress.to_embed,
+        error=progress.error,
+        elapsed_seconds=round(progress.elapsed_seconds, 1),
+    )
 
 
 def create_app() -> FastAPI:
     """Create and configure the FastAPI application."""
     settings = get_settings()
 
-    limiter = Limiter(key_func=get_remote_address)
-
     application = FastAPI(
         title=settings.app_name,
         version=settings.app_version,
         lifespan=lifespan,
     )
-    application.state.limiter = limiter
-    application.add_exception_handler(RateLimitExceeded, _rate_limit_exceeded_handler)
 
     # Parse allowed origins from comma-separated env var
     origins = [o.strip() for o in settings.allowed_origins.split(",") if o.strip()]
@@ -120,7 +179,8 @@ def create_app() -> FastAPI:
     @application.get("/health", response_model=HealthResponse)
     async def health_check():
         redis_connected = False
-        vectorstore_loaded = application.state.vectorstore is not None
+        holder = application.state.vectorstore_holder
+        vectorstore_loaded = holder is not None and holder.ready
 
         # Real ping to Redis instead of just isinstance check
         checkpointer = application.state.checkpointer
@@ -143,12 +203,21 @@ def create_app() -> FastAPI:
             redis_connected=redis_connected,
             vectorstore_loaded=vectorstore_loaded,
             version=settings.app_version,
+            ingestion=_ingestion_status(getattr(application.state, "ingestion", None)),
         )
 
+    @application.get("/metrics", include_in_schema=False)
+    async def metrics():
+        from prometheus_client import CONTENT_TYPE_LATEST, generate_latest
+
+        return Response(content=generate_latest(), media_type=CONTENT_TYPE_LATEST)
+
     # Register routers
+    from src.api.routes.admin import router as admin_router
     from src.api.routes.chat import router as chat_router
 
     application.include_router(chat_router, prefix="/api/v1")
+    application.include_router(admin_router, prefix="/api/v1")
 
     return application
 
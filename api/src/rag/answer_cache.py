@@ -0,0 +1,360 @@
+"""Semantic answer cache for the FAQ route.
+
+Answers are keyed on the query embedding: a new query whose cosine similarity to a
+cached one is above the threshold reuses its answer and sources without retrieval
+or an LLM call. Entries are namespaced by the vectorstore version, so rebuilding
+the index invalidates every cached answer.
+"""
+
+from __future__ import annotations
+
+import json
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import TYPE_CHECKING, Protocol
+
+import numpy as np
+import structlog
+
+from src.core.metrics import record_answer_cache
+
+if TYPE_CHECKING:
+    from langchain_core.embeddings import Embeddings
+
+    from src.config import Settings
+
+logger = structlog.get_logger()
+
+ANSWER_CACHE_PREFIX = "blis:answer_cache"
+# Rough size of a cached answer and its sources, for memory budgets
+ANSWER_ENTRY_BYTES = 2048
+# A store writes its entry right after taking its id; a gap that stays open longer
+# belongs to an entry that expired or was never written
+PENDING_ENTRY_SECONDS = 5.0
+
+
+@dataclass
+class CachedAnswer:
+    """A cached FAQ answer and the similarity of the query that matched it."""
+
+    answer: str
+    sources: list[dict]
+    similarity: float
+
+
+@dataclass
+class _Entry:
+    vector: np.ndarray
+    answer: str | None
+    sources: list[dict]
+    created_at: float
+    version: str = ""
+
+
+class AnswerCacheBackend(Protocol):
+    """Storage for (embedding, answer, sources) triples."""
+
+    async def lookup(self, vector: np.ndarray, version: str) -> CachedAnswer | None: ...
+
+    async def store(
+        self, vector: np.ndarray, answer: str, sources: list[dict], version: str
+    ) -> None: ...
+
+
+def _normalize(vector) -> np.ndarray:
+    arr = np.asarray(vector, dtype=np.float32).reshape(-1)
+    norm = float(np.linalg.norm(arr))
+    return arr / norm if norm else arr
+
+
+class _VectorIndex:
+    """Bounded NumPy similarity index with TTL and LRU eviction."""
+
+    def __init__(self, max_entries: int, ttl_seconds: float) -> None:
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self._entries: OrderedDict[str, _Entry] = OrderedDict()
+        self._ids: list[str] = []
+        self._matrix: np.ndarray | None = None
+        self._versions: np.ndarray | None = None
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def add(self, key: str, entry: _Entry) -> None:
+        self._entries[key] = entry
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+        self._matrix = None
+
+    def remove(self, key: str) -> None:
+        if self._entries.pop(key, None) is not None:
+            self._matrix = None
+
+    def clear(self) -> None:
+        self._entries.clear()
+        self._matrix = None
+
+    def retain(self, versions: list[str]) -> None:
+        """Drop the entries of every version not in ``versions``."""
+        stale = [k for k, e in self._entries.items() if e.version not in versions]
+        for key in stale:
+            del self._entries[key]
+        if stale:
+            self._matrix = None
+
+    def get(self, key: str) -> _Entry | None:
+        return self._entries.get(key)
+
+    def best_match(
+        self, vector: np.ndarray, threshold: float, version: str | None = None
+    ) -> tuple[str, float] | None:
+        """Return the most similar live entry above ``threshold`` and mark it used.
+
+        With ``version``, only entries of that version are candidates.
+        """
+        self._expire()
+        if not self._entries:
+            return None
+        if self._matrix is None:
+            self._ids = list(self._entries)
+            self._matrix = np.vstack([self._entries[k].vector for k in self._ids])
+            self._versions = np.array([self._entries[k].version for k in self._ids])
+        scores = self._matrix @ vector
+        if version is not None:
+            scores = np.where(self._versions == version, scores, -np.inf)
+        idx = int(np.argmax(scores))
+        score = float(scores[idx])
+        if score < threshold:
+            return None
+        key = self._ids[idx]
+        self._entries.move_to_end(key)
+        return key, score
+
+    def _expire(self) -> None:
+        cutoff = time.time() - self.ttl_seconds
+        expired = [k for k, e in self._entries.items() if e.created_at < cutoff]
+        for key in expired:
+            del self._entries[key]
+        if expired:
+            self._matrix = None
+
+
+class InMemoryAnswerCache:
+    """Per-process answer cache backed by a NumPy index.
+
+    Entries are tagged with their index version. During a hot swap, requests on the
+    old and the new version run side by side, so both keep their entries; those of
+    any older version are dropped once a new one shows up.
+    """
+
+    def __init__(self, threshold: float, ttl_seconds: float, max_entries: int) -> None:
+        self.threshold = threshold
+        self._index = _VectorIndex(max_entries, ttl_seconds)
+        self._versions: list[str] = []
+        self._seq = 0
+
+    def _check_version(self, version: str) -> None:
+        if version not in self._versions:
+            self._versions = [*self._versions[-1:], version]
+            self._index.retain(self._versions)
+
+    async def lookup(self, vector: np.ndarray, version: str) -> CachedAnswer | None:
+        self._check_version(version)
+        match = self._index.best_match(_normalize(vector), self.threshold, version)
+        if match is None:
+            return None
+        key, score = match
+        entry = self._index.get(key)
+        return CachedAnswer(answer=entry.answer, sources=entry.sources, similarity=score)
+
+    async def store(
+        self, vector: np.ndarray, answer: str, sources: list[dict], version: str
+    ) -> None:
+        self._check_version(version)
+        self._seq += 1
+        self._index.add(
+            str(self._seq),
+            _Entry(
+                vector=_normalize(vector),
+                answer=answer,
+                sources=sources,
+                created_at=time.time(),
+                version=version,
+            ),
+        )
+
+
+class RedisAnswerCache:
+    """Answer cache shared by all workers through Redis.
+
+    Each entry is a ``SETEX`` key holding the vector, answer and sources, so TTL is
+    enforced by Redis. Similarity search runs on a local NumPy mirror: every lookup
+    does one ``GET`` of the sequence counter and fetches only entries written since
+    the last sync. A store takes its id before its entry lands, so an id read as
+    missing is fetched again on the next syncs, for up to ``PENDING_ENTRY_SECONDS``.
+    A hit re-reads its entry so expired answers are never served.
+    """
+
+    def __init__(
+        self,
+        redis_url: str,
+        threshold: float,
+        ttl_seconds: int,
+        max_entries: int,
+        prefix: str = ANSWER_CACHE_PREFIX,
+        client=None,
+    ) -> None:
+        from redis.asyncio import Redis
+
+        self.threshold = threshold
+        self.ttl_seconds = ttl_seconds
+        self.prefix = prefix
+        # Caches sharing ``client`` share its connection pool; it is closed by its owner
+        self._redis = client if client is not None else Redis.from_url(redis_url)
+        self._mirror = _VectorIndex(max_entries, ttl_seconds)
+        self._version: str | None = None
+        self._synced_seq = 0
+        # Ids after ``_synced_seq`` read as missing, and when they were first missed
+        self._missing: dict[int, float] = {}
+
+    def _key(self, version: str, suffix: str) -> str:
+        return f"{self.prefix}:{version}:{suffix}"
+
+    async def _sync(self, version: str) -> None:
+        if version != self._version:
+            self._mirror.clear()
+            self._version = version
+            self._synced_seq = 0
+            self._missing.clear()
+        raw_seq = await self._redis.get(self._key(version, "seq"))
+        seq = int(raw_seq or 0)
+        if seq <= self._synced_seq:
+            return
+        # Only the newest ``max_entries`` can still be resident
+        start = max(self._synced_seq + 1, seq - self._mirror.max_entries + 1)
+        ids = range(start, seq + 1)
+        payloads = await self._redis.mget([self._key(version, f"entry:{i}") for i in ids])
+        now = time.monotonic()
+        synced = start - 1
+        for i, payload in zip(ids, payloads):
+            if payload is None:
+                missed_at = self._missing.setdefault(i, now)
+                # Still in flight: read it again next time, and everything after it
+                if synced == i - 1 and now - missed_at >= PENDING_ENTRY_SECONDS:
+                    synced = i
+                continue
+            if self._mirror.get(str(i)) is None:
+                data = json.loads(payload)
+                self._mirror.add(
+                    str(i),
+                    _Entry(
+                        vector=np.asarray(data["vector"], dtype=np.float32),
+                        answer=None,
+                        sources=[],
+                        created_at=data["created_at"],
+                    ),
+                )
+            if synced == i - 1:
+                synced = i
+        self._synced_seq = synced
+        self._missing = {i: t for i, t in self._missing.items() if i > synced}
+
+    async def lookup(self, vector: np.ndarray, version: str) -> CachedAnswer | None:
+        await self._sync(version)
+        match = self._mirror.best_match(_normalize(vector), self.threshold)
+        if match is None:
+            return None
+        key, score = match
+        payload = await self._redis.get(self._key(version, f"entry:{key}"))
+        if payload is None:
+            # Expired or evicted by Redis since the last sync
+            self._mirror.remove(key)
+            return None
+        data = json.loads(payload)
+        return CachedAnswer(answer=data["answer"], sources=data["sources"], similarity=score)
+
+    async def store(
+        self, vector: np.ndarray, answer: str, sources: list[dict], version: str
+    ) -> None:
+        normalized = _normalize(vector)
+        seq = await self._redis.incr(self._key(version, "seq"))
+        payload = json.dumps({
+            "vector": normalized.tolist(),
+            "answer": answer,
+            "sources": sources,
+            "created_at": time.time(),
+        })
+        async with self._redis.pipeline(transaction=False) as pipe:
+            pipe.setex(self._key(version, f"entry:{seq}"), self.ttl_seconds, payload)
+            pipe.expire(self._key(version, "seq"), self.ttl_seconds)
+            await pipe.execute()
+
+
+class SemanticAnswerCache:
+    """FAQ answer cache bound to one vectorstore version and embeddings client."""
+
+    def __init__(self, backend: AnswerCacheBackend, embeddings: Embeddings, version: str) -> None:
+        self.backend = backend
+        self.embeddings = embeddings
+        self.version = version
+
+    async def embed(self, query: str) -> np.ndarray:
+        return np.asarray(await self.embeddings.aembed_query(query), dtype=np.float32)
+
+    async def lookup(self, vector: np.ndarray) -> CachedAnswer | None:
+        try:
+            cached = await self.backend.lookup(vector, self.version)
+        except Exception as e:
+            await logger.awarning("Answer cache lookup failed", error=str(e))
+            cached = None
+        record_answer_cache(hit=cached is not None)
+        return cached
+
+    async def store(self, vector: np.ndarray, answer: str, sources: list[dict]) -> None:
+        try:
+            await self.backend.store(vector, answer, sources, self.version)
+        except Exception as e:
+            await logger.awarning("Answer cache store failed", error=str(e))
+
+
+def answer_cache_bytes(settings: Settings, dim: int) -> int:
+    """Upper bound of the process memory one backend holds once full.
+
+    The in-memory backend keeps vectors, answers and sources; the Redis backend only
+    mirrors the vectors locally.
+    """
+    if settings.answer_cache_backend == "memory":
+        return settings.answer_cache_max_entries * (dim * 4 + ANSWER_ENTRY_BYTES)
+    if settings.answer_cache_backend == "redis":
+        return settings.answer_cache_max_entries * dim * 4
+    return 0
+
+
+def create_answer_cache_backend(
+    settings: Settings, client=None, namespace: str = ""
+) -> AnswerCacheBackend | None:
+    """Create the answer cache backend selected by ``answer_cache_backend``.
+
+    For Redis, ``client`` shares an existing connection pool and ``namespace``
+    separates the keys of this cache (e.g. a tenant's) from the others.
+    """
+    backend = settings.answer_cache_backend
+    if backend == "memory":
+        return InMemoryAnswerCache(
+            threshold=settings.answer_cache_threshold,
+            ttl_seconds=settings.answer_cache_ttl_seconds,
+            max_entries=settings.answer_cache_max_entries,
+        )
+    if backend == "redis":
+        return RedisAnswerCache(
+            settings.redis_url,
+            threshold=settings.answer_cache_threshold,
+            ttl_seconds=settings.answer_cache_ttl_seconds,
+            max_entries=settings.answer_cache_max_entries,
+            prefix=f"{ANSWER_CACHE_PREFIX}:{namespace}" if namespace else ANSWER_CACHE_PREFIX,
+            client=client,
+        )
+    return None
@@ -0,0 +1,118 @@
+"""Background auto-ingestion when the API starts without an index.
+
+Ingestion runs in a worker thread so the event loop keeps serving (SEARCH-only)
+traffic while the index is built. A cross-process file lock next to the index makes
+sure only one worker of a multi-worker deployment builds it; the others wait on the
+lock and then load what the first one wrote.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import os
+import time
+from dataclasses import dataclass, field
+from typing import TYPE_CHECKING, Literal
+
+import structlog
+
+if TYPE_CHECKING:
+    from src.config import Settings
+    from src.rag.index_holder import VectorStoreHolder
+
+logger = structlog.get_logger()
+
+DEFAULT_PDF_PATH = os.path.join("data", "manual-politicas-viagem-blis.pdf")
+
+IngestionState = Literal[
+    "pending", "waiting_for_lock", "extracting", "chunking", "embedding", "loading",
+    "ready", "failed",
+]
+
+
+@dataclass
+class IngestionProgress:
+    """Progress of the background build, reported by ``/health``."""
+
+    state: IngestionState = "pending"
+    pages: int = 0
+    chunks: int = 0
+    embedded: int = 0
+    to_embed: int = 0
+    error: str | None = None
+    started_at: float = field(default_factory=time.time)
+    finished_at: float | None = None
+
+    @property
+    def elapsed_seconds(self) -> float:
+        return (self.finished_at or time.time()) - self.started_at
+
+    def record_embedding(self, embedded: int, to_embed: int) -> None:
+        self.embedded = embedded
+        self.to_embed = to_embed
+
+
+def build_index_locked(
+    settings: Settings, progress: IngestionProgress, pdf_path: str = DEFAULT_PDF_PATH
+) -> bool:
+    """Build the index under the lock unless another process already did.
+
+    Blocking; run it in an executor. Returns True if this call built the index.
+    """
+    from src.rag.ingest import build_vectorstore, chunk_for_index, extract_pages_with_tables
+    from src.rag.tables import collect_table_rows
+    from src.rag.vectorstore import index_exists, index_lock
+
+    progress.state = "waiting_for_lock"
+    with index_lock(settings.vectorstore_path):
+        if index_exists(settings.vectorstore_path):
+            logger.info("Index already built by another worker", path=settings.vectorstore_path)
+            return False
+        if not os.path.exists(pdf_path):
+            raise FileNotFoundError(f"PDF not found for auto-ingestion: {pdf_path}")
+
+        progress.state = "extracting"
+        documents = extract_pages_with_tables(pdf_path, workers=settings.ingest_workers)
+        progress.pages = len(documents)
+
+        progress.state = "chunking"
+        chunks, parents = chunk_for_index(documents, settings)
+        progress.chunks = len(chunks)
+
+        progress.state = "embedding"
+        build_vectorstore(
+            chunks,
+            settings,
+            on_progress=progress.record_embedding,
+            tables=collect_table_rows(documents),
+            parents=parents,
+        )
+        return True
+
+
+async def run_auto_ingest(
+    settings: Settings,
+    holder: VectorStoreHolder,
+    progress: IngestionProgress,
+    pdf_path: str = DEFAULT_PDF_PATH,
+) -> None:
+    """Build (or wait for) the index off the event loop, then attach it to ``holder``."""
+    loop = asyncio.get_running_loop()
+    try:
+        built = await loop.run_in_executor(None, build_index_locked, settings, progress, pdf_path)
+        progress.state = "loading"
+        if not await holder.reload(settings, force=True):
+            raise FileNotFoundError(f"Vectorstore not found at {settings.vectorstore_path}")
+        progress.state = "ready"
+        await logger.ainfo(
+            "Auto-ingestion complete, vectorstore attached",
+            built_here=built,
+            chunks=progress.chunks,
+            seconds=round(progress.elapsed_seconds, 1),
+        )
+    except Exception as e:
+        progress.state = "failed"
+        progress.error = str(e)
+        await logger.awarning("Auto-ingestion failed", error=str(e))
+    finally:
+        progress.finished_at = time.time()
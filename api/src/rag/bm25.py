@@ -0,0 +1,157 @@
+"""In-process BM25 inverted index persisted next to the FAISS index.
+
+Dense embeddings blur exact terms: fare codes, "PET", or "23kg" often rank below
+paraphrases of the question. BM25 over the same chunks catches those, and needs no
+query embedding. Rows follow FAISS row order, so a sparse hit maps to the same
+docstore id as a dense one.
+"""
+
+from __future__ import annotations
+
+import json
+import math
+import os
+import re
+from dataclasses import dataclass
+
+import numpy as np
+
+from src.core.text import normalize_text
+
+BM25_FILE = "bm25.json"
+
+_TOKEN = re.compile(r"[a-z0-9]+")
+_ALNUM_PARTS = re.compile(r"[a-z]+|[0-9]+")
+
+STOPWORDS = frozenset(
+    "a o as os e em no na nos nas de da do das dos um uma uns umas ao aos para pra por "
+    "com sem que qual quais como se ou eu meu minha posso pode ser sao esta isso"
+    .split()
+)
+
+
+def tokenize(text: str) -> list[str]:
+    """Accent-free lowercase terms; "23kg" also yields "23" and "kg" so "23 kg" matches."""
+    terms: list[str] = []
+    for token in _TOKEN.findall(normalize_text(text)):
+        if token in STOPWORDS:
+            continue
+        terms.append(token)
+        parts = _ALNUM_PARTS.findall(token)
+        if len(parts) > 1:
+            terms.extend(parts)
+    return terms
+
+
+@dataclass
+class BM25Hit:
+    """A sparse match: FAISS row, BM25 score and how many query terms it contains."""
+
+    row: int
+    score: float
+    matched_terms: int
+
+
+class BM25Index:
+    """Okapi BM25 with per-posting weights precomputed, so search is a scatter-add."""
+
+    def __init__(
+        self,
+        postings: dict[str, tuple[list[int], list[int]]],
+        doc_lengths: list[int],
+        k1: float = 1.5,
+        b: float = 0.75,
+    ) -> None:
+        self.postings = postings
+        self.doc_lengths = doc_lengths
+        self.k1 = k1
+        self.b = b
+        self._weights = self._precompute()
+
+    @classmethod
+    def build(cls, texts: list[str], k1: float = 1.5, b: float = 0.75) -> BM25Index:
+        postings: dict[str, tuple[list[int], list[int]]] = {}
+        doc_lengths = []
+        for row, text in enumerate(texts):
+            terms = tokenize(text)
+            doc_lengths.append(len(terms))
+            counts: dict[str, int] = {}
+            for term in terms:
+                counts[term] = counts.get(term, 0) + 1
+            for term, tf in counts.items():
+                rows, tfs = postings.setdefault(term, ([], []))
+                rows.append(row)
+                tfs.append(tf)
+        return cls(postings, doc_lengths, k1=k1, b=b)
+
+    def __len__(self) -> int:
+        return len(self.doc_lengths)
+
+    def _precompute(self) -> dict[str, tuple[np.ndarray, np.ndarray]]:
+        n_docs = len(self.doc_lengths)
+        lengths = np.asarray(self.doc_lengths, dtype=np.float32)
+        avgdl = float(lengths.mean()) if n_docs and lengths.mean() > 0 else 1.0
+        weights = {}
+        for term, (rows, tfs) in self.postings.items():
+            rows_arr = np.asarray(rows, dtype=np.int64)
+            tf = np.asarray(tfs, dtype=np.float32)
+            idf = math.log(1.0 + (n_docs - len(rows) + 0.5) / (len(rows) + 0.5))
+            norm = self.k1 * (1.0 - self.b + self.b * lengths[rows_arr] / avgdl)
+            weights[term] = (rows_arr, idf * tf * (self.k1 + 1.0) / (tf + norm))
+        return weights
+
+    def search(self, query: str, k: int) -> list[BM25Hit]:
+        """Top ``k`` rows by BM25 score; rows matching no query term are never returned."""
+        terms = set(tokenize(query))
+        if k <= 0 or not terms or not self.doc_lengths:
+            return []
+        scores = np.zeros(len(self.doc_lengths), dtype=np.float32)
+        matched = np.zeros(len(self.doc_lengths), dtype=np.int32)
+        for term in terms:
+            posting = self._weights.get(term)
+            if posting is None:
+                continue
+            rows, weights = posting
+            scores[rows] += weights
+            matched[rows] += 1
+
+        candidates = np.flatnonzero(matched)
+        if len(candidates) > k:
+            candidates = candidates[np.argpartition(-scores[candidates], k - 1)[:k]]
+        candidates = candidates[np.argsort(-scores[candidates], kind="stable")]
+        return [
+            BM25Hit(row=int(row), score=float(scores[row]), matched_terms=int(matched[row]))
+            for row in candidates
+        ]
+
+    def query_terms(self, query: str) -> int:
+        """Number of distinct searchable terms in ``query``."""
+        return len(set(tokenize(query)))
+
+    def save(self, index_path: str) -> None:
+        """Write ``bm25.json`` atomically (temp file + rename) into ``index_path``."""
+        tmp = os.path.join(index_path, f".{BM25_FILE}.tmp")
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(
+                {
+                    "k1": self.k1,
+                    "b": self.b,
+                    "doc_lengths": self.doc_lengths,
+                    "postings": self.postings,
+                },
+                f,
+                ensure_ascii=False,
+                separators=(",", ":"),
+            )
+        os.replace(tmp, os.path.join(index_path, BM25_FILE))
+
+    @classmethod
+    def load(cls, index_path: str) -> BM25Index | None:
+        """Load the persisted index, or None for indexes built before BM25 existed."""
+        path = os.path.join(index_path, BM25_FILE)
+        if not os.path.exists(path):
+            return None
+        with open(path, encoding="utf-8") as f:
+            data = json.load(f)
+        postings = {term: (rows, tfs) for term, (rows, tfs) in data["postings"].items()}
+        return cls(postings, data["doc_lengths"], k1=data["k1"], b=data["b"])
@@ -0,0 +1,214 @@
+"""Batched, concurrent embedding stage for ingestion.
+
+Texts are grouped into token-budgeted batches and embedded by a bounded pool of
+worker threads, so large corpora ingest at the provider's throughput limit instead
+of one serialized call. A 429 pauses every worker (honouring ``Retry-After``) and
+the batch is retried with exponential backoff. Finished batches are checkpointed to
+disk, so a run that crashes halfway resumes where it stopped.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import os
+import random
+import shutil
+import tempfile
+import threading
+import time
+from collections.abc import Iterator
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from typing import TYPE_CHECKING
+
+import numpy as np
+import structlog
+
+from src.core.text import estimate_tokens
+
+if TYPE_CHECKING:
+    from langchain_core.embeddings import Embeddings
+
+    from src.config import Settings
+
+logger = structlog.get_logger()
+
+
+def make_batches(texts: list[str], max_tokens: int, max_items: int) -> list[list[int]]:
+    """Group text positions into consecutive batches under both budgets.
+
+    A text that alone exceeds ``max_tokens`` still gets its own batch rather than
+    being dropped; the provider decides whether it fits.
+    """
+    batches: list[list[int]] = []
+    current: list[int] = []
+    used = 0
+    for i, text in enumerate(texts):
+        tokens = estimate_tokens(text)
+        if current and (used + tokens > max_tokens or len(current) >= max_items):
+            batches.append(current)
+            current, used = [], 0
+        current.append(i)
+        used += tokens
+    if current:
+        batches.append(current)
+    return batches
+
+
+class EmbeddingCheckpoint:
+    """Finished batches on disk, one ``.npz`` file (ids + vectors) per batch."""
+
+    def __init__(self, path: str, model: str) -> None:
+        self.directory = os.path.join(path, model.replace("/", "_"))
+
+    def load(self) -> dict[str, np.ndarray]:
+        vectors: dict[str, np.ndarray] = {}
+        if not os.path.isdir(self.directory):
+            return vectors
+        for name in sorted(os.listdir(self.directory)):
+            if not name.endswith(".npz"):
+                continue
+            try:
+                with np.load(os.path.join(self.directory, name)) as data:
+                    vectors.update(zip(data["ids"].tolist(), data["vectors"]))
+            except Exception as e:
+                logger.warning("Skipping unreadable embedding checkpoint", file=name, error=str(e))
+        return vectors
+
+    def save(self, ids: list[str], vectors: list[list[float]]) -> None:
+        os.makedirs(self.directory, exist_ok=True)
+        digest = hashlib.sha256("\n".join(ids).encode("utf-8")).hexdigest()[:16]
+        # Write-then-rename so a crash never leaves a truncated batch behind
+        fd, tmp = tempfile.mkstemp(dir=self.directory, suffix=".tmp")
+        with os.fdopen(fd, "wb") as f:
+            np.savez(f, ids=np.asarray(ids), vectors=np.asarray(vectors, dtype=np.float32))
+        os.replace(tmp, os.path.join(self.directory, f"batch-{digest}.npz"))
+
+    def clear(self) -> None:
+        shutil.rmtree(self.directory, ignore_errors=True)
+
+
+def _rate_limit_delay(error: Exception) -> float | None:
+    """Provider-requested wait for a 429 (0 if unspecified), None for other errors."""
+    response = getattr(error, "response", None)
+    status = getattr(error, "status_code", None) or getattr(response, "status_code", None)
+    if status != 429:
+        return None
+    try:
+        return float(response.headers.get("retry-after"))
+    except (AttributeError, TypeError, ValueError):
+        return 0.0
+
+
+class _RateLimitGate:
+    """Shared pause so one 429 backs off every worker, not just the one that hit it."""
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._resume_at = 0.0
+
+    def pause(self, seconds: float) -> None:
+        with self._lock:
+            self._resume_at = max(self._resume_at, time.monotonic() + seconds)
+
+    def wait(self) -> None:
+        delay = self._resume_at - time.monotonic()
+        if delay > 0:
+            time.sleep(delay)
+
+
+class BatchEmbedder:
+    """Embeds texts in concurrent, token-budgeted batches with retry and checkpoints."""
+
+    def __init__(
+        self,
+        embeddings: Embeddings,
+        max_tokens: int = 20_000,
+        max_items: int = 256,
+        concurrency: int = 4,
+        max_retries: int = 6,
+        checkpoint: EmbeddingCheckpoint | None = None,
+        base_delay: float = 1.0,
+        max_delay: float = 60.0,
+    ) -> None:
+        self.embeddings = embeddings
+        self.max_tokens = max_tokens
+        self.max_items = max_items
+        self.concurrency = max(1, concurrency)
+        self.max_retries = max_retries
+        self.checkpoint = checkpoint
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.batches = 0
+        self.rate_limited = 0
+        self._gate = _RateLimitGate()
+
+    def _embed_batch(self, ids: list[str], texts: list[str]) -> list[list[float]]:
+        for attempt in range(self.max_retries + 1):
+            self._gate.wait()
+            try:
+                vectors = self.embeddings.embed_documents(texts)
+            except Exception as e:
+                requested = _rate_limit_delay(e)
+                if requested is None or attempt == self.max_retries:
+                    raise
+                backoff = min(self.max_delay, self.base_delay * 2**attempt)
+                delay = max(requested, backoff * random.uniform(0.5, 1.0))
+                self.rate_limited += 1
+                logger.warning(
+                    "Embedding rate limited, backing off",
+                    attempt=attempt + 1,
+                    seconds=round(delay, 2),
+                )
+                self._gate.pause(delay)
+                continue
+            if self.checkpoint is not None:
+                self.checkpoint.save(ids, vectors)
+            self.batches += 1
+            return vectors
+        raise AssertionError("unreachable")
+
+    def embed(
+        self, ids: list[str], texts: list[str]
+    ) -> Iterator[tuple[list[str], list[list[float]]]]:
+        """Yield ``(ids, vectors)`` per batch as batches finish, in completion order.
+
+        Vectors already in the checkpoint are yielded first without calling the
+        provider. If a batch fails for good, batches already in flight are allowed to
+        finish (and checkpoint) before the error propagates.
+        """
+        done = self.checkpoint.load() if self.checkpoint is not None else {}
+        resumed = [chunk_id for chunk_id in ids if chunk_id in done]
+        if resumed:
+            logger.info("Resuming embeddings from checkpoint", chunks=len(resumed))
+            yield resumed, [done[chunk_id] for chunk_id in resumed]
+
+        pending = [i for i, chunk_id in enumerate(ids) if chunk_id not in done]
+        batches = make_batches([texts[i] for i in pending], self.max_tokens, self.max_items)
+        if not batches:
+            return
+
+        pool = ThreadPoolExecutor(max_workers=min(self.concurrency, len(batches)))
+        try:
+            futures = {}
+            for batch in batches:
+                batch_ids = [ids[pending[i]] for i in batch]
+                batch_texts = [texts[pending[i]] for i in batch]
+                futures[pool.submit(self._embed_batch, batch_ids, batch_texts)] = batch_ids
+            for future in as_completed(futures):
+                yield futures[future], future.result()
+        finally:
+            pool.shutdown(wait=True, cancel_futures=True)
+
+
+def create_batch_embedder(embeddings: Embeddings, settings: Settings) -> BatchEmbedder:
+    """Build the ingestion embedder from settings, checkpointing per embedding model."""
+    return BatchEmbedder(
+        embeddings,
+        max_tokens=settings.embedding_batch_max_tokens,
+        max_items=settings.embedding_batch_max_items,
+        concurrency=settings.embedding_concurrency,
+        max_retries=settings.embedding_max_retries,
+        checkpoint=EmbeddingCheckpoint(
+            settings.embedding_checkpoint_path, settings.embedding_model
+        ),
+    )
@@ -0,0 +1,262 @@
+"""Shared, caching embeddings client for ingestion and query time.
+
+``CachedEmbeddings`` wraps ``OpenAIEmbeddings`` with a bounded in-memory LRU and an
+optional persistent tier (on-disk key/value file or Redis). Keys combine the model
+name with the text: queries are normalized (case, whitespace, accents) so trivially
+different phrasings share one embedding, while documents are keyed on their exact
+content.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import dbm
+import hashlib
+import os
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import TYPE_CHECKING, Protocol
+
+import numpy as np
+import structlog
+from langchain_core.embeddings import Embeddings
+
+from src.core.metrics import EMBEDDING_CACHE_LOOKUPS, track_call
+from src.core.text import normalize_text
+
+if TYPE_CHECKING:
+    from src.config import Settings
+
+logger = structlog.get_logger()
+
+
+class EmbeddingStore(Protocol):
+    """Persistent key/value tier for embeddings (float32 bytes)."""
+
+    def get_many(self, keys: list[str]) -> list[bytes | None]: ...
+
+    def set_many(self, items: dict[str, bytes]) -> None: ...
+
+
+class DiskEmbeddingStore:
+    """Embeddings persisted in a local ``dbm`` key/value file."""
+
+    def __init__(self, path: str) -> None:
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        self._db = dbm.open(path, "c")
+        self._lock = threading.Lock()
+
+    def get_many(self, keys: list[str]) -> list[bytes | None]:
+        with self._lock:
+            return [self._db.get(key) for key in keys]
+
+    def set_many(self, items: dict[str, bytes]) -> None:
+        with self._lock:
+            for key, value in items.items():
+                self._db[key] = value
+
+
+class RedisEmbeddingStore:
+    """Embeddings persisted in Redis, shared by all workers."""
+
+    def __init__(self, redis_url: str, ttl_seconds: int | None = None) -> None:
+        from redis import Redis
+
+        self._redis = Redis.from_url(redis_url)
+        self.ttl_seconds = ttl_seconds
+
+    def get_many(self, keys: list[str]) -> list[bytes | None]:
+        return self._redis.mget([f"blis:emb:{key}" for key in keys])
+
+    def set_many(self, items: dict[str, bytes]) -> None:
+        with self._redis.pipeline(transaction=False) as pipe:
+            for key, value in items.items():
+                pipe.set(f"blis:emb:{key}", value, ex=self.ttl_seconds)
+            pipe.execute()
+
+
+@dataclass
+class EmbeddingCacheStats:
+    """Hit/miss counters for the embeddings cache."""
+
+    memory_hits: int = 0
+    store_hits: int = 0
+    misses: int = 0
+
+    @property
+    def hit_rate(self) -> float:
+        total = self.memory_hits + self.store_hits + self.misses
+        return (self.memory_hits + self.store_hits) / total if total else 0.0
+
+
+class CachedEmbeddings(Embeddings):
+    """Embeddings wrapper with an LRU memory tier and optional persistent tier."""
+
+    def __init__(
+        self,
+        underlying: Embeddings,
+        model: str,
+        max_entries: int = 2048,
+        store: EmbeddingStore | None = None,
+    ) -> None:
+        self.underlying = underlying
+        self.model = model
+        self.max_entries = max_entries
+        self.store = store
+        self.stats = EmbeddingCacheStats()
+        self._memory: OrderedDict[str, list[float]] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def _key(self, text: str, normalize: bool) -> str:
+        content = normalize_text(text) if normalize else text
+        digest = hashlib.sha256(content.encode("utf-8")).hexdigest()
+        return f"{self.model}:{digest}"
+
+    def _remember(self, key: str, vector: list[float]) -> None:
+        with self._lock:
+            self._memory[key] = vector
+            self._memory.move_to_end(key)
+            while len(self._memory) > self.max_entries:
+                self._memory.popitem(last=False)
+
+    def _lookup(self, keys: list[str]) -> dict[str, list[float]]:
+        """Resolve keys from memory, then from the persistent tier."""
+        found: dict[str, list[float]] = {}
+        with self._lock:
+            for key in keys:
+                if key in self._memory:
+                    self._memory.move_to_end(key)
+                    found[key] = self._memory[key]
+        self.stats.memory_hits += len(found)
+        EMBEDDING_CACHE_LOOKUPS.labels(result="memory").inc(len(found))
+
+        pending = [key for key in keys if key not in found]
+        if pending and self.store is not None:
+            try:
+                values = self.store.get_many(pending)
+            except Exception as e:
+                logger.warning("Embedding store read failed", error=str(e))
+                values = [None] * len(pending)
+            for key, raw in zip(pending, values):
+                if raw is not None:
+                    vector = np.frombuffer(raw, dtype=np.float32).tolist()
+                    found[key] = vector
+                    self._remember(key, vector)
+                    self.stats.store_hits += 1
+                    EMBEDDING_CACHE_LOOKUPS.labels(result="store").inc()
+        return found
+
+    def _save(self, computed: dict[str, list[float]]) -> None:
+        for key, vector in computed.items():
+            self._remember(key, vector)
+        if self.store is not None and computed:
+            try:
+                self.store.set_many({
+                    key: np.asarray(vector, dtype=np.float32).tobytes()
+                    for key, vector in computed.items()
+                })
+            except Exception as e:
+                logger.warning("Embedding store write failed", error=str(e))
+
+    def _misses(self, keys: list[str], texts: list[str], found: dict) -> dict[str, str]:
+        # Dedupe within the batch so each unique text is embedded once
+        missing = {key: text for key, text in zip(keys, texts) if key not in found}
+        self.stats.misses += len(missing)
+        EMBEDDING_CACHE_LOOKUPS.labels(result="miss").inc(len(missing))
+        return missing
+
+    def embed_documents(self, texts: list[str]) -> list[list[float]]:
+        keys = [self._key(text, normalize=False) for text in texts]
+        found = self._lookup(keys)
+        missing = self._misses(keys, texts, found)
+        if missing:
+            with track_call("embedding"):
+                vectors = self.underlying.embed_documents(list(missing.values()))
+            computed = dict(zip(missing, vectors))
+            self._save(computed)
+            found.update(computed)
+        return [found[key] for key in keys]
+
+    def embed_query(self, text: str) -> list[float]:
+        key = self._key(text, normalize=True)
+        found = self._lookup([key])
+        if key not in found:
+            self.stats.misses += 1
+            EMBEDDING_CACHE_LOOKUPS.labels(result="miss").inc()
+            with track_call("embedding"):
+                found[key] = self.underlying.embed_query(text)
+            self._save({key: found[key]})
+        return found[key]
+
+    async def _alookup(self, keys: list[str]) -> dict[str, list[float]]:
+        # The persistent tier does blocking I/O, keep it off the event loop
+        if self.store is None:
+            return self._lookup(keys)
+        return await asyncio.to_thread(self._lookup, keys)
+
+    async def _asave(self, computed: dict[str, list[float]]) -> None:
+        if self.store is None:
+            self._save(computed)
+        else:
+            await asyncio.to_thread(self._save, computed)
+
+    async def aembed_documents(self, texts: list[str]) -> list[list[float]]:
+        keys = [self._key(text, normalize=False) for text in texts]
+        found = await self._alookup(keys)
+        missing = self._misses(keys, texts, found)
+        if missing:
+            with track_call("embedding"):
+                vectors = await self.underlying.aembed_documents(list(missing.values()))
+            computed = dict(zip(missing, vectors))
+            await self._asave(computed)
+            found.update(computed)
+        return [found[key] for key in keys]
+
+    async def aembed_query(self, text: str) -> list[float]:
+        key = self._key(text, normalize=True)
+        found = await self._alookup([key])
+        if key not in found:
+            self.stats.misses += 1
+            EMBEDDING_CACHE_LOOKUPS.labels(result="miss").inc()
+            with track_call("embedding"):
+                found[key] = await self.underlying.aembed_query(text)
+            await self._asave({key: found[key]})
+        return found[key]
+
+
+_shared: dict[str, CachedEmbeddings] = {}
+_shared_lock = threading.Lock()
+
+
+def _create_store(settings: Settings) -> EmbeddingStore | None:
+    backend = settings.embedding_cache_backend
+    try:
+        if backend == "disk":
+            return DiskEmbeddingStore(settings.embedding_cache_path)
+        if backend == "redis":
+            return RedisEmbeddingStore(settings.redis_url)
+    except Exception as e:
+        logger.warning("Embedding store unavailable, using memory only", error=str(e))
+    return None
+
+
+def get_embeddings(settings: Settings) -> CachedEmbeddings:
+    """Return the process-wide caching embeddings client for the configured model."""
+    from langchain_openai import OpenAIEmbeddings
+
+    with _shared_lock:
+        client = _shared.get(settings.embedding_model)
+        if client is None:
+            underlying = OpenAIEmbeddings(
+                model=settings.embedding_model,
+                openai_api_key=settings.openai_api_key.get_secret_value(),
+            )
+            client = CachedEmbeddings(
+                underlying,
+                model=settings.embedding_model,
+                max_entries=settings.embedding_cache_size,
+                store=_create_store(settings),
+            )
+            _shared[settings.embedding_model] = client
+        return client
@@ -0,0 +1,180 @@
+"""Versioned, hot-swappable reference to the active vectorstore.
+
+The graph reads the vectorstore through a holder instead of capturing it when it is
+built, so a new index is picked up without restarting the process. Each request
+reads one ``IndexSnapshot`` and keeps using it until it finishes, while new requests
+see whatever was attached last: a swap is a single reference assignment, and the
+old memory-mapped index stays valid for as long as a request still holds it.
+
+While the holder is empty the API runs in degraded mode and answers every question
+through web search.
+"""
+
+from __future__ import annotations
+
+import asyncio
+from dataclasses import dataclass
+from typing import TYPE_CHECKING
+
+import structlog
+
+if TYPE_CHECKING:
+    from langchain_community.vectorstores import FAISS
+
+    from src.config import Settings
+    from src.rag.bm25 import BM25Index
+    from src.rag.precomputed import PrecomputedAnswers
+    from src.rag.retrieval import RetrievalEngine
+    from src.rag.sections import ParentStore
+    from src.rag.tables import TableStore
+
+logger = structlog.get_logger()
+
+
+@dataclass(frozen=True)
+class IndexSnapshot:
+    """One loaded index, its BM25 companion and the version of the files behind them.
+
+    ``engine`` is the retrieval engine for this version, built once on attach.
+    ``answers`` are the precomputed canonical answers built with this index, if any,
+    and ``tables`` the structured table rows of the same build. ``parents`` are the
+    sections the indexed child chunks expand to, when built with section chunking.
+    """
+
+    vectorstore: FAISS | None = None
+    version: str = ""
+    bm25: BM25Index | None = None
+    engine: RetrievalEngine | None = None
+    answers: PrecomputedAnswers | None = None
+    tables: TableStore | None = None
+    parents: ParentStore | None = None
+
+    @classmethod
+    def create(
+        cls,
+        vectorstore: FAISS | None,
+        version: str = "",
+        bm25: BM25Index | None = None,
+        answers: PrecomputedAnswers | None = None,
+        tables: TableStore | None = None,
+        parents: ParentStore | None = None,
+    ) -> IndexSnapshot:
+        from src.rag.retrieval import RetrievalEngine
+
+        engine = RetrievalEngine(vectorstore, bm25, parents) if vectorstore is not None else None
+        return cls(vectorstore, version, bm25, engine, answers, tables, parents)
+
+
+def load_snapshot(settings: Settings) -> IndexSnapshot:
+    """Load the on-disk index under a shared lock so a build can't interleave.
+
+    Indexes persisted before BM25 existed get their sparse index built on load.
+    Precomputed answers are loaded only if they were built from this index. The
+    table store is copied into memory, so it is read under the same lock.
+    """
+    from src.rag.bm25 import BM25Index
+    from src.rag.precomputed import PrecomputedAnswers
+    from src.rag.sections import ParentStore
+    from src.rag.tables import TableStore
+    from src.rag.vectorstore import get_index_version, index_lock, load_vectorstore
+
+    path = settings.vectorstore_path
+    answers = tables = None
+    with index_lock(path, shared=True):
+        vectorstore = load_vectorstore(settings)
+        bm25 = BM25Index.load(path)
+        parents = ParentStore.load(path)
+        version = get_index_version(path)
+        if settings.precomputed_answers_enabled:
+            ids = [vectorstore.index_to_docstore_id[row] for row in range(vectorstore.index.ntotal)]
+            answers = PrecomputedAnswers.load(path, ids, settings.embedding_model)
+        if settings.table_lookup_enabled:
+            tables = TableStore.load(path)
+    if bm25 is None:
+        bm25 = BM25Index.build([
+            vectorstore.docstore.search(vectorstore.index_to_docstore_id[row]).page_content
+            for row in range(vectorstore.index.ntotal)
+        ])
+    return IndexSnapshot.create(vectorstore, version, bm25, answers, tables, parents)
+
+
+class VectorStoreHolder:
+    """Mutable slot for the current ``IndexSnapshot``."""
+
+    def __init__(self, vectorstore: FAISS | None = None, version: str = "") -> None:
+        self._current = IndexSnapshot.create(vectorstore, version)
+        self._reload_lock = asyncio.Lock()
+        self.swaps = 0
+
+    @property
+    def current(self) -> IndexSnapshot:
+        return self._current
+
+    @property
+    def vectorstore(self) -> FAISS | None:
+        return self._current.vectorstore
+
+    @property
+    def version(self) -> str:
+        return self._current.version
+
+    @property
+    def ready(self) -> bool:
+        return self._current.vectorstore is not None
+
+    @property
+    def bm25(self) -> BM25Index | None:
+        return self._current.bm25
+
+    def attach(
+        self,
+        vectorstore: FAISS,
+        version: str,
+        bm25: BM25Index | None = None,
+        answers: PrecomputedAnswers | None = None,
+        tables: TableStore | None = None,
+        parents: ParentStore | None = None,
+    ) -> None:
+        """Make ``vectorstore`` the one served to new requests."""
+        self.attach_snapshot(
+            IndexSnapshot.create(vectorstore, version, bm25, answers, tables, parents)
+        )
+
+    def attach_snapshot(self, snapshot: IndexSnapshot) -> None:
+        """Serve an already built ``snapshot`` to new requests, reusing its engine."""
+        self._current = snapshot
+        self.swaps += 1
+
+    async def reload(self, settings: Settings, force: bool = False) -> bool:
+        """Load and attach the on-disk index if its version differs from the current one.
+
+        Loading happens in a worker thread; requests keep being served from the
+        current snapshot meanwhile. Returns True if a new snapshot was attached.
+        """
+        from src.rag.vectorstore import get_index_version, index_exists
+
+        async with self._reload_lock:
+            path = settings.vectorstore_path
+            if not index_exists(path):
+                return False
+            if not force and get_index_version(path) == self.version:
+                return False
+
+            previous = self.version
+            snapshot = await asyncio.get_running_loop().run_in_executor(
+                None, load_snapshot, settings
+            )
+            self.attach_snapshot(snapshot)
+            await logger.ainfo(
+                "Vectorstore swapped", version=snapshot.version, previous_version=previous
+            )
+            return True
+
+    async def watch(self, settings: Settings, interval: float) -> None:
+        """Poll the index directory every ``interval`` seconds and reload on change."""
+        while True:
+            await asyncio.sleep(interval)
+            try:
+                await self.reload(settings)
+            except Exception as e:
+                await logger.awarning("Vectorstore reload failed", error=str(e))
@@ -2,83 +2,180 @@
 
 from __future__ import annotations
 
+import hashlib
+import json
+import multiprocessing
 import os
+import re
+from collections import Counter
+from collections.abc import Callable
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
 from typing import TYPE_CHECKING
 
 import pdfplumber
 import structlog
 from langchain_core.documents import Document
-from langchain_openai import OpenAIEmbeddings
 from langchain_text_splitters import RecursiveCharacterTextSplitter
 
 if TYPE_CHECKING:
     from src.config import Settings
+    from src.rag.tables import TableRow
 
 logger = structlog.get_logger()
 
+# Page metadata key holding the page's tables as rows of cells (see ``rag.tables``)
+TABLES_KEY = "tables"
+# Starting a worker costs ~0.3s; smaller documents are faster to extract serially
+PAGES_PER_SHARD_MIN = 8
+# A heading is bold and at least this much larger than the page's body text
+HEADING_SIZE_RATIO = 1.2
+HEADING_MAX_CHARS = 120
+MARKDOWN_HEADING = re.compile(r"^(#{1,6}) (.+)$")
+_NUMBERED_HEADING = re.compile(r"^(\d{1,2}(?:\.\d{1,2})*)\.?\s")
 
-def extract_pages_with_tables(pdf_path: str) -> list[Document]:
-    """Extract text from PDF preserving table structure using pdfplumber."""
-    documents = []
 
+def _table_markdown(rows: list[list[str]]) -> str:
+    """A table as markdown; its first row is the header."""
+    md_rows = ["| " + " | ".join(cells) + " |" for cells in rows]
+    md_rows.insert(1, "| " + " | ".join(["---"] * len(rows[0])) + " |")
+    return "\n".join(md_rows)
+
+
+def _heading_level(text: str) -> int:
+    """Depth of a heading from its numbering ("1." → 1, "1.2" → 2); unnumbered → 1."""
+    match = _NUMBERED_HEADING.match(text)
+    return min(match.group(1).count(".") + 1, 6) if match else 1
+
+
+def _page_lines(page, table_boxes: list[tuple]) -> list[tuple[float, str]]:
+    """Text lines outside the tables, with headings marked as markdown (``## 1.1 ...``).
+
+    A heading is a bold line set larger than the page's body text, the most common
+    character size on the page.
+    """
+    lines = page.extract_text_lines()
+    sizes = Counter(round(char["size"]) for line in lines for char in line["chars"])
+    body_size = sizes.most_common(1)[0][0] if sizes else 0
+    result = []
+    for line in lines:
+        x = (line["x0"] + line["x1"]) / 2
+        y = (line["top"] + line["bottom"]) / 2
+        if any(x0 <= x <= x1 and top <= y <= bottom for x0, top, x1, bottom in table_boxes):
+            continue
+        text = line["text"]
+        first = line["chars"][0]
+        if (
+            "Bold" in first["fontname"]
+            and first["size"] >= body_size * HEADING_SIZE_RATIO
+            and len(text) <= HEADING_MAX_CHARS
+        ):
+            text = "#" * _heading_level(text) + " " + text
+        result.append((line["top"], text))
+    return result
+
+
+def _page_to_document(page, page_number: int, source: str) -> Document | None:
+    """Extract one pdfplumber page into a Document (text + tables as markdown).
+
+    Each table replaces the text lines it covers, at its place on the page, so its
+    content appears once and within its section. Section headings are marked as
+    markdown headings. The cleaned tables are also kept as rows of cells under
+    ``TABLES_KEY``.
+    """
+    blocks: list[tuple[float, str, bool]] = []
+    page_tables: list[list[list[str]]] = []
+    boxes = []
+    for table in page.find_tables():
+        rows = [[str(cell).strip() if cell else "" for cell in row] for row in table.extract()]
+        if not rows:
+            continue
+        page_tables.append(rows)
+        boxes.append(table.bbox)
+        blocks.append((table.bbox[1], _table_markdown(rows), True))
+    blocks += [(top, text, False) for top, text in _page_lines(page, boxes)]
+    blocks.sort(key=lambda block: block[0])
+
+    # Tables are paragraphs of their own; text lines keep their line breaks
+    combined = ""
+    previous_table = False
+    for _, text, is_table in blocks:
+        if combined:
+            combined += "\n\n" if is_table or previous_table else "\n"
+        combined += text
+        previous_table = is_table
+
+    if not combined.strip():
+        return None
+    metadata = {
+        "page_number": page_number,
+        "source": source,
+        "section": _detect_section(combined),
+    }
+    if page_tables:
+        metadata[TABLES_KEY] = page_tables
+    return Document(page_content=combined, metadata=metadata)
+
+
+def _extract_page_range(pdf_path: str, start: int, end: int) -> list[Document]:
+    """Extract pages ``[start, end)``; runs in a worker process with its own PDF handle."""
+    documents = []
+    source = os.path.basename(pdf_path)
     with pdfplumber.open(pdf_path) as pdf:
-        for i, page in enumerate(pdf.pages):
-            page_number = i + 1
-            page_text_parts = []
-
-            # Extract tables and convert to markdown
-            tables = page.extract_tables()
-            table_regions = []
-
-            for table in tables:
-                if not table:
-                    continue
-
-                # Convert table to markdown format
-                md_rows = []
-                for row_idx, row in enumerate(table):
-                    cells = [str(cell).strip() if cell else "" for cell in row]
-                    md_row = "| " + " | ".join(cells) + " |"
-                    md_rows.append(md_row)
-
-                    # Add separator after header
-                    if row_idx == 0:
-                        separator = "| " + " | ".join(["---"] * len(cells)) + " |"
-                        md_rows.append(separator)
-
-                if md_rows:
-                    page_text_parts.append("\n".join(md_rows))
-
-            # Extract full page text
-            full_text = page.extract_text()
-            if full_text:
-                # If we have tables, combine table markdown with text
-                if page_text_parts:
-                    combined = full_text + "\n\n" + "\n\n".join(page_text_parts)
-                else:
-                    combined = full_text
-            else:
-                combined = "\n\n".join(page_text_parts) if page_text_parts else ""
-
-            if combined.strip():
-                doc = Document(
-                    page_content=combined,
-                    metadata={
-                        "page_number": page_number,
-                        "source": os.path.basename(pdf_path),
-                        "section": _detect_section(combined),
-                    },
-                )
+        for i in range(start, min(end, len(pdf.pages))):
+            doc = _page_to_document(pdf.pages[i], i + 1, source)
+            if doc is not None:
                 documents.append(doc)
-
+            # pdfplumber caches parsed layout objects per page; free them as we go
+            pdf.pages[i].close()
     return documents
 
 
+def page_count(pdf_path: str) -> int:
+    """Number of pages in the PDF."""
+    with pdfplumber.open(pdf_path) as pdf:
+        return len(pdf.pages)
+
+
+def extract_pages_with_tables(pdf_path: str, workers: int = 1) -> list[Document]:
+    """Extract text from PDF preserving table structure using pdfplumber.
+
+    pdfplumber is CPU-bound pure Python, so with ``workers > 1`` contiguous page
+    ranges are sharded across a process pool. Shards are merged in page order, so
+    the result is identical to the serial path. ``workers=0`` uses every CPU.
+
+    Workers are spawned, not forked: auto-ingestion calls this from a thread of the
+    running server, and a forked child can inherit locks held by its other threads.
+    """
+    if workers == 0:
+        workers = os.cpu_count() or 1
+    total = page_count(pdf_path)
+    if workers <= 1 or total < 2 * PAGES_PER_SHARD_MIN:
+        return _extract_page_range(pdf_path, 0, total)
+
+    # Several shards per worker keeps the pool busy when pages vary in cost
+    shard_size = max(PAGES_PER_SHARD_MIN, -(-total // (workers * 4)))
+    starts = list(range(0, total, shard_size))
+    with ProcessPoolExecutor(
+        max_workers=min(workers, len(starts)), mp_context=multiprocessing.get_context("spawn")
+    ) as pool:
+        shards = pool.map(
+            _extract_page_range,
+            [pdf_path] * len(starts),
+            starts,
+            [start + shard_size for start in starts],
+        )
+        return [doc for shard in shards for doc in shard]
+
+
 def _detect_section(text: str) -> str:
-    """Attempt to detect section title from text content."""
-    lines = text.strip().split("\n")
+    """Section title of a page: its first heading, else its first short line."""
+    lines = [line.strip() for line in text.strip().split("\n")]
+    for line in lines:
+        match = MARKDOWN_HEADING.match(line)
+        if match:
+            return match.group(2)
     for line in lines[:3]:
-        line = line.strip()
         # Look for numbered sections or headers
         if line and len(line) < 100 and not line.startswith("|"):
             return line
@@ -90,7 +187,17 @@ def chunk_documents(
     chunk_size: int = 1500,
     chunk_overlap: int = 200,
 ) -> list[Document]:
-    """Split documents into chunks preserving table integrity."""
+    """Split documents into chunks preserving table integrity.
+
+    Structured tables stay on the page documents; chunks don't carry them.
+    """
+    documents = [
+        Document(
+            page_content=doc.page_content,
+            metadata={k: v for k, v in doc.metadata.items() if k != TABLES_KEY},
+        )
+        for doc in documents
+    ]
     splitter = RecursiveCharacterTextSplitter(
         chunk_size=chunk_size,
         chunk_overlap=chunk_overlap,
@@ -102,24 +209,180 @@ def chunk_documents(
     return chunks
 
 
+def chunk_for_index(
+    documents: list[Document], settings: Settings
+) -> tuple[list[Document], list[Document] | None]:
+    """Chunks to index with ``chunking_strategy``, plus their parent sections if any."""
+    if settings.chunking_strategy == "sections":
+        from src.rag.sections import chunk_sections
+
+        return chunk_sections(
+            documents,
+            settings.child_chunk_size,
+            settings.child_chunk_overlap,
+            settings.parent_max_chars,
+        )
+    return chunk_documents(documents, settings.chunk_size, settings.chunk_overlap), None
+
+
+def chunk_hash(chunk: Document) -> str:
+    """Content hash of a chunk: its text plus metadata (page, section, source)."""
+    payload = json.dumps(
+        {"text": chunk.page_content, "metadata": chunk.metadata},
+        sort_keys=True,
+        ensure_ascii=False,
+        default=str,
+    )
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+@dataclass
+class IngestReport:
+    """Outcome of an incremental vectorstore build."""
+
+    total: int = 0
+    embedded: int = 0
+    reused: int = 0
+    removed: int = 0
+    changed: bool = True
+
+
+class _IndexWriter:
+    """Adds vectors to a flat FAISS index in row order as out-of-order batches arrive."""
+
+    def __init__(self) -> None:
+        self.index = None
+        self._pending: dict[int, list[float]] = {}
+        self._next_row = 0
+
+    def put(self, rows: list[int], vectors) -> None:
+        import faiss
+        import numpy as np
+
+        self._pending.update(zip(rows, vectors))
+        run = []
+        while self._next_row in self._pending:
+            run.append(self._pending.pop(self._next_row))
+            self._next_row += 1
+        if run:
+            matrix = np.asarray(run, dtype=np.float32)
+            if self.index is None:
+                self.index = faiss.IndexFlatL2(matrix.shape[1])
+            self.index.add(matrix)
+
+    def finish(self, total: int):
+        if self.index is None or self.index.ntotal != total:
+            raise RuntimeError(f"Index incomplete: {self._next_row} of {total} vectors written")
+        return self.index
+
+
 def build_vectorstore(
     chunks: list[Document],
     settings: Settings,
-) -> None:
-    """Build FAISS index from document chunks and save to disk."""
+    on_progress: Callable[[int, int], None] | None = None,
+    tables: list[TableRow] | None = None,
+    parents: list[Document] | None = None,
+) -> IngestReport:
+    """Build or incrementally update the FAISS index and save it to disk.
+
+    Every chunk is identified by its content hash. Vectors of chunks already present
+    in the persisted index (same hash, same embedding model) are reused; only new or
+    changed chunks are embedded, and chunks missing from ``chunks`` are dropped. When
+    nothing changed the files on disk are left untouched, so the index version (and
+    every cache keyed on it) stays valid.
+
+    New chunks go through the batched embedding stage (see ``embedding_pipeline``);
+    its checkpoint is cleared only once the index is saved. ``on_progress`` is called
+    with ``(embedded, to_embed)`` after every finished batch.
+
+    ``tables`` (from ``collect_table_rows``) are written to the table store whenever
+    the index is saved, or if the store is missing. Tables come from the same page
+    text as the chunks, so an unchanged index means unchanged tables. ``parents``
+    (from ``chunk_for_index``) are written to the parent store the same way; without
+    them a stale store is removed, since the chunks no longer point into it.
+    """
+    from langchain_community.docstore.in_memory import InMemoryDocstore
     from langchain_community.vectorstores import FAISS
 
-    embeddings = OpenAIEmbeddings(
-        model=settings.embedding_model,
-        openai_api_key=settings.openai_api_key.get_secret_value(),
+    from src.rag.embedding_pipeline import create_batch_embedder
+    from src.rag.embeddings import get_embeddings
+    from src.rag.sections import PARENTS_FILE, write_parent_store
+    from src.rag.tables import TABLES_FILE, write_table_store
+    from src.rag.vectorstore import load_index_vectors, save_vectorstore
+
+    embeddings = get_embeddings(settings)
+    index_path = settings.vectorstore_path
+
+    # Identical chunks (e.g. repeated headers) are indexed once
+    unique: dict[str, Document] = {}
+    for chunk in chunks:
+        unique.setdefault(chunk_hash(chunk), chunk)
+    ids = list(unique)
+    documents = list(unique.values())
+
+    previous = load_index_vectors(index_path, settings.embedding_model)
+    missing = [i for i, chunk_id in enumerate(ids) if chunk_id not in previous]
+    report = IngestReport(
+        total=len(ids),
+        embedded=len(missing),
+        reused=len(ids) - len(missing),
+        removed=len(set(previous) - set(ids)),
     )
 
-    vectorstore = FAISS.from_documents(chunks, embeddings)
+    if previous and not missing and list(previous) == ids:
+        report.changed = False
+        logger.info("Vectorstore up to date", chunks=len(ids), path=index_path)
+        if tables is not None and not os.path.exists(os.path.join(index_path, TABLES_FILE)):
+            write_table_store(tables, index_path)
+        if parents is not None and not os.path.exists(os.path.join(index_path, PARENTS_FILE)):
+            write_parent_store(parents, index_path)
+        return report
+
+    # Stream new vectors in as batches finish; reused ones are already in place
+    position = {chunk_id: row for row, chunk_id in enumerate(ids)}
+    writer = _IndexWriter()
+    kept = [chunk_id for chunk_id in previous if chunk_id in position]
+    writer.put([position[chunk_id] for chunk_id in kept], [previous[c] for c in kept])
+    embedder = create_batch_embedder(embeddings, settings)
+    done = 0
+    if on_progress is not None:
+        on_progress(done, len(missing))
+    for batch_ids, vectors in embedder.embed(
+        [ids[i] for i in missing], [documents[i].page_content for i in missing]
+    ):
+        writer.put([position[chunk_id] for chunk_id in batch_ids], vectors)
+        done += len(batch_ids)
+        if on_progress is not None:
+            on_progress(done, len(missing))
+    index = writer.finish(len(ids))
+
+    vectorstore = FAISS(
+        embedding_function=embeddings,
+        index=index,
+        docstore=InMemoryDocstore({
+            chunk_id: Document(id=chunk_id, page_content=doc.page_content, metadata=doc.metadata)
+            for chunk_id, doc in zip(ids, documents)
+        }),
+        index_to_docstore_id=dict(enumerate(ids)),
+    )
 
-    os.makedirs(settings.vectorstore_path, exist_ok=True)
-    vectorstore.save_local(settings.vectorstore_path)
+    save_vectorstore(vectorstore, index_path, settings.embedding_model)
+    if tables is not None:
+        write_table_store(tables, index_path)
+    if parents is not None:
+        write_parent_store(parents, index_path)
+    elif os.path.exists(os.path.join(index_path, PARENTS_FILE)):
+        os.remove(os.path.join(index_path, PARENTS_FILE))
+    embedder.checkpoint.clear()
     logger.info(
         "Vectorstore built and saved",
-        chunks=len(chunks),
-        path=settings.vectorstore_path,
+        chunks=report.total,
+        embedded=report.embedded,
+        reused=report.reused,
+        removed=report.removed,
+        path=index_path,
+        embedding_batches=embedder.batches,
+        rate_limited=embedder.rate_limited,
+        embedding_cache_hit_rate=round(embeddings.stats.hit_rate, 3),
     )
+    return report
@@ -0,0 +1,270 @@
+"""Precomputed answers to canonical FAQ questions, stored with the index.
+
+The policy manual only changes on ingestion, so the common questions ("posso levar
+meu pet?", "prazo de reembolso") can be answered once per index build. An optional
+ingestion stage takes a curated question list, LLM-generated questions per manual
+section, or both. It answers them with the FAQ pipeline and writes ``answers.json``
+next to the index: each answer with its sources, plus the question embeddings.
+First-turn FAQ queries whose embedding is close enough to a canonical question get
+that answer without retrieval or an LLM call.
+
+The artifact records a fingerprint of the chunk ids it was built from. After a
+rebuild that skipped the stage, the fingerprint no longer matches and the artifact
+is ignored, so an answer never outlives the index it came from.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import base64
+import hashlib
+import json
+import os
+from dataclasses import asdict, dataclass
+from typing import TYPE_CHECKING
+
+import numpy as np
+import structlog
+
+from src.core.text import normalize_text
+from src.rag.answer_cache import CachedAnswer
+
+if TYPE_CHECKING:
+    from langchain_core.language_models import BaseChatModel
+
+    from src.config import Settings
+    from src.rag.index_holder import IndexSnapshot
+
+logger = structlog.get_logger()
+
+ANSWERS_FILE = "answers.json"
+FORMAT_VERSION = 1
+
+# Manual text sent per question-generation call
+SECTION_MAX_CHARS = 6000
+
+
+def chunk_fingerprint(ids: list[str]) -> str:
+    """Identity of an index build: its chunk ids (content hashes) in row order."""
+    return hashlib.sha256("\n".join(ids).encode("utf-8")).hexdigest()
+
+
+@dataclass
+class PrecomputedAnswer:
+    """A canonical question with its FAQ answer and sources."""
+
+    question: str
+    answer: str
+    sources: list[dict]
+
+
+class PrecomputedAnswers:
+    """Canonical answers matched by cosine similarity of the question embeddings."""
+
+    def __init__(
+        self,
+        entries: list[PrecomputedAnswer],
+        vectors,
+        fingerprint: str,
+        embedding_model: str,
+    ) -> None:
+        self.entries = entries
+        self.fingerprint = fingerprint
+        self.embedding_model = embedding_model
+        matrix = np.asarray(vectors, dtype=np.float32)
+        matrix = matrix.reshape(len(entries), -1) if entries else np.zeros((0, 0), np.float32)
+        norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+        self._unit = matrix / np.where(norms == 0, 1.0, norms)
+
+    def __len__(self) -> int:
+        return len(self.entries)
+
+    def match(self, vector, threshold: float) -> CachedAnswer | None:
+        """The answer of the most similar canonical question, if at least ``threshold``."""
+        if not self.entries:
+            return None
+        query = np.asarray(vector, dtype=np.float32).reshape(-1)
+        norm = float(np.linalg.norm(query)) or 1.0
+        scores = self._unit @ (query / norm)
+        best = int(np.argmax(scores))
+        if scores[best] < threshold:
+            return None
+        entry = self.entries[best]
+        return CachedAnswer(entry.answer, list(entry.sources), float(scores[best]))
+
+    def save(self, index_path: str) -> None:
+        """Write ``answers.json`` atomically (temp file + rename) into ``index_path``."""
+        tmp = os.path.join(index_path, f".{ANSWERS_FILE}.tmp")
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(
+                {
+                    "format_version": FORMAT_VERSION,
+                    "embedding_model": self.embedding_model,
+                    "fingerprint": self.fingerprint,
+                    "entries": [asdict(entry) for entry in self.entries],
+                    # Raw float32 rows, base64: a fraction of the size of JSON floats
+                    "vectors": base64.b64encode(self._unit.tobytes()).decode("ascii"),
+                    "dimensions": int(self._unit.shape[1]),
+                },
+                f,
+                ensure_ascii=False,
+                separators=(",", ":"),
+            )
+        os.replace(tmp, os.path.join(index_path, ANSWERS_FILE))
+
+    @classmethod
+    def load(
+        cls, index_path: str, ids: list[str], embedding_model: str
+    ) -> PrecomputedAnswers | None:
+        """Load the artifact if it was built from exactly this index and model."""
+        path = os.path.join(index_path, ANSWERS_FILE)
+        if not os.path.exists(path):
+            return None
+        with open(path, encoding="utf-8") as f:
+            data = json.load(f)
+        if (
+            data.get("format_version") != FORMAT_VERSION
+            or data.get("embedding_model") != embedding_model
+            or data.get("fingerprint") != chunk_fingerprint(ids)
+        ):
+            logger.warning("Precomputed answers are stale, ignoring them", path=path)
+            return None
+        entries = [PrecomputedAnswer(**entry) for entry in data["entries"]]
+        vectors = np.frombuffer(base64.b64decode(data["vectors"]), dtype=np.float32)
+        return cls(
+            entries,
+            vectors.reshape(len(entries), data["dimensions"]),
+            data["fingerprint"],
+            embedding_model,
+        )
+
+
+def read_questions(path: str) -> list[str]:
+    """Questions from a text file, one per line; blank lines and ``#`` comments skipped."""
+    with open(path, encoding="utf-8") as f:
+        lines = [line.strip() for line in f]
+    return [line for line in lines if line and not line.startswith("#")]
+
+
+def _unique(questions: list[str]) -> list[str]:
+    """Drop repeats that differ only in case, accents or final punctuation."""
+    seen: dict[str, str] = {}
+    for question in questions:
+        seen.setdefault(normalize_text(question).rstrip("?!. "), question)
+    return list(seen.values())
+
+
+async def generate_questions(
+    snapshot: IndexSnapshot, llm: BaseChatModel, per_section: int, concurrency: int = 4
+) -> list[str]:
+    """Ask the LLM for up to ``per_section`` customer questions per manual section."""
+    from langchain_core.messages import HumanMessage, SystemMessage
+
+    from src.core.admission import external_call
+    from src.rag.prompts import QUESTION_GENERATION_SYSTEM
+
+    store = snapshot.vectorstore
+    sections: dict[str, list[str]] = {}
+    for row in range(store.index.ntotal):
+        doc = store.docstore.search(store.index_to_docstore_id[row])
+        key = doc.metadata.get("section") or f"page-{doc.metadata.get('page_number', '?')}"
+        sections.setdefault(key, []).append(doc.page_content)
+
+    system = QUESTION_GENERATION_SYSTEM.format(count=per_section)
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def ask(text: str) -> list[str]:
+        async with semaphore, external_call("llm"):
+            response = await llm.ainvoke(
+                [SystemMessage(content=system), HumanMessage(content=text[:SECTION_MAX_CHARS])]
+            )
+        lines = [line.strip(" -•*\t") for line in response.content.splitlines()]
+        return [line for line in lines if line.endswith("?")][:per_section]
+
+    generated = await asyncio.gather(*(ask("\n\n".join(texts)) for texts in sections.values()))
+    return [question for questions in generated for question in questions]
+
+
+async def build_precomputed_answers(
+    settings: Settings,
+    snapshot: IndexSnapshot,
+    questions: list[str],
+    llm: BaseChatModel | None = None,
+) -> PrecomputedAnswers:
+    """Answer ``questions`` with the FAQ pipeline over ``snapshot``.
+
+    Questions whose answer failed are left out; they are simply answered live.
+    """
+    from src.agents.batch import BatchAnswerer, BatchQuestion
+    from src.rag.index_holder import VectorStoreHolder
+    from src.state.graph_state import AgentRoute
+
+    questions = _unique(questions)
+    holder = VectorStoreHolder()
+    holder.attach_snapshot(snapshot)
+    answerer = BatchAnswerer(settings, holder, llm)
+
+    answered: dict[int, dict] = {}
+    batch = [BatchQuestion(str(i), question) for i, question in enumerate(questions)]
+    async for result in answerer.answer(batch, route=AgentRoute.FAQ):
+        if "error" in result:
+            await logger.awarning(
+                "Canonical question not precomputed",
+                question=questions[int(result["id"])][:80],
+                error=result["error"],
+            )
+        else:
+            answered[int(result["id"])] = result
+
+    order = sorted(answered)
+    entries = [
+        PrecomputedAnswer(questions[i], answered[i]["response"], answered[i]["sources"])
+        for i in order
+    ]
+    # Same embedding client as retrieval; the batch above already cached these vectors
+    vectors = await snapshot.vectorstore.embeddings.aembed_documents(
+        [entry.question for entry in entries]
+    )
+    store = snapshot.vectorstore
+    ids = [store.index_to_docstore_id[row] for row in range(store.index.ntotal)]
+    return PrecomputedAnswers(entries, vectors, chunk_fingerprint(ids), settings.embedding_model)
+
+
+async def precompute_answers(
+    settings: Settings,
+    questions_path: str | None = None,
+    generate_per_section: int = 0,
+    llm: BaseChatModel | None = None,
+) -> int:
+    """Ingestion stage: build ``answers.json`` for the index on disk.
+
+    Questions come from ``questions_path`` and/or are generated per section. The
+    answers are computed without holding the index lock. The artifact is written
+    under the lock, and only if the index was not rebuilt in the meantime. Returns
+    the number of precomputed answers.
+    """
+    from src.agents.orchestrator import create_chat_model
+    from src.rag.index_holder import load_snapshot
+    from src.rag.vectorstore import CHUNKS_FILE, index_lock
+
+    snapshot = await asyncio.to_thread(load_snapshot, settings)
+    questions = read_questions(questions_path) if questions_path else []
+    if generate_per_section > 0:
+        model = create_chat_model(settings, llm, disable_streaming=True)
+        questions += await generate_questions(
+            snapshot, model, generate_per_section, settings.batch_llm_concurrency
+        )
+    if not questions:
+        raise ValueError("No canonical questions: pass a questions file or generate them")
+
+    answers = await build_precomputed_answers(settings, snapshot, questions, llm)
+
+    path = settings.vectorstore_path
+    with index_lock(path):
+        with open(os.path.join(path, CHUNKS_FILE), encoding="utf-8") as f:
+            current = chunk_fingerprint(json.load(f)["ids"])
+        if current != answers.fingerprint:
+            raise RuntimeError("Index was rebuilt while precomputing answers; run the stage again")
+        answers.save(path)
+    await logger.ainfo("Precomputed answers saved", answers=len(answers), questions=len(questions))
+    return len(answers)
@@ -0,0 +1,208 @@
+"""Retrieval engine: dense search with vectorized MMR, fused with BM25 by RRF.
+
+One ``RetrievalEngine`` is built per index version (it lives in the holder's
+snapshot), so requests no longer construct a LangChain retriever each time. Dense
+retrieval is one FAISS search for ``fetch_k`` candidates followed by MMR in NumPy,
+which keeps large ``fetch_k`` values cheap. With a parent store (section chunking)
+the retrieved child chunks are returned expanded to their sections.
+"""
+
+from __future__ import annotations
+
+from collections.abc import Hashable
+from typing import TYPE_CHECKING
+
+import numpy as np
+import structlog
+
+from src.core.metrics import track_call
+
+if TYPE_CHECKING:
+    from langchain_community.vectorstores import FAISS
+    from langchain_core.documents import Document
+
+    from src.config import Settings
+    from src.rag.bm25 import BM25Index
+    from src.rag.sections import ParentStore
+
+logger = structlog.get_logger()
+
+
+def reciprocal_rank_fusion(rankings: list[list[Hashable]], k: int = 60) -> list[Hashable]:
+    """Merge ranked id lists; each id scores ``Σ 1 / (k + rank)`` over the lists it is in."""
+    scores: dict[Hashable, float] = {}
+    for ranking in rankings:
+        for rank, doc_id in enumerate(ranking, start=1):
+            scores[doc_id] = scores.get(doc_id, 0.0) + 1.0 / (k + rank)
+    # sorted() is stable, so ties keep first-seen (dense-first) order
+    return sorted(scores, key=scores.__getitem__, reverse=True)
+
+
+def mmr_select(
+    query: np.ndarray, candidates: np.ndarray, k: int, lambda_mult: float
+) -> list[int]:
+    """Maximal marginal relevance over cosine similarity; returns candidate positions.
+
+    Same selection as LangChain's ``maximal_marginal_relevance``, but each greedy
+    step is a vector update instead of a Python loop over candidates. Only the rows
+    of the similarity matrix for selected candidates are computed (``k`` mat-vec
+    products rather than the full ``n x n`` matrix), which keeps large ``fetch_k``
+    cheap.
+    """
+    n = len(candidates)
+    k = min(k, n)
+    if k <= 0:
+        return []
+    norms = np.linalg.norm(candidates, axis=1, keepdims=True)
+    unit = candidates / np.where(norms == 0, 1.0, norms)
+    query_norm = float(np.linalg.norm(query)) or 1.0
+    relevance = unit @ (query / query_norm)
+
+    selected = [int(np.argmax(relevance))]
+    redundancy = unit @ unit[selected[0]]
+    available = np.ones(n, dtype=bool)
+    available[selected[0]] = False
+    while len(selected) < k:
+        scores = lambda_mult * relevance - (1.0 - lambda_mult) * redundancy
+        scores[~available] = -np.inf
+        best = int(np.argmax(scores))
+        selected.append(best)
+        available[best] = False
+        np.maximum(redundancy, unit @ unit[best], out=redundancy)
+    return selected
+
+
+class RetrievalEngine:
+    """Retrieval over one index version, with per-request ``k``/``lambda`` overrides."""
+
+    def __init__(
+        self,
+        vectorstore: FAISS,
+        bm25: BM25Index | None = None,
+        parents: ParentStore | None = None,
+    ) -> None:
+        self.vectorstore = vectorstore
+        self.bm25 = bm25
+        self.parents = parents
+        self._documents: list[Document] | None = None
+
+    def _document(self, row: int) -> Document:
+        if self._documents is None:
+            # Row → Document resolved once per version instead of per hit
+            store = self.vectorstore
+            self._documents = [
+                store.docstore.search(store.index_to_docstore_id[i])
+                for i in range(store.index.ntotal)
+            ]
+        return self._documents[row]
+
+    def mmr_rows(
+        self, vector: np.ndarray, k: int, fetch_k: int, lambda_mult: float
+    ) -> list[int]:
+        """Rows chosen by MMR among the ``fetch_k`` nearest neighbours of ``vector``."""
+        return self.mmr_rows_batch([vector], k, fetch_k, lambda_mult)[0]
+
+    def mmr_rows_batch(
+        self, vectors: list, k: int, fetch_k: int, lambda_mult: float
+    ) -> list[list[int]]:
+        """``mmr_rows`` for several query vectors with a single FAISS search."""
+        if len(vectors) == 0:
+            return []
+        index = self.vectorstore.index
+        queries = np.asarray(vectors, dtype=np.float32).reshape(len(vectors), -1)
+        with track_call("faiss"):
+            _, found = index.search(queries, min(fetch_k, index.ntotal))
+        selected = []
+        for query, hits in zip(queries, found):
+            rows = hits[hits >= 0]
+            if len(rows) == 0:
+                selected.append([])
+                continue
+            candidates = index.reconstruct_batch(rows)
+            selected.append([int(rows[i]) for i in mmr_select(query, candidates, k, lambda_mult)])
+        return selected
+
+    def _sparse_rows(self, query: str, settings: Settings, k: int) -> tuple[list[int], bool]:
+        """BM25 rows for ``query`` and whether they answer it alone (sparse fast path)."""
+        if self.bm25 is None or not settings.retrieval_hybrid:
+            return [], False
+        with track_call("bm25"):
+            hits = self.bm25.search(query, k=k)
+        complete = bool(
+            settings.retrieval_sparse_fast_path
+            and hits
+            and hits[0].matched_terms == self.bm25.query_terms(query)
+        )
+        return [hit.row for hit in hits], complete
+
+    def _context(self, docs: list[Document], settings: Settings) -> list[Document]:
+        """Child chunks expanded to their sections within the context budget."""
+        if self.parents is None:
+            return docs
+        from src.rag.sections import expand_to_parents
+
+        return expand_to_parents(docs, self.parents, settings.context_budget_tokens)
+
+    def _merge(
+        self, dense_rows: list[int], sparse_rows: list[int], settings: Settings, k: int
+    ) -> list[Document]:
+        if self.bm25 is None or not settings.retrieval_hybrid:
+            return [self._document(row) for row in dense_rows]
+        fused = reciprocal_rank_fusion([dense_rows, sparse_rows], k=settings.retrieval_rrf_k)
+        return [self._document(row) for row in fused[:k]]
+
+    async def aretrieve(
+        self,
+        query: str,
+        settings: Settings,
+        k: int | None = None,
+        lambda_mult: float | None = None,
+        fetch_k: int | None = None,
+    ) -> list[Document]:
+        """Return ``k`` chunks for ``query`` (defaults from ``settings``), or their sections.
+
+        Dense MMR results are fused with BM25 by RRF unless ``retrieval_hybrid`` is
+        off or the version has no BM25 index. With ``retrieval_sparse_fast_path``, a
+        query whose best BM25 hit contains every query term skips the embedding.
+        """
+        k = k or settings.retrieval_top_k
+        lambda_mult = settings.retrieval_lambda_mult if lambda_mult is None else lambda_mult
+        fetch_k = fetch_k or k * settings.retrieval_fetch_k_multiplier
+
+        sparse_rows, complete = self._sparse_rows(query, settings, k)
+        if complete:
+            await logger.ainfo("Retrieval served by sparse fast path", hits=len(sparse_rows))
+            return self._context([self._document(row) for row in sparse_rows], settings)
+
+        vector = await self.vectorstore.embeddings.aembed_query(query)
+        dense_rows = self.mmr_rows(vector, k, fetch_k, lambda_mult)
+        return self._context(self._merge(dense_rows, sparse_rows, settings, k), settings)
+
+    async def aretrieve_batch(self, queries: list[str], settings: Settings) -> list[list[Document]]:
+        """``aretrieve`` for many queries: one embedding request and one FAISS search.
+
+        Used by bulk answering, where per-query round trips would dominate.
+        """
+        k = settings.retrieval_top_k
+        fetch_k = k * settings.retrieval_fetch_k_multiplier
+        sparse = [self._sparse_rows(query, settings, k) for query in queries]
+
+        dense_needed = [i for i, (_, complete) in enumerate(sparse) if not complete]
+        vectors = []
+        if dense_needed:
+            vectors = await self.vectorstore.embeddings.aembed_documents(
+                [queries[i] for i in dense_needed]
+            )
+        dense = dict(zip(
+            dense_needed,
+            self.mmr_rows_batch(vectors, k, fetch_k, settings.retrieval_lambda_mult),
+        ))
+
+        results = []
+        for i, (sparse_rows, complete) in enumerate(sparse):
+            if complete:
+                docs = [self._document(row) for row in sparse_rows]
+            else:
+                docs = self._merge(dense[i], sparse_rows, settings, k)
+            results.append(self._context(docs, settings))
+        return results
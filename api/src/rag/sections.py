@@ -0,0 +1,215 @@
+"""Section-aware chunking: small child chunks for retrieval, whole sections for context.
+
+Fixed-size chunks cut sections at arbitrary points, and the top-k chunks stuffed
+into the FAQ prompt overlap and repeat each other. Here the page text is split at
+the headings that extraction marks (``## 1.2 Bagagem Despachada``), carrying
+sections across pages. Each section (split further only when very long) is a
+*parent*, kept whole in ``parents.json`` next to the index. Only its small *child*
+chunks are embedded and indexed, so a hit points at the precise passage.
+
+At query time ``expand_to_parents`` replaces the retrieved children by their
+sections, once per section, in rank order, for as long as they fit a token budget.
+A section that does not fit contributes only its matched child.
+"""
+
+from __future__ import annotations
+
+import bisect
+import json
+import os
+from dataclasses import dataclass
+
+import structlog
+from langchain_core.documents import Document
+from langchain_text_splitters import RecursiveCharacterTextSplitter
+
+from src.core.text import estimate_tokens
+
+logger = structlog.get_logger()
+
+PARENTS_FILE = "parents.json"
+# Child chunk metadata key naming its section in the parent store
+PARENT_KEY = "parent_id"
+
+_SEPARATORS = ["\n\n", "\n", ". ", " ", ""]
+
+
+@dataclass
+class Section:
+    """A section being collected: its heading and text lines, with their pages."""
+
+    heading: str
+    source: str
+    lines: list[str]
+    pages: list[tuple[int, int]]  # (offset in the text, page number) where pages start
+
+    def text(self) -> str:
+        return "\n".join(self.lines).strip("\n")
+
+    def page_at(self, offset: int) -> int:
+        starts = [start for start, _ in self.pages]
+        return self.pages[max(bisect.bisect_right(starts, offset) - 1, 0)][1]
+
+
+def split_sections(documents: list[Document]) -> list[Section]:
+    """Sections of the page documents in order; text before the first heading is one too."""
+    from src.rag.ingest import MARKDOWN_HEADING
+
+    sections: list[Section] = []
+    current: Section | None = None
+    for doc in documents:
+        source = doc.metadata.get("source", "")
+        page = doc.metadata.get("page_number", 0)
+        if current is not None and current.source != source:
+            current = None
+        for line in doc.page_content.split("\n"):
+            match = MARKDOWN_HEADING.match(line.strip())
+            if current is None or match:
+                heading = match.group(2) if match else ""
+                current = Section(heading, source, [], [])
+                sections.append(current)
+            offset = sum(len(text) + 1 for text in current.lines)
+            if not current.pages or current.pages[-1][1] != page:
+                current.pages.append((offset, page))
+            current.lines.append(line)
+    # A chapter heading directly followed by its first subsection has no text of its own
+    return [
+        section for section in sections
+        if any(line.strip() for line in section.lines[1 if section.heading else 0:])
+    ]
+
+
+def _with_heading(text: str, heading: str) -> str:
+    """``text`` prefixed with its section heading, unless it already starts with it."""
+    if not heading or text.lstrip("#").lstrip().startswith(heading):
+        return text
+    return f"{heading}\n{text}"
+
+
+def chunk_sections(
+    documents: list[Document],
+    child_size: int = 400,
+    child_overlap: int = 40,
+    parent_max_chars: int = 4000,
+) -> tuple[list[Document], list[Document]]:
+    """Child chunks to index and the parent sections they point to.
+
+    Every child starts with its section heading, which anchors short passages (a
+    table row, a bullet) to their topic for both embeddings and BM25. Children and
+    parents carry the page they start on.
+    """
+    from src.rag.ingest import chunk_hash
+
+    parent_splitter = RecursiveCharacterTextSplitter(
+        chunk_size=parent_max_chars, chunk_overlap=0, separators=_SEPARATORS, add_start_index=True
+    )
+    child_splitter = RecursiveCharacterTextSplitter(
+        chunk_size=child_size,
+        chunk_overlap=child_overlap,
+        separators=_SEPARATORS,
+        add_start_index=True,
+    )
+    children: list[Document] = []
+    parents: list[Document] = []
+    for section in split_sections(documents):
+        for part in parent_splitter.create_documents([section.text()]):
+            start = part.metadata["start_index"]
+            parent = Document(
+                page_content=_with_heading(part.page_content, section.heading),
+                metadata={
+                    "page_number": section.page_at(start),
+                    "source": section.source,
+                    "section": section.heading,
+                },
+            )
+            parent_id = chunk_hash(parent)
+            parents.append(parent)
+            for child in child_splitter.create_documents([part.page_content]):
+                children.append(Document(
+                    page_content=_with_heading(child.page_content, section.heading),
+                    metadata={
+                        **parent.metadata,
+                        "page_number": section.page_at(start + child.metadata["start_index"]),
+                        PARENT_KEY: parent_id,
+                    },
+                ))
+    return children, parents
+
+
+def write_parent_store(parents: list[Document], index_path: str) -> None:
+    """Write ``parents.json`` atomically (temp file + rename) into ``index_path``."""
+    from src.rag.ingest import chunk_hash
+
+    os.makedirs(index_path, exist_ok=True)
+    store = {
+        chunk_hash(parent): {"text": parent.page_content, "metadata": parent.metadata}
+        for parent in parents
+    }
+    tmp = os.path.join(index_path, f".{PARENTS_FILE}.tmp")
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump(store, f, ensure_ascii=False)
+    os.replace(tmp, os.path.join(index_path, PARENTS_FILE))
+    logger.info("Parent store saved", sections=len(store), path=index_path)
+
+
+class ParentStore:
+    """Parent sections of one index version, by id."""
+
+    def __init__(self, parents: dict[str, Document]) -> None:
+        self._parents = parents
+
+    def __len__(self) -> int:
+        return len(self._parents)
+
+    def get(self, parent_id: str | None) -> Document | None:
+        return self._parents.get(parent_id) if parent_id else None
+
+    @classmethod
+    def build(cls, parents: list[Document]) -> ParentStore:
+        """Store for the parents of ``chunk_sections``, without going through disk."""
+        from src.rag.ingest import chunk_hash
+
+        return cls({chunk_hash(parent): parent for parent in parents})
+
+    @classmethod
+    def load(cls, index_path: str) -> ParentStore | None:
+        path = os.path.join(index_path, PARENTS_FILE)
+        if not os.path.exists(path):
+            return None
+        with open(path, encoding="utf-8") as f:
+            data = json.load(f)
+        return cls({
+            parent_id: Document(page_content=entry["text"], metadata=entry["metadata"])
+            for parent_id, entry in data.items()
+        })
+
+
+def expand_to_parents(
+    docs: list[Document], parents: ParentStore, budget_tokens: int
+) -> list[Document]:
+    """Prompt context for ranked child chunks: their sections, de-duplicated, within budget.
+
+    Each section appears once, at the rank of its best child; children of a section
+    already in the context are dropped. A section too large for the remaining budget
+    falls back to its child. The first document is kept even over budget, so the
+    context is never empty when something was retrieved.
+    """
+    context: list[Document] = []
+    seen: set[str] = set()
+    used = 0
+    for doc in docs:
+        parent_id = doc.metadata.get(PARENT_KEY)
+        if parent_id in seen or doc.page_content in seen:
+            continue
+        parent = parents.get(parent_id)
+        if parent is not None and used + estimate_tokens(parent.page_content) <= budget_tokens:
+            chosen, key = parent, parent_id
+        else:
+            chosen, key = doc, doc.page_content
+        cost = estimate_tokens(chosen.page_content)
+        if context and used + cost > budget_tokens:
+            continue
+        context.append(chosen)
+        seen.add(key)
+        used += cost
+    return context
@@ -0,0 +1,282 @@
+"""Structured table rows of the manual, stored in SQLite for direct lookups.
+
+The chunker sees tables as markdown text and often cuts them mid-row, so a numeric
+question ("peso máximo bagagem internacional classe executiva") costs an embedding,
+retrieval and an LLM pass over broken context. Ingestion also keeps every table row
+whole, with its header, section and page, in ``tables.sqlite`` next to the index,
+together with an inverted index of the row terms (the BM25 tokenizer).
+
+``TableStore.lookup`` returns the row that contains the most query terms among the
+rows whose key (first cell: the airline, destination, fare...) the query names. It
+returns nothing unless that row covers enough of the query and no other row matches
+as well. The FAQ agent answers such a hit from that single row.
+"""
+
+from __future__ import annotations
+
+import json
+import os
+import re
+import sqlite3
+from dataclasses import dataclass
+from typing import TYPE_CHECKING
+
+import structlog
+
+from src.core.text import normalize_text
+from src.rag.bm25 import tokenize
+
+if TYPE_CHECKING:
+    from langchain_core.documents import Document
+
+logger = structlog.get_logger()
+
+TABLES_FILE = "tables.sqlite"
+
+# Queries with fewer distinct terms are too vague to pin down one row
+MIN_QUERY_TERMS = 2
+
+# Signs of a value pdfplumber cut or merged across cells ("115 cm 10 | kg (Top...")
+_SPLIT_START = re.compile(r"^(\)|(kg|cm|dias|meses|anos)\b)")
+_SPLIT_END = re.compile(r"\d\s*(kg|cm)\s+\d+$|\s[A-Za-z]$")
+
+_SCHEMA = """
+CREATE TABLE table_rows (
+    id INTEGER PRIMARY KEY,
+    table_no INTEGER NOT NULL,
+    page INTEGER NOT NULL,
+    section TEXT NOT NULL,
+    header TEXT NOT NULL,
+    cells TEXT NOT NULL
+);
+CREATE TABLE row_terms (
+    term TEXT NOT NULL,
+    row_id INTEGER NOT NULL,
+    is_key INTEGER NOT NULL,
+    PRIMARY KEY (term, row_id)
+) WITHOUT ROWID;
+"""
+
+
+@dataclass
+class TableRow:
+    """One data row of a manual table, with the header that names its cells."""
+
+    table_no: int
+    page: int
+    section: str
+    header: list[str]
+    cells: list[str]
+
+    def pairs(self) -> list[tuple[str, str]]:
+        """``(column, value)`` for every non-empty cell."""
+        return [
+            (name or f"Coluna {i + 1}", value)
+            for i, (name, value) in enumerate(zip(self.header, self.cells))
+            if value
+        ]
+
+    def render(self) -> str:
+        """The header and this row as a two-line markdown table."""
+        return (
+            "| " + " | ".join(self.header) + " |\n"
+            + "| " + " | ".join(["---"] * len(self.header)) + " |\n"
+            + "| " + " | ".join(self.cells) + " |"
+        )
+
+    def intact(self) -> bool:
+        """False when a header or value cell looks cut or merged by the PDF extraction."""
+        return not any(
+            _SPLIT_START.match(text) or _SPLIT_END.search(text)
+            or text.count("(") != text.count(")")
+            for text in (*self.header, *self.cells)
+        )
+
+    def terms(self) -> dict[str, bool]:
+        """Search terms of the row, mapped to whether they belong to its key cell."""
+        terms = dict.fromkeys(tokenize(" ".join([self.section, *self.header, *self.cells])), False)
+        terms.update(dict.fromkeys(tokenize(self.cells[0]), True))
+        return terms
+
+
+@dataclass
+class TableHit:
+    """The row found for a query and the share of query terms it contains."""
+
+    row: TableRow
+    coverage: float
+
+
+def _is_table_of_contents(table: list[list[str]]) -> bool:
+    """A summary table: a page column ("Pág.") with page numbers in reading order."""
+    pages = [cells[-1] for cells in table[1:] if any(cells)]
+    return (
+        normalize_text(table[0][-1]).startswith(("pag", "page"))
+        and all(page.isdigit() for page in pages)
+        and [int(page) for page in pages] == sorted(int(page) for page in pages)
+    )
+
+
+def _continues(table: list[list[str]], previous: list[TableRow]) -> bool:
+    """Whether ``table`` is the rest of the ``previous`` table, cut by a page break.
+
+    The continued part has the same columns and starts straight with data: its first
+    row shares a value with a data row in the same column instead of naming it.
+    """
+    header = previous[0].header
+    if len(table[0]) != len(header) or table[0] == header:
+        return False
+    others = [row.cells for row in previous] + table[1:]
+    return any(
+        value and any(i < len(cells) and cells[i] == value for cells in others)
+        for i, value in enumerate(table[0][1:], start=1)
+    )
+
+
+def rows_from_tables(
+    tables: list[list[list[str]]],
+    page: int,
+    section: str,
+    first_table_no: int = 0,
+    previous: list[TableRow] | None = None,
+) -> list[TableRow]:
+    """Rows of the tables of one page; the first row of each table is its header.
+
+    ``previous`` are the rows of the last table of the page before: a first table
+    that continues it keeps its header and number. A table of contents is skipped.
+    Merged cells come out of pdfplumber empty, so an empty first cell inherits the
+    value of the row above (e.g. "Internacional" spanning several classes).
+    """
+    rows: list[TableRow] = []
+    for offset, table in enumerate(tables):
+        table_no = first_table_no + offset
+        if offset == 0 and previous and _continues(table, previous):
+            header, data = previous[0].header, table
+            table_no, previous_key = previous[0].table_no, previous[-1].cells[0]
+        elif len(table) < 2 or _is_table_of_contents(table):
+            continue
+        else:
+            header, data, previous_key = table[0], table[1:], ""
+        for cells in data:
+            if not any(cells):
+                continue
+            cells = list(cells) + [""] * (len(header) - len(cells))
+            if not cells[0]:
+                cells[0] = previous_key
+            previous_key = cells[0]
+            rows.append(TableRow(table_no, page, section, list(header), cells))
+    return rows
+
+
+def write_table_store(rows: list[TableRow], index_path: str) -> None:
+    """Write ``tables.sqlite`` atomically (temp file + rename) into ``index_path``."""
+    os.makedirs(index_path, exist_ok=True)
+    tmp = os.path.join(index_path, f".{TABLES_FILE}.tmp")
+    if os.path.exists(tmp):
+        os.remove(tmp)
+    conn = sqlite3.connect(tmp)
+    try:
+        conn.executescript(_SCHEMA)
+        conn.executemany(
+            "INSERT INTO table_rows VALUES (?, ?, ?, ?, ?, ?)",
+            [
+                (
+                    row_id, row.table_no, row.page, row.section,
+                    json.dumps(row.header, ensure_ascii=False),
+                    json.dumps(row.cells, ensure_ascii=False),
+                )
+                for row_id, row in enumerate(rows)
+            ],
+        )
+        conn.executemany(
+            "INSERT INTO row_terms VALUES (?, ?, ?)",
+            [
+                (term, row_id, int(is_key))
+                for row_id, row in enumerate(rows)
+                for term, is_key in row.terms().items()
+            ],
+        )
+        conn.commit()
+    finally:
+        conn.close()
+    os.replace(tmp, os.path.join(index_path, TABLES_FILE))
+    logger.info("Table store saved", rows=len(rows), path=index_path)
+
+
+class TableStore:
+    """Read-only lookups over the table rows of one index version.
+
+    The file is copied into an in-memory database on load, so lookups never touch
+    the disk and a rebuild replacing the file does not affect a loaded store.
+    """
+
+    def __init__(self, conn: sqlite3.Connection) -> None:
+        self._conn = conn
+        self.rows = conn.execute("SELECT COUNT(*) FROM table_rows").fetchone()[0]
+
+    @classmethod
+    def load(cls, index_path: str) -> TableStore | None:
+        path = os.path.join(index_path, TABLES_FILE)
+        if not os.path.exists(path):
+            return None
+        source = sqlite3.connect(f"file:{path}?mode=ro", uri=True)
+        conn = sqlite3.connect(":memory:", check_same_thread=False)
+        try:
+            source.backup(conn)
+        finally:
+            source.close()
+        return cls(conn)
+
+    def lookup(self, query: str, min_coverage: float) -> TableHit | None:
+        """The row matching the most query terms, if it covers ``min_coverage`` of them.
+
+        Only rows whose key the query names are candidates: header and section terms
+        match every row of a table alike. A tie with another row means the query
+        does not say which row it wants, so nothing is returned.
+        """
+        terms = sorted(set(tokenize(query)))
+        if len(terms) < MIN_QUERY_TERMS or not self.rows:
+            return None
+        placeholders = ", ".join("?" * len(terms))
+        best = self._conn.execute(
+            f"SELECT row_id, COUNT(*) AS matched FROM row_terms WHERE term IN ({placeholders}) "
+            "GROUP BY row_id HAVING MAX(is_key) = 1 ORDER BY matched DESC LIMIT 2",
+            terms,
+        ).fetchall()
+        if not best:
+            return None
+        row_id, matched = best[0]
+        coverage = matched / len(terms)
+        if coverage < min_coverage or (len(best) > 1 and best[1][1] == matched):
+            return None
+        table_no, page, section, header, cells = self._conn.execute(
+            "SELECT table_no, page, section, header, cells FROM table_rows WHERE id = ?",
+            (row_id,),
+        ).fetchone()
+        row = TableRow(table_no, page, section, json.loads(header), json.loads(cells))
+        return TableHit(row, coverage)
+
+
+def collect_table_rows(documents: list[Document]) -> list[TableRow]:
+    """Table rows carried by the page documents of ``extract_pages_with_tables``."""
+    from src.rag.ingest import TABLES_KEY
+
+    rows: list[TableRow] = []
+    last_table: list[TableRow] = []
+    table_no = 0
+    for doc in documents:
+        tables = doc.metadata.get(TABLES_KEY) or []
+        page_rows = rows_from_tables(
+            tables,
+            doc.metadata.get("page_number", 0),
+            doc.metadata.get("section", ""),
+            table_no,
+            last_table,
+        )
+        rows += page_rows
+        table_no += len(tables)
+        if tables:
+            # Only a table ending this page can continue onto the next one
+            last_no = page_rows[-1].table_no if page_rows else None
+            last_table = [row for row in page_rows if row.table_no == last_no]
+    return rows
@@ -0,0 +1,243 @@
+"""Per-tenant indexes: one policy manual set and one index per travel agency.
+
+Each tenant is a directory under ``tenants_path`` holding its PDF manuals and, once
+ingested (``scripts/ingest_documents.py --tenant <id>``), its index in
+``vectorstore/``. The default tenant keeps using ``vectorstore_path`` and the
+process-wide holder, so single-tenant deployments are unchanged.
+
+``TenantRegistry`` loads a tenant's index on its first request and keeps it
+resident while it is in use. When the estimated memory of the resident tenants
+(index plus the full size of their answer cache) exceeds ``tenant_memory_budget_mb``,
+the least recently used tenants are evicted. With the Redis answer cache, tenants
+share one Redis client and keep their keys under their own prefix.
+Requests that still hold an evicted snapshot finish on it; the next request reloads
+it. A request is routed by binding its tenant to the current task (like the
+metric labels), and the graph nodes read the index of the bound tenant.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import os
+import re
+import time
+from collections import OrderedDict
+from contextvars import ContextVar
+from dataclasses import dataclass
+from typing import TYPE_CHECKING
+
+import structlog
+
+from src.core.metrics import (
+    TENANT_INDEX_EVICTIONS,
+    TENANT_INDEX_LOOKUPS,
+    TENANT_INDEX_RESIDENT_BYTES,
+)
+from src.rag.index_holder import VectorStoreHolder
+
+if TYPE_CHECKING:
+    from src.config import Settings
+    from src.rag.answer_cache import AnswerCacheBackend
+    from src.rag.index_holder import IndexSnapshot
+
+logger = structlog.get_logger()
+
+DEFAULT_TENANT = "default"
+TENANT_ID_PATTERN = r"^[A-Za-z0-9][A-Za-z0-9_-]{0,63}$"
+"""Tenant ids name directories, so they are restricted to a safe charset."""
+
+_TENANT_ID = re.compile(TENANT_ID_PATTERN)
+
+
+class UnknownTenantError(LookupError):
+    """The tenant id is invalid or the tenant has no index."""
+
+
+def tenant_root(settings: Settings, tenant_id: str) -> str:
+    """Directory of the tenant's manuals and index."""
+    if not _TENANT_ID.match(tenant_id):
+        raise UnknownTenantError(tenant_id)
+    return os.path.join(settings.tenants_path, tenant_id)
+
+
+def tenant_settings(settings: Settings, tenant_id: str) -> Settings:
+    """``settings`` with every per-index path pointing into the tenant's directory."""
+    root = tenant_root(settings, tenant_id)
+    return settings.model_copy(update={
+        "vectorstore_path": os.path.join(root, "vectorstore"),
+        "embedding_checkpoint_path": os.path.join(root, "embedding_checkpoint"),
+        "precomputed_questions_path": os.path.join(root, "canonical_questions.txt"),
+    })
+
+
+def tenant_thread_id(session_id: str, tenant_id: str | None) -> str:
+    """Checkpoint thread of a session; tenants never share conversation history."""
+    if not tenant_id or tenant_id == DEFAULT_TENANT:
+        return session_id
+    return f"{tenant_id}:{session_id}"
+
+
+def tenant_documents(settings: Settings, tenant_id: str) -> list[str]:
+    """The tenant's PDF manuals, in name order."""
+    root = tenant_root(settings, tenant_id)
+    if not os.path.isdir(root):
+        return []
+    return sorted(
+        os.path.join(root, name) for name in os.listdir(root) if name.lower().endswith(".pdf")
+    )
+
+
+def index_size(snapshot: IndexSnapshot) -> int:
+    """Estimated resident bytes of a snapshot: float32 vectors plus chunk text.
+
+    The BM25 postings and docstore hold roughly the chunk text once each.
+    """
+    store = snapshot.vectorstore
+    if store is None:
+        return 0
+    text = sum(
+        len(store.docstore.search(doc_id).page_content.encode("utf-8"))
+        for doc_id in store.index_to_docstore_id.values()
+    )
+    return store.index.ntotal * store.index.d * 4 + 2 * text
+
+
+@dataclass
+class TenantIndex:
+    """A resident tenant: its index holder and the answer cache for its versions."""
+
+    tenant_id: str
+    settings: Settings
+    holder: VectorStoreHolder
+    answer_cache: AnswerCacheBackend | None
+    size: int = 0
+    checked_at: float = 0.0
+
+
+_request_tenant: ContextVar[TenantIndex | None] = ContextVar("request_tenant", default=None)
+
+
+def bind_tenant(tenant: TenantIndex | None) -> None:
+    """Route the graph run of the current task to ``tenant`` (None: default index)."""
+    _request_tenant.set(tenant)
+
+
+def current_tenant() -> TenantIndex | None:
+    return _request_tenant.get()
+
+
+class TenantRegistry:
+    """Tenant indexes loaded on first use and evicted LRU under a memory budget."""
+
+    def __init__(self, settings: Settings) -> None:
+        self.settings = settings
+        self.budget_bytes = settings.tenant_memory_budget_mb * 1024 * 1024
+        self._resident: OrderedDict[str, TenantIndex] = OrderedDict()
+        self._loading: dict[str, asyncio.Lock] = {}
+        self._redis = None
+
+    @property
+    def resident(self) -> list[str]:
+        """Resident tenant ids, least recently used first."""
+        return list(self._resident)
+
+    @property
+    def resident_bytes(self) -> int:
+        return sum(tenant.size for tenant in self._resident.values())
+
+    async def get(self, tenant_id: str | None) -> TenantIndex | None:
+        """The tenant's index, loading it if needed; None for the default tenant.
+
+        Raises ``UnknownTenantError`` if the tenant has no index.
+        """
+        if not tenant_id or tenant_id == DEFAULT_TENANT:
+            return None
+        tenant = self._resident.get(tenant_id)
+        if tenant is not None:
+            TENANT_INDEX_LOOKUPS.labels(result="resident").inc()
+            self._resident.move_to_end(tenant_id)
+            await self._refresh(tenant)
+            return tenant
+
+        from src.rag.vectorstore import index_exists
+
+        settings = tenant_settings(self.settings, tenant_id)
+        if not index_exists(settings.vectorstore_path):
+            raise UnknownTenantError(tenant_id)
+        # Concurrent first requests of a tenant wait for a single load
+        async with self._loading.setdefault(tenant_id, asyncio.Lock()):
+            tenant = self._resident.get(tenant_id)
+            if tenant is None:
+                tenant = await self._load(tenant_id, settings)
+        return tenant
+
+    def _answer_cache(self, tenant_id: str, settings: Settings) -> AnswerCacheBackend | None:
+        """The tenant's answer cache; Redis ones share the registry's client."""
+        from src.rag.answer_cache import create_answer_cache_backend
+
+        if settings.answer_cache_backend == "redis" and self._redis is None:
+            from redis.asyncio import Redis
+
+            self._redis = Redis.from_url(settings.redis_url)
+        return create_answer_cache_backend(settings, client=self._redis, namespace=tenant_id)
+
+    def _size(self, tenant: TenantIndex) -> int:
+        """Estimated bytes of a tenant: its index and its answer cache once full."""
+        from src.rag.answer_cache import answer_cache_bytes
+
+        snapshot = tenant.holder.current
+        dim = snapshot.vectorstore.index.d if snapshot.vectorstore is not None else 0
+        return index_size(snapshot) + answer_cache_bytes(tenant.settings, dim)
+
+    async def _load(self, tenant_id: str, settings: Settings) -> TenantIndex:
+        holder = VectorStoreHolder()
+        if not await holder.reload(settings):
+            raise UnknownTenantError(tenant_id)
+        tenant = TenantIndex(
+            tenant_id,
+            settings,
+            holder,
+            self._answer_cache(tenant_id, settings),
+            checked_at=time.monotonic(),
+        )
+        tenant.size = self._size(tenant)
+        self._resident[tenant_id] = tenant
+        TENANT_INDEX_LOOKUPS.labels(result="loaded").inc()
+        await logger.ainfo(
+            "Tenant index loaded", tenant=tenant_id, version=holder.version, bytes=tenant.size
+        )
+        self._evict(keep=tenant_id)
+        return tenant
+
+    async def _refresh(self, tenant: TenantIndex) -> None:
+        """Pick up a rebuilt tenant index, checking at most once per watch interval."""
+        interval = self.settings.index_watch_interval_seconds
+        now = time.monotonic()
+        if interval <= 0 or now - tenant.checked_at < interval:
+            return
+        tenant.checked_at = now
+        try:
+            if await tenant.holder.reload(tenant.settings):
+                tenant.size = self._size(tenant)
+                self._evict(keep=tenant.tenant_id)
+        except Exception as e:
+            await logger.awarning(
+                "Tenant index reload failed", tenant=tenant.tenant_id, error=str(e)
+            )
+
+    def _evict(self, keep: str) -> None:
+        """Drop least recently used tenants until the resident set fits the budget."""
+        for tenant_id in list(self._resident):
+            if self.resident_bytes <= self.budget_bytes:
+                break
+            if tenant_id == keep:
+                continue
+            evicted = self._resident.pop(tenant_id)
+            self._loading.pop(tenant_id, None)
+            TENANT_INDEX_EVICTIONS.inc()
+            logger.info("Tenant index evicted", tenant=tenant_id, bytes=evicted.size)
+        TENANT_INDEX_RESIDENT_BYTES.set(self.resident_bytes)
+
+    async def aclose(self) -> None:
+        if self._redis is not None:
+            await self._redis.aclose()
@@ -2,9 +2,14 @@
 
 from __future__ import annotations
 
+import hashlib
+import json
 import os
+from collections.abc import Iterator
+from contextlib import contextmanager
 from typing import TYPE_CHECKING
 
+import numpy as np
 import structlog
 
 if TYPE_CHECKING:
@@ -15,35 +20,163 @@ if TYPE_CHECKING:
 logger = structlog.get_logger()
 
 
+INDEX_FILE = "index.faiss"
+CHUNKS_FILE = "chunks.json"
+LEGACY_DOCSTORE_FILE = "index.pkl"
+FORMAT_VERSION = 1
+
+
+def save_vectorstore(vectorstore: FAISS, index_path: str, embedding_model: str = "") -> None:
+    """Persist a FAISS vectorstore without pickle.
+
+    Vectors go in ``index.faiss`` (a flat float32 FAISS file) and chunk texts and
+    metadata in ``chunks.json``, a columnar sidecar whose rows follow index order.
+    The BM25 inverted index over the same rows goes in ``bm25.json``. Each file is
+    written to a temporary path and renamed into place.
+    """
+    import faiss
+
+    from src.rag.bm25 import BM25Index
+
+    os.makedirs(index_path, exist_ok=True)
+    ids = [vectorstore.index_to_docstore_id[i] for i in range(vectorstore.index.ntotal)]
+    documents = [vectorstore.docstore.search(doc_id) for doc_id in ids]
+    columns = {
+        "format_version": FORMAT_VERSION,
+        "embedding_model": embedding_model,
+        "distance_strategy": str(vectorstore.distance_strategy.value),
+        "ids": ids,
+        "page_content": [doc.page_content for doc in documents],
+        "metadata": [doc.metadata for doc in documents],
+    }
+
+    chunks_tmp = os.path.join(index_path, f".{CHUNKS_FILE}.tmp")
+    with open(chunks_tmp, "w", encoding="utf-8") as f:
+        json.dump(columns, f, ensure_ascii=False, separators=(",", ":"))
+    index_tmp = os.path.join(index_path, f".{INDEX_FILE}.tmp")
+    faiss.write_index(vectorstore.index, index_tmp)
+    BM25Index.build(columns["page_content"]).save(index_path)
+
+    os.replace(chunks_tmp, os.path.join(index_path, CHUNKS_FILE))
+    os.replace(index_tmp, os.path.join(index_path, INDEX_FILE))
+
+    legacy = os.path.join(index_path, LEGACY_DOCSTORE_FILE)
+    if os.path.exists(legacy):
+        os.remove(legacy)
+
+
+def load_index_vectors(index_path: str, embedding_model: str) -> dict[str, np.ndarray]:
+    """Map chunk id → stored vector for an existing index built with ``embedding_model``.
+
+    Returns an empty dict when there is no index in the current format or it was
+    built with another model, in which case every chunk must be re-embedded.
+    """
+    import faiss
+
+    index_file = os.path.join(index_path, INDEX_FILE)
+    chunks_file = os.path.join(index_path, CHUNKS_FILE)
+    if not (os.path.exists(index_file) and os.path.exists(chunks_file)):
+        return {}
+
+    with open(chunks_file, encoding="utf-8") as f:
+        columns = json.load(f)
+    if columns.get("embedding_model") != embedding_model:
+        return {}
+
+    index = faiss.read_index(index_file, _mmap_flags())
+    ids = columns["ids"]
+    if index.ntotal != len(ids):
+        return {}
+    vectors = index.reconstruct_n(0, index.ntotal)
+    return dict(zip(ids, vectors))
+
+
+def _mmap_flags() -> int:
+    import faiss
+
+    # IO_FLAG_MMAP_IFC maps flat codes straight from the file; plain IO_FLAG_MMAP
+    # would still copy a flat index into the heap
+    return faiss.IO_FLAG_MMAP_IFC | faiss.IO_FLAG_READ_ONLY
+
+
+@contextmanager
+def index_lock(index_path: str, shared: bool = False) -> Iterator[None]:
+    """Hold a ``flock`` on ``<index_path>.lock`` (blocks until acquired).
+
+    Builders take it exclusively while writing; loaders take it shared, so they never
+    read a half-written index. The lock file sits beside the index directory, not
+    inside it, so it never changes the index version.
+    """
+    import fcntl
+
+    lock_path = os.path.abspath(index_path).rstrip(os.sep) + ".lock"
+    os.makedirs(os.path.dirname(lock_path), exist_ok=True)
+    with open(lock_path, "a") as f:
+        fcntl.flock(f, fcntl.LOCK_SH if shared else fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            fcntl.flock(f, fcntl.LOCK_UN)
+
+
+def index_exists(index_path: str) -> bool:
+    """True when a loadable (non-legacy) index is persisted at ``index_path``."""
+    return all(os.path.exists(os.path.join(index_path, name)) for name in (INDEX_FILE, CHUNKS_FILE))
+
+
 def load_vectorstore(settings: Settings) -> FAISS:
-    """Load a persisted FAISS vectorstore from disk."""
+    """Load a persisted FAISS vectorstore from disk.
+
+    The index is memory-mapped, so every worker on the host shares the same pages
+    through the OS page cache. The returned store is read-only: adding vectors to a
+    mapped index aborts inside FAISS, so rebuilds go through ingestion instead.
+    """
+    import faiss
+    from langchain_community.docstore.in_memory import InMemoryDocstore
     from langchain_community.vectorstores import FAISS
-    from langchain_openai import OpenAIEmbeddings
+    from langchain_community.vectorstores.utils import DistanceStrategy
+    from langchain_core.documents import Document
+
+    from src.rag.embeddings import get_embeddings
 
     index_path = settings.vectorstore_path
-    if not os.path.exists(os.path.join(index_path, "index.faiss")):
+    index_file = os.path.join(index_path, INDEX_FILE)
+    chunks_file = os.path.join(index_path, CHUNKS_FILE)
+    if not os.path.exists(index_file):
         raise FileNotFoundError(f"Vectorstore not found at {index_path}")
+    if not os.path.exists(chunks_file):
+        # Pickled docstores from older builds are never loaded; re-ingest instead
+        raise FileNotFoundError(f"Vectorstore at {index_path} uses the legacy pickle format")
 
-    embeddings = OpenAIEmbeddings(
-        model=settings.embedding_model,
-        openai_api_key=settings.openai_api_key.get_secret_value(),
-    )
+    with open(chunks_file, encoding="utf-8") as f:
+        columns = json.load(f)
 
-    vectorstore = FAISS.load_local(
-        index_path,
-        embeddings,
-        allow_dangerous_deserialization=True,
+    ids = columns["ids"]
+    docstore = InMemoryDocstore({
+        doc_id: Document(id=doc_id, page_content=text, metadata=metadata)
+        for doc_id, text, metadata in zip(ids, columns["page_content"], columns["metadata"])
+    })
+    index = faiss.read_index(index_file, _mmap_flags())
+    if index.ntotal != len(ids):
+        raise ValueError(f"Index has {index.ntotal} vectors but sidecar has {len(ids)} chunks")
+
+    vectorstore = FAISS(
+        embedding_function=get_embeddings(settings),
+        index=index,
+        docstore=docstore,
+        index_to_docstore_id=dict(enumerate(ids)),
+        distance_strategy=DistanceStrategy(
+            columns.get("distance_strategy", DistanceStrategy.EUCLIDEAN_DISTANCE.value)
+        ),
     )
     return vectorstore
 
 
-def get_retriever(vectorstore: FAISS, top_k: int = 5):
-    """Create an MMR retriever from the vectorstore."""
-    return vectorstore.as_retriever(
-        search_type="mmr",
-        search_kwargs={
-            "k": top_k,
-            "fetch_k": top_k * 5,
-            "lambda_mult": 0.6,
-        },
-    )
+def get_index_version(index_path: str) -> str:
+    """Fingerprint the persisted index files; changes whenever the index is rebuilt."""
+    digest = hashlib.sha256()
+    for name in sorted(os.listdir(index_path)) if os.path.isdir(index_path) else []:
+        stat = os.stat(os.path.join(index_path, name))
+        digest.update(f"{name}:{stat.st_size}:{stat.st_mtime_ns};".encode())
+    return digest.hexdigest()[:16]
+
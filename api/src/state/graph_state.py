@@ -15,6 +15,24 @@ class AgentRoute(str, Enum):
     BOTH = "BOTH"
 
 
+def merge_sources(existing: list[dict] | None, new: list[dict] | None) -> list[dict]:
+    """Reducer for ``sources``: concatenate writes from parallel agents.
+
+    Agents return only the sources they found, so FAQ and Search can write in the
+    same superstep without overwriting each other. Writing ``None`` resets the list,
+    which is how each new turn starts from an empty source list.
+    """
+    if new is None:
+        return []
+    return [*(existing or []), *new]
+
+
+TRANSIENT_FIELDS = frozenset({
+    "user_query", "route", "faq_response", "search_response", "final_response", "sources",
+})
+"""Per-turn fields: every turn's input resets them, so checkpoints don't store them."""
+
+
 class GraphState(TypedDict):
     """State shared across all nodes in the LangGraph graph."""
 
@@ -24,4 +42,6 @@ class GraphState(TypedDict):
     faq_response: str | None
     search_response: str | None
     final_response: str
-    sources: list[dict]
+    sources: Annotated[list[dict], merge_sources]
+    history_summary: str | None
+    summarized_until: str | None
@@ -1,26 +1,195 @@
-"""Tavily web search tool wrapper."""
+"""Tavily web search tool wrapper with a TTL cache and request coalescing.
+
+One ``CachedSearchClient`` is shared by the process: it reuses a single Tavily client
+(and its HTTP connection pool), serves repeated queries from a TTL cache keyed by
+the normalized query, and coalesces concurrent identical queries into one
+outbound request.
+"""
 
 from __future__ import annotations
 
-from typing import TYPE_CHECKING
+import asyncio
+import time
+from collections import OrderedDict
+from typing import TYPE_CHECKING, Protocol
 
 import structlog
 
+from src.core.admission import external_call
+from src.core.metrics import SEARCH_CACHE_LOOKUPS
+from src.core.text import normalize_text
+
 if TYPE_CHECKING:
     from src.config import Settings
 
 logger = structlog.get_logger()
 
 
+class SearchBackend(Protocol):
+    """Source of web search results."""
+
+    async def search(self, query: str, max_results: int) -> list[dict]: ...
+
+    async def aclose(self) -> None: ...
+
+
+class TavilyBackend:
+    """Tavily API backend; the async client keeps one pooled HTTP connection.
+
+    Needs tavily-python 0.8+: older clients open a new connection per request and
+    have no ``close``.
+    """
+
+    def __init__(self, api_key: str) -> None:
+        from tavily import AsyncTavilyClient
+
+        self._client = AsyncTavilyClient(api_key=api_key)
+
+    async def search(self, query: str, max_results: int) -> list[dict]:
+        async with external_call("tavily"):
+            response = await self._client.search(query, max_results=max_results)
+        return [
+            {
+                "title": item.get("title", ""),
+                "url": item.get("url", ""),
+                "content": item.get("content", ""),
+            }
+            for item in response.get("results", [])
+        ]
+
+    async def aclose(self) -> None:
+        await self._client.close()
+
+
+class StubSearchBackend:
+    """Offline backend with canned results, for tests and benchmarks."""
+
+    def __init__(self, results: list[dict] | None = None, latency: float = 0.0) -> None:
+        self.results = results
+        self.latency = latency
+        self.calls = 0
+
+    async def search(self, query: str, max_results: int) -> list[dict]:
+        self.calls += 1
+        if self.latency:
+            await asyncio.sleep(self.latency)
+        if self.results is not None:
+            return [dict(r) for r in self.results[:max_results]]
+        return [
+            {
+                "title": f"Resultado {i + 1} para {query}",
+                "url": f"https://example.com/busca/{i + 1}",
+                "content": f"Conteúdo de exemplo sobre {query}.",
+            }
+            for i in range(max_results)
+        ]
+
+    async def aclose(self) -> None:
+        return None
+
+
+class CachedSearchClient:
+    """TTL-cached, single-flight front for a ``SearchBackend``."""
+
+    def __init__(
+        self,
+        backend: SearchBackend,
+        max_results: int = 5,
+        ttl_seconds: float = 600,
+        max_entries: int = 512,
+    ) -> None:
+        self.backend = backend
+        self.max_results = max_results
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self.coalesced = 0
+        self._cache: OrderedDict[str, tuple[float, list[dict]]] = OrderedDict()
+        self._inflight: dict[str, asyncio.Task] = {}
+
+    def _get_cached(self, key: str) -> list[dict] | None:
+        entry = self._cache.get(key)
+        if entry is None:
+            return None
+        expires_at, results = entry
+        if expires_at < time.monotonic():
+            del self._cache[key]
+            return None
+        self._cache.move_to_end(key)
+        return results
+
+    async def _fetch(self, key: str, query: str) -> list[dict]:
+        results = await self.backend.search(query, self.max_results)
+        self._cache[key] = (time.monotonic() + self.ttl_seconds, results)
+        self._cache.move_to_end(key)
+        while len(self._cache) > self.max_entries:
+            self._cache.popitem(last=False)
+        return results
+
+    async def search(self, query: str) -> list[dict]:
+        """Return results for ``query`` from cache, an in-flight request, or the backend."""
+        key = normalize_text(query)
+        cached = self._get_cached(key)
+        if cached is not None:
+            self.hits += 1
+            SEARCH_CACHE_LOOKUPS.labels(result="hit").inc()
+            return [dict(r) for r in cached]
+
+        task = self._inflight.get(key)
+        if task is None:
+            self.misses += 1
+            SEARCH_CACHE_LOOKUPS.labels(result="miss").inc()
+            task = asyncio.ensure_future(self._fetch(key, query))
+            self._inflight[key] = task
+            task.add_done_callback(lambda _: self._inflight.pop(key, None))
+        else:
+            self.coalesced += 1
+            SEARCH_CACHE_LOOKUPS.labels(result="coalesced").inc()
+
+        # Shield so one cancelled caller does not cancel the shared request
+        results = await asyncio.shield(task)
+        return [dict(r) for r in results]
+
+    async def aclose(self) -> None:
+        await self.backend.aclose()
+
+
+_client: CachedSearchClient | None = None
+
+
+def create_search_backend(settings: Settings) -> SearchBackend:
+    """Create the backend selected by ``search_backend`` (tavily | stub)."""
+    if settings.search_backend == "stub":
+        return StubSearchBackend(latency=settings.search_stub_latency_seconds)
+    return TavilyBackend(settings.tavily_api_key.get_secret_value())
+
+
+def get_search_client(settings: Settings) -> CachedSearchClient:
+    """Return the process-wide search client, creating it on first use."""
+    global _client
+    if _client is None:
+        _client = CachedSearchClient(
+            create_search_backend(settings),
+            max_results=settings.search_max_results,
+            ttl_seconds=settings.search_cache_ttl_seconds,
+            max_entries=settings.search_cache_max_entries,
+        )
+    return _client
+
+
+async def close_search_client() -> None:
+    """Close the shared search client and its connection pool."""
+    global _client
+    if _client is not None:
+        await _client.aclose()
+        _client = None
+
+
 async def search_web(query: str, settings: Settings) -> list[dict]:
     """Search the web using Tavily and return results."""
-    from langchain_community.tools.tavily_search import TavilySearchResults
-
-    tool = TavilySearchResults(
-        max_results=5,
-        tavily_api_key=settings.tavily_api_key.get_secret_value(),
-    )
-    results = await tool.ainvoke({"query": query})
+    client = get_search_client(settings)
+    results = await client.search(query)
 
     await logger.ainfo("Web search completed", query=query[:80], results=len(results))
     return results
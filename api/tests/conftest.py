@@ -5,12 +5,36 @@ from unittest.mock import AsyncMock, MagicMock, patch
 
 import pytest
 from httpx import ASGITransport, AsyncClient
+from langchain_core.embeddings import DeterministicFakeEmbedding
 
 # Set test env vars before any import of src.config
 os.environ.setdefault("OPENAI_API_KEY", "test-key-for-testing")
 os.environ.setdefault("TAVILY_API_KEY", "test-tavily-key-for-testing")
 
 
+class CountingEmbeddings(DeterministicFakeEmbedding):
+    """Deterministic fake embeddings that count what is sent for embedding."""
+
+    queries: int = 0  # embed_query calls
+    calls: int = 0  # texts sent to embed_documents
+    batches: int = 0  # embed_documents calls
+
+    def embed_query(self, text):
+        self.queries += 1
+        return super().embed_query(text)
+
+    def embed_documents(self, texts):
+        self.calls += len(texts)
+        self.batches += 1
+        return super().embed_documents(texts)
+
+
+@pytest.fixture
+def fake_embeddings():
+    """Deterministic 16-dimension embeddings shared by the index and retrieval tests."""
+    return CountingEmbeddings(size=16)
+
+
 @pytest.fixture
 def mock_settings():
     """Create mock settings for testing."""
@@ -20,14 +44,74 @@ def mock_settings():
     settings.debug = False
     settings.openai_api_key.get_secret_value.return_value = "test-key"
     settings.tavily_api_key.get_secret_value.return_value = "test-tavily-key"
+    settings.search_backend = "stub"
+    settings.search_stub_latency_seconds = 0.0
+    settings.search_max_results = 5
+    settings.search_cache_ttl_seconds = 600
+    settings.search_cache_max_entries = 512
     settings.redis_url = "redis://localhost:6379"
     settings.vectorstore_path = "./data/vectorstore"
+    settings.tenants_path = "./data/tenants"
+    settings.tenant_memory_budget_mb = 2048
+    settings.index_watch_interval_seconds = 0
+    settings.admin_token.get_secret_value.return_value = ""
     settings.embedding_model = "text-embedding-3-small"
+    settings.embedding_cache_size = 2048
+    settings.embedding_cache_backend = "memory"
+    settings.embedding_cache_path = "./data/embedding_cache/embeddings"
+    settings.embedding_batch_max_tokens = 20000
+    settings.embedding_batch_max_items = 256
+    settings.embedding_concurrency = 4
+    settings.embedding_max_retries = 6
+    settings.embedding_checkpoint_path = "./data/embedding_checkpoint"
     settings.llm_model = "gpt-4o-mini"
     settings.llm_temperature = 0.1
+    settings.chunking_strategy = "sections"
     settings.chunk_size = 1500
     settings.chunk_overlap = 200
+    settings.child_chunk_size = 400
+    settings.child_chunk_overlap = 40
+    settings.parent_max_chars = 4000
+    settings.context_budget_tokens = 1000
+    settings.ingest_workers = 1
     settings.retrieval_top_k = 5
+    settings.retrieval_fetch_k_multiplier = 5
+    settings.retrieval_lambda_mult = 0.6
+    settings.retrieval_hybrid = True
+    settings.retrieval_rrf_k = 60
+    settings.retrieval_sparse_fast_path = False
+    settings.answer_cache_backend = "memory"
+    settings.answer_cache_threshold = 0.95
+    settings.answer_cache_ttl_seconds = 3600
+    settings.answer_cache_max_entries = 1000
+    settings.precomputed_answers_enabled = True
+    settings.precomputed_answer_threshold = 0.92
+    settings.precomputed_questions_path = "./data/canonical_questions.txt"
+    settings.table_lookup_enabled = True
+    settings.table_lookup_min_coverage = 0.6
+    settings.table_lookup_use_llm = True
+    settings.intent_fast_path_enabled = True
+    settings.intent_fast_path_threshold = 0.8
+    settings.history_budget_classifier_tokens = 200
+    settings.history_budget_agent_tokens = 1500
+    settings.history_summary_trigger_tokens = 600
+    settings.rate_limit_enabled = True
+    settings.rate_limit_backend = "memory"
+    settings.rate_limit_window_seconds = 60
+    settings.rate_limit_ip_requests = 20
+    settings.rate_limit_session_requests = 10
+    settings.llm_max_concurrency = 32
+    settings.tavily_max_concurrency = 16
+    settings.admission_queue_timeout_seconds = 5.0
+    settings.batch_max_items = 1000
+    settings.batch_chunk_size = 64
+    settings.batch_llm_concurrency = 8
+    settings.checkpoint_durability = "exit"
+    settings.checkpoint_prune_summarized = True
+    settings.both_route_parallel = True
+    settings.faq_branch_timeout = 30.0
+    settings.search_branch_timeout = 15.0
+    settings.stream_progress_events = False
     return settings
 
 
@@ -56,12 +140,14 @@ def mock_graph():
 async def client(mock_graph):
     """Create an async test client with mocked dependencies."""
     from src.main import create_app
+    from src.rag.index_holder import VectorStoreHolder
 
     app = create_app()
 
     # Override app state with mocks
     app.state.graph = mock_graph
-    app.state.vectorstore = MagicMock()
+    app.state.vectorstore_holder = VectorStoreHolder(MagicMock(), "test")
+    app.state.ingestion = None
     app.state.checkpointer = MagicMock()
     app.state.settings = MagicMock()
     app.state.settings.app_version = "1.0.0"
@@ -0,0 +1,111 @@
+"""Tests for admission control of LLM and Tavily calls."""
+
+import asyncio
+
+import pytest
+
+from src.core.admission import AdmissionGate, OverloadedError
+
+
+async def _occupy(gate, release: asyncio.Event) -> asyncio.Future:
+    """Take every slot of ``gate`` until ``release`` is set."""
+
+    async def hold():
+        async with gate.slot():
+            await release.wait()
+
+    tasks = [asyncio.create_task(hold()) for _ in range(gate.max_concurrency)]
+    while gate.in_flight < gate.max_concurrency:
+        await asyncio.sleep(0)
+    return asyncio.gather(*tasks)
+
+
+@pytest.mark.asyncio
+async def test_gate_bounds_concurrency():
+    """Test no more than ``max_concurrency`` calls run at once; the rest queue."""
+    gate = AdmissionGate("llm", max_concurrency=2, queue_timeout=1.0)
+    running = peak = 0
+
+    async def call():
+        nonlocal running, peak
+        async with gate.slot():
+            running += 1
+            peak = max(peak, running)
+            await asyncio.sleep(0.01)
+            running -= 1
+
+    await asyncio.gather(*(call() for _ in range(6)))
+
+    assert peak == 2
+    assert (gate.waiting, gate.in_flight) == (0, 0)
+
+
+@pytest.mark.asyncio
+async def test_wait_past_queue_timeout_is_rejected():
+    """Test a caller that cannot get a slot within the deadline gets ``OverloadedError``."""
+    gate = AdmissionGate("llm", max_concurrency=1, queue_timeout=0.05)
+    release = asyncio.Event()
+    holder = await _occupy(gate, release)
+
+    with pytest.raises(OverloadedError) as exc:
+        async with gate.slot():
+            pass
+
+    assert exc.value.dependency == "llm"
+    assert exc.value.retry_after >= 1
+    assert gate.waiting == 0
+    release.set()
+    await holder
+
+
+@pytest.mark.asyncio
+async def test_long_expected_wait_is_rejected_without_queueing():
+    """Test a call is shed at once when the queue ahead of it exceeds the deadline."""
+    gate = AdmissionGate("tavily", max_concurrency=1, queue_timeout=1.0)
+    gate.service_time = 2.0  # recent calls took 2 s each
+    release = asyncio.Event()
+    holder = await _occupy(gate, release)
+
+    loop = asyncio.get_running_loop()
+    start = loop.time()
+    with pytest.raises(OverloadedError) as exc:
+        async with gate.slot():
+            pass
+
+    assert loop.time() - start < 0.5
+    assert exc.value.retry_after == 2
+    release.set()
+    await holder
+
+
+@pytest.mark.asyncio
+async def test_external_call_uses_configured_gate(mock_settings):
+    """Test ``external_call`` goes through the gate of its dependency only."""
+    from src.core import admission
+
+    mock_settings.llm_max_concurrency = 1
+    mock_settings.tavily_max_concurrency = 0
+    admission.configure_admission(mock_settings)
+    try:
+        gate = admission.get_gate("llm")
+        async with admission.external_call("llm"):
+            assert gate.in_flight == 1
+        async with admission.external_call("tavily"):
+            pass
+        assert admission.get_gate("tavily") is None
+        assert gate.in_flight == 0
+    finally:
+        admission._gates.clear()
+
+
+@pytest.mark.asyncio
+async def test_chat_endpoint_returns_503_with_retry_after(client, mock_graph):
+    """Test an overloaded upstream turns into 503 with Retry-After."""
+    mock_graph.ainvoke.side_effect = OverloadedError("llm", retry_after=3)
+
+    response = await client.post(
+        "/api/v1/chat", json={"session_id": "busy", "message": "Qual o limite de bagagem?"}
+    )
+
+    assert response.status_code == 503
+    assert response.headers["Retry-After"] == "3"
@@ -0,0 +1,141 @@
+"""Tests for the semantic FAQ answer cache."""
+
+import json
+import time
+from unittest.mock import AsyncMock, MagicMock
+
+import numpy as np
+import pytest
+
+from src.rag.answer_cache import InMemoryAnswerCache, RedisAnswerCache, SemanticAnswerCache
+
+SOURCES = [{"type": "document", "title": "Manual", "content_preview": "", "url": None}]
+
+
+def _vec(*values):
+    return np.asarray(values, dtype=np.float32)
+
+
+@pytest.mark.asyncio
+async def test_similar_query_hits():
+    """Test a near-duplicate embedding returns the cached answer."""
+    cache = InMemoryAnswerCache(threshold=0.95, ttl_seconds=60, max_entries=10)
+    await cache.store(_vec(1.0, 0.0, 0.0), "23 kg", SOURCES, version="v1")
+
+    hit = await cache.lookup(_vec(0.99, 0.05, 0.0), version="v1")
+
+    assert hit is not None
+    assert hit.answer == "23 kg"
+    assert hit.sources == SOURCES
+    assert hit.similarity > 0.95
+
+
+@pytest.mark.asyncio
+async def test_dissimilar_query_misses():
+    """Test embeddings below the threshold are not served."""
+    cache = InMemoryAnswerCache(threshold=0.95, ttl_seconds=60, max_entries=10)
+    await cache.store(_vec(1.0, 0.0, 0.0), "23 kg", SOURCES, version="v1")
+
+    assert await cache.lookup(_vec(0.7, 0.7, 0.0), version="v1") is None
+
+
+@pytest.mark.asyncio
+async def test_new_index_version_invalidates():
+    """Test answers are not served across index versions and old versions are dropped."""
+    cache = InMemoryAnswerCache(threshold=0.95, ttl_seconds=60, max_entries=10)
+    await cache.store(_vec(1.0, 0.0), "23 kg", SOURCES, version="v1")
+
+    assert await cache.lookup(_vec(1.0, 0.0), version="v2") is None
+    await cache.store(_vec(1.0, 0.0), "32 kg", SOURCES, version="v2")
+    # Requests still on the old index during the swap keep their entries
+    assert (await cache.lookup(_vec(1.0, 0.0), version="v1")).answer == "23 kg"
+    assert (await cache.lookup(_vec(1.0, 0.0), version="v2")).answer == "32 kg"
+
+    await cache.lookup(_vec(1.0, 0.0), version="v3")
+    assert (await cache.lookup(_vec(1.0, 0.0), version="v2")).answer == "32 kg"
+    assert len(cache._index) == 1
+
+
+@pytest.mark.asyncio
+async def test_ttl_expiry(monkeypatch):
+    """Test entries older than the TTL are evicted."""
+    cache = InMemoryAnswerCache(threshold=0.95, ttl_seconds=10, max_entries=10)
+    await cache.store(_vec(1.0, 0.0), "23 kg", SOURCES, version="v1")
+
+    now = time.time()
+    monkeypatch.setattr(time, "time", lambda: now + 11)
+    assert await cache.lookup(_vec(1.0, 0.0), version="v1") is None
+
+
+@pytest.mark.asyncio
+async def test_lru_eviction():
+    """Test the least recently used entry is evicted past max_entries."""
+    cache = InMemoryAnswerCache(threshold=0.95, ttl_seconds=60, max_entries=2)
+    await cache.store(_vec(1.0, 0.0, 0.0), "a", SOURCES, version="v1")
+    await cache.store(_vec(0.0, 1.0, 0.0), "b", SOURCES, version="v1")
+    await cache.lookup(_vec(1.0, 0.0, 0.0), version="v1")  # "a" becomes most recent
+    await cache.store(_vec(0.0, 0.0, 1.0), "c", SOURCES, version="v1")
+
+    assert await cache.lookup(_vec(0.0, 1.0, 0.0), version="v1") is None
+    assert (await cache.lookup(_vec(1.0, 0.0, 0.0), version="v1")).answer == "a"
+
+
+def _redis_cache(entries):
+    """A Redis cache over ``entries`` (key → payload) standing in for the server."""
+    client = MagicMock()
+    client.get = AsyncMock(side_effect=entries.get)
+    client.mget = AsyncMock(side_effect=lambda keys: [entries.get(k) for k in keys])
+    return RedisAnswerCache("", threshold=0.95, ttl_seconds=60, max_entries=10, client=client)
+
+
+def _payload(vector, answer):
+    return json.dumps({
+        "vector": vector, "answer": answer, "sources": [], "created_at": time.time()
+    })
+
+
+@pytest.mark.asyncio
+async def test_redis_sync_retries_entries_still_in_flight(monkeypatch):
+    """Test an id taken before its entry landed is mirrored once it lands."""
+    prefix = "blis:answer_cache:v1"
+    entries = {f"{prefix}:seq": b"2", f"{prefix}:entry:2": _payload([0.0, 1.0], "b")}
+    cache = _redis_cache(entries)
+
+    assert (await cache.lookup(_vec(0.0, 1.0), version="v1")).answer == "b"
+    assert await cache.lookup(_vec(1.0, 0.0), version="v1") is None
+
+    entries[f"{prefix}:entry:1"] = _payload([1.0, 0.0], "a")
+    assert (await cache.lookup(_vec(1.0, 0.0), version="v1")).answer == "a"
+
+    # A gap that never fills is given up on, so later syncs don't re-read it
+    entries[f"{prefix}:seq"] = b"4"
+    entries[f"{prefix}:entry:4"] = _payload([0.6, 0.8], "d")
+    await cache.lookup(_vec(0.6, 0.8), version="v1")
+    now = time.monotonic()
+    monkeypatch.setattr(time, "monotonic", lambda: now + 10)
+    await cache.lookup(_vec(0.6, 0.8), version="v1")
+    assert cache._synced_seq == 4
+
+
+@pytest.mark.asyncio
+async def test_faq_agent_cache_hit_skips_llm(mock_settings):
+    """Test a cache hit answers without retrieval or an LLM call."""
+    from src.agents.faq_agent import run_faq_agent
+
+    embeddings = MagicMock()
+    embeddings.aembed_query = AsyncMock(return_value=[1.0, 0.0])
+    backend = InMemoryAnswerCache(threshold=0.95, ttl_seconds=60, max_entries=10)
+    await backend.store(_vec(1.0, 0.0), "Franquia de 23 kg", SOURCES, version="v1")
+    answer_cache = SemanticAnswerCache(backend, embeddings, version="v1")
+
+    mock_llm = AsyncMock()
+    mock_engine = MagicMock()
+    mock_engine.aretrieve = AsyncMock()
+    state = {"user_query": "qual a franquia de bagagem?", "messages": [], "sources": []}
+
+    result = await run_faq_agent(state, mock_llm, mock_engine, mock_settings, answer_cache)
+
+    assert result["faq_response"] == "Franquia de 23 kg"
+    assert result["sources"] == SOURCES
+    mock_llm.ainvoke.assert_not_called()
+    mock_engine.aretrieve.assert_not_called()
@@ -0,0 +1,91 @@
+"""Tests for background auto-ingestion and the cross-process build lock."""
+
+import asyncio
+from unittest.mock import MagicMock, patch
+
+import pytest
+
+from src.rag.auto_ingest import (
+    IngestionProgress,
+    build_index_locked,
+    run_auto_ingest,
+)
+from src.rag.index_holder import IndexSnapshot, VectorStoreHolder
+
+
+def test_skips_build_when_another_worker_finished(mock_settings, tmp_path):
+    """Test a worker that gets the lock after the build only loads the index."""
+    mock_settings.vectorstore_path = str(tmp_path / "index")
+    progress = IngestionProgress()
+
+    with (
+        patch("src.rag.vectorstore.index_exists", return_value=True),
+        patch("src.rag.ingest.build_vectorstore") as build,
+    ):
+        built = build_index_locked(mock_settings, progress, pdf_path="missing.pdf")
+
+    assert built is False
+    build.assert_not_called()
+
+
+def test_lock_excludes_other_holders(tmp_path):
+    """Test the index lock is exclusive across open file descriptions."""
+    import fcntl
+
+    from src.rag.vectorstore import index_lock
+
+    index_path = str(tmp_path / "index")
+    with index_lock(index_path):
+        with open(f"{index_path}.lock", "a") as other:
+            with pytest.raises(BlockingIOError):
+                fcntl.flock(other, fcntl.LOCK_EX | fcntl.LOCK_NB)
+
+
+@pytest.mark.asyncio
+async def test_attaches_vectorstore_without_blocking_loop(mock_settings):
+    """Test the build runs off the event loop and hot-attaches the result."""
+    holder = VectorStoreHolder()
+    progress = IngestionProgress()
+    vectorstore = MagicMock()
+    ticks = 0
+
+    def slow_build(settings, progress, pdf_path):
+        import time
+
+        progress.state = "embedding"
+        time.sleep(0.2)
+        return True
+
+    async def ticker():
+        nonlocal ticks
+        while not holder.ready:
+            ticks += 1
+            await asyncio.sleep(0.01)
+
+    with (
+        patch("src.rag.auto_ingest.build_index_locked", side_effect=slow_build),
+        patch("src.rag.vectorstore.index_exists", return_value=True),
+        patch(
+            "src.rag.index_holder.load_snapshot",
+            return_value=IndexSnapshot(vectorstore, "v1"),
+        ),
+    ):
+        await asyncio.gather(run_auto_ingest(mock_settings, holder, progress), ticker())
+
+    assert holder.vectorstore is vectorstore
+    assert progress.state == "ready"
+    assert ticks > 5
+
+
+@pytest.mark.asyncio
+async def test_failed_build_reports_error(mock_settings):
+    """Test a failed build leaves the holder empty and records the error."""
+    holder = VectorStoreHolder()
+    progress = IngestionProgress()
+
+    with patch("src.rag.auto_ingest.build_index_locked", side_effect=OSError("disk full")):
+        await run_auto_ingest(mock_settings, holder, progress)
+
+    assert not holder.ready
+    assert (progress.state, progress.error) == ("failed", "disk full")
+    assert progress.finished_at is not None
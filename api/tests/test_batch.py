@@ -0,0 +1,169 @@
+"""Tests for batch answering: vectorized retrieval, the answerer and the NDJSON endpoint."""
+
+import asyncio
+import json
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import pytest
+from langchain_core.documents import Document
+
+from src.agents.batch import BatchAnswerer, BatchQuestion
+from src.rag.bm25 import BM25Index
+from src.rag.prompts import CLASSIFY_INTENT_SYSTEM, FAQ_AGENT_SYSTEM
+from src.rag.retrieval import RetrievalEngine
+from tests.test_retrieval import CHUNKS
+
+
+@pytest.fixture
+def engine(fake_embeddings):
+    from langchain_community.vectorstores import FAISS
+
+    vectorstore = FAISS.from_documents([Document(page_content=c) for c in CHUNKS], fake_embeddings)
+    return RetrievalEngine(vectorstore, BM25Index.build(CHUNKS))
+
+
+@pytest.mark.asyncio
+async def test_retrieve_batch_matches_single_queries(engine, mock_settings):
+    """Test batched retrieval returns what per-query retrieval does, in one embedding call."""
+    mock_settings.retrieval_top_k = 2
+    mock_settings.retrieval_sparse_fast_path = False
+    queries = ["franquia de 23kg", "PET na cabine", "reembolso de tarifa"]
+    embeddings = engine.vectorstore.embeddings
+    embeddings.batches = 0  # the index build embedded the chunks
+
+    batched = await engine.aretrieve_batch(queries, mock_settings)
+    assert (embeddings.batches, embeddings.queries) == (1, 0)
+
+    single = [await engine.aretrieve(q, mock_settings) for q in queries]
+    assert [[d.page_content for d in docs] for docs in batched] == [
+        [d.page_content for d in docs] for docs in single
+    ]
+
+
+def _answerer(mock_settings, engine, fail_on: str | None = None):
+    async def ainvoke(messages, *args, **kwargs):
+        system, query = messages[0].content, messages[1].content
+        if system == CLASSIFY_INTENT_SYSTEM:
+            return MagicMock(content="FAQ")
+        if query == fail_on:
+            raise RuntimeError("upstream error")
+        assert system.startswith(FAQ_AGENT_SYSTEM.split("{")[0])
+        return MagicMock(content=f"Resposta: {query}")
+
+    llm = MagicMock()
+    llm.model_copy.return_value = llm
+    llm.ainvoke = AsyncMock(side_effect=ainvoke)
+    holder = MagicMock()
+    holder.current.engine = engine
+    return BatchAnswerer(mock_settings, holder, llm=llm), llm
+
+
+@pytest.mark.asyncio
+async def test_answerer_returns_every_item_with_per_item_errors(engine, mock_settings):
+    """Test each question gets one result and a failing one does not stop the batch."""
+    mock_settings.batch_chunk_size = 2
+    answerer, llm = _answerer(mock_settings, engine, fail_on="Qual o reembolso?")
+    questions = [
+        BatchQuestion("a", "Qual a franquia de bagagem?"),
+        BatchQuestion("b", "Qual o reembolso?"),
+        BatchQuestion("c", "Como funciona o atendimento?"),  # no rule matches: LLM router
+    ]
+
+    results = {r["id"]: r async for r in answerer.answer(questions)}
+
+    assert set(results) == {"a", "b", "c"}
+    assert results["a"]["response"] == "Resposta: Qual a franquia de bagagem?"
+    assert results["a"]["agent_used"] == "faq"
+    assert results["a"]["sources"][0]["type"] == "document"
+    assert results["b"] == {"id": "b", "error": "upstream error"}
+    assert results["c"]["agent_used"] == "faq"
+    # Two answers, one failed answer and one router call for the unmatched question
+    assert llm.ainvoke.await_count == 4
+
+
+@pytest.mark.asyncio
+async def test_answerer_prepares_one_chunk_ahead(mock_settings):
+    """Test a chunk is routed and retrieved only once the one two back is answered."""
+    from src.agents.batch import _Prepared
+    from src.state.graph_state import AgentRoute
+
+    mock_settings.batch_chunk_size = 1
+    answerer, _ = _answerer(mock_settings, engine=None)
+    prepared = []
+    released = {question_id: asyncio.Event() for question_id in "abc"}
+
+    async def prepare(chunk, semaphore, route=None):
+        prepared.append(chunk[0].id)
+        return [_Prepared(chunk[0], AgentRoute.SEARCH)]
+
+    async def answer(semaphore, item):
+        await released[item.question.id].wait()
+        return {"id": item.question.id}
+
+    answerer._prepare = prepare
+    answerer._answer = answer
+    results = answerer.answer([BatchQuestion(question_id, "q") for question_id in "abc"])
+    first = asyncio.ensure_future(anext(results))
+    await asyncio.sleep(0.01)
+    assert prepared == ["a", "b"]
+
+    released["a"].set()
+    assert (await first)["id"] == "a"
+    await asyncio.sleep(0.01)
+    assert prepared == ["a", "b", "c"]
+    released["b"].set()
+    released["c"].set()
+    assert sorted([r["id"] async for r in results]) == ["b", "c"]
+
+
+@pytest.mark.asyncio
+async def test_batch_endpoint_streams_ndjson(client):
+    """Test the endpoint needs the admin token and sends one NDJSON line per item."""
+    app = client._transport.app
+    app.state.settings.batch_max_items = 2
+    payload = {"items": [{"id": "q1", "message": "Franquia?"}, {"message": "Reembolso?"}]}
+
+    app.state.settings.admin_token.get_secret_value.return_value = ""
+    assert (await client.post("/api/v1/chat/batch", json=payload)).status_code == 404
+
+    async def answer(questions):
+        for question in reversed(questions):
+            yield {"id": question.id, "response": "ok", "agent_used": "faq", "sources": []}
+
+    app.state.settings.admin_token.get_secret_value.return_value = "s3cret"
+    app.state.batch_answerer = MagicMock(answer=answer)
+    headers = {"X-Admin-Token": "s3cret"}
+    response = await client.post("/api/v1/chat/batch", json=payload, headers=headers)
+
+    assert response.status_code == 200
+    assert response.headers["content-type"] == "application/x-ndjson"
+    lines = [json.loads(line) for line in response.text.splitlines()]
+    assert [line["id"] for line in lines] == ["1", "q1"]
+
+    # The second item defaults to id "1", which the first one already uses
+    duplicated = {"items": [{"id": "1", "message": "Franquia?"}, {"message": "Reembolso?"}]}
+    response = await client.post("/api/v1/chat/batch", json=duplicated, headers=headers)
+    assert response.status_code == 422
+
+    too_many = {"items": [{"message": "Franquia?"}] * 3}
+    response = await client.post("/api/v1/chat/batch", json=too_many, headers=headers)
+    assert response.status_code == 413
+
+
+@pytest.mark.asyncio
+async def test_answerer_routes_to_search_without_index(mock_settings):
+    """Test degraded mode answers every question from web search."""
+    answerer, llm = _answerer(mock_settings, engine=None)
+    search = AsyncMock(return_value=[{"title": "T", "url": "https://x", "content": "C"}])
+    llm.ainvoke.side_effect = None
+    llm.ainvoke.return_value = MagicMock(content="Da web")
+
+    with patch("src.tools.web_search.search_web", search):
+        results = [r async for r in answerer.answer([BatchQuestion("1", "Qual a franquia?")])]
+
+    assert results == [{
+        "id": "1",
+        "response": "Da web",
+        "agent_used": "search",
+        "sources": [{"type": "web", "title": "T", "content_preview": "C", "url": "https://x"}],
+    }]
@@ -19,6 +19,20 @@ async def test_chat_success(client):
     assert len(data["sources"]) > 0
 
 
+@pytest.mark.asyncio
+async def test_chat_schedules_history_summary(client):
+    """Test the summary is handed off for the session instead of run in the request."""
+    from unittest.mock import MagicMock
+
+    summarizer = MagicMock()
+    client._transport.app.state.history_summarizer = summarizer
+
+    response = await client.post("/api/v1/chat", json={"session_id": "s1", "message": "Oi"})
+
+    assert response.status_code == 200
+    summarizer.schedule.assert_called_once_with({"configurable": {"thread_id": "s1"}})
+
+
 @pytest.mark.asyncio
 async def test_chat_empty_message(client):
     """Test validation rejects empty message."""
@@ -80,3 +94,21 @@ async def test_health_endpoint(client):
     assert "vectorstore_loaded" in data
     assert "version" in data
     assert data["status"] in ("healthy", "degraded")
+
+
+@pytest.mark.asyncio
+async def test_health_reports_background_ingestion(client):
+    """Test /health is degraded and shows build progress while the index builds."""
+    from src.rag.auto_ingest import IngestionProgress
+    from src.rag.index_holder import VectorStoreHolder
+
+    app = client._transport.app
+    app.state.vectorstore_holder = VectorStoreHolder()
+    app.state.ingestion = IngestionProgress(state="embedding", chunks=40, embedded=10, to_embed=40)
+
+    data = (await client.get("/health")).json()
+
+    assert data["status"] == "degraded"
+    assert data["vectorstore_loaded"] is False
+    assert data["ingestion"]["state"] == "embedding"
+    assert (data["ingestion"]["embedded"], data["ingestion"]["to_embed"]) == (10, 40)
@@ -0,0 +1,118 @@
+"""Tests for the GET /api/v1/chat/stream endpoint."""
+
+import json
+from types import SimpleNamespace
+
+import pytest
+
+
+def _node_start(node):
+    return {"event": "on_chain_start", "name": node, "metadata": {"langgraph_node": node}}
+
+
+def _token(node, text):
+    return {
+        "event": "on_chat_model_stream",
+        "metadata": {"langgraph_node": node},
+        "data": {"chunk": SimpleNamespace(content=text)},
+    }
+
+
+def _graph_end(route, final_response):
+    return {
+        "event": "on_chain_end",
+        "name": "LangGraph",
+        "data": {"output": {"route": route, "final_response": final_response, "sources": []}},
+    }
+
+
+BOTH_RUN = [
+    _node_start("classify_intent"),
+    _token("classify_intent", "BOTH"),
+    _node_start("both_faq"),
+    _node_start("both_search"),
+    _token("both_faq", "faq parcial"),
+    _token("both_search", "busca parcial"),
+    _node_start("synthesize_response"),
+    _token("synthesize_response", "Resposta "),
+    _token("synthesize_response", "final"),
+    _graph_end("BOTH", "Resposta final"),
+]
+
+
+def _events(body):
+    events = []
+    for block in body.strip().split("\r\n\r\n"):
+        lines = dict(line.split(": ", 1) for line in block.splitlines() if ": " in line)
+        events.append((lines.get("event"), json.loads(lines["data"])))
+    return events
+
+
+@pytest.fixture
+def stream_client(client, mock_graph):
+    async def astream_events(*args, **kwargs):
+        for event in mock_graph.scripted_events:
+            yield event
+
+    mock_graph.astream_events = astream_events
+    settings = client._transport.app.state.settings
+    settings.stream_progress_events = False
+    return client
+
+
+async def _stream(client, **params):
+    response = await client.get(
+        "/api/v1/chat/stream", params={"session_id": "s1", "message": "Pergunta", **params}
+    )
+    assert response.status_code == 200
+    return _events(response.text)
+
+
+@pytest.mark.asyncio
+async def test_stream_both_route_only_streams_synthesis(stream_client, mock_graph):
+    """Router and branch tokens never reach the client on the BOTH route."""
+    mock_graph.scripted_events = BOTH_RUN
+
+    events = await _stream(stream_client)
+
+    tokens = [data["token"] for name, data in events if name == "token"]
+    assert tokens == ["Resposta ", "final"]
+    assert events[-1][0] == "done"
+    assert events[-1][1]["agent_used"] == "both"
+    assert not any(name == "progress" for name, _ in events)
+
+
+@pytest.mark.asyncio
+async def test_stream_progress_events_per_stage(stream_client, mock_graph):
+    """``progress=true`` sends one event per stage, before the first token."""
+    mock_graph.scripted_events = BOTH_RUN
+
+    events = await _stream(stream_client, progress="true")
+
+    stages = [data["stage"] for name, data in events if name == "progress"]
+    assert stages == ["classifying", "searching_documents", "searching_web", "synthesizing"]
+    names = [name for name, _ in events]
+    assert names.index("progress") < names.index("token")
+
+
+@pytest.mark.asyncio
+async def test_stream_progress_default_from_settings(stream_client, mock_graph):
+    """``stream_progress_events`` enables progress events unless the query overrides it."""
+    mock_graph.scripted_events = BOTH_RUN
+    stream_client._transport.app.state.settings.stream_progress_events = True
+
+    enabled = await _stream(stream_client)
+    disabled = await _stream(stream_client, progress="false")
+
+    assert any(name == "progress" for name, _ in enabled)
+    assert not any(name == "progress" for name, _ in disabled)
+
+
+@pytest.mark.asyncio
+async def test_stream_falls_back_to_single_token(stream_client, mock_graph):
+    """An answer produced without streamed tokens is sent as one token."""
+    mock_graph.scripted_events = [_node_start("faq_agent"), _graph_end("FAQ", "Resposta")]
+
+    events = await _stream(stream_client)
+
+    assert [data["token"] for name, data in events if name == "token"] == ["Resposta"]
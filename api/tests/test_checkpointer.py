@@ -0,0 +1,74 @@
+"""Tests for checkpoint write reduction: per-turn durability and transient fields."""
+
+from unittest.mock import patch
+
+import pytest
+
+from tests.test_orchestrator import _build_graph, _fake_llm, _initial_state
+
+
+async def fake_faq(state, *args):
+    return {
+        "faq_response": "Franquia de 23kg. " * 50,
+        "sources": [{"type": "document", "title": "Manual"}],
+    }
+
+
+def _saver():
+    from langgraph.checkpoint.memory import MemorySaver
+
+    from src.core.checkpointer import strip_transient_fields
+
+    saver = strip_transient_fields(MemorySaver())
+    puts = []
+    original = saver.aput
+
+    def counting_aput(config, checkpoint, metadata, new_versions):
+        puts.append(checkpoint)
+        return original(config, checkpoint, metadata, new_versions)
+
+    saver.aput = counting_aput
+    return saver, puts
+
+
+@pytest.mark.asyncio
+async def test_exit_durability_writes_once_per_turn(mock_settings):
+    """Test a turn writes one checkpoint with ``durability="exit"``."""
+    saver, puts = _saver()
+    graph = _build_graph(mock_settings, _fake_llm("FAQ"), checkpointer=saver)
+    config = {"configurable": {"thread_id": "t1"}}
+
+    with patch("src.agents.faq_agent.run_faq_agent", side_effect=fake_faq):
+        await graph.ainvoke(_initial_state("Qual a franquia?"), config=config, durability="exit")
+        exit_puts = len(puts)
+        await graph.ainvoke(_initial_state("E para crianças?"), config=config, durability="async")
+
+    assert exit_puts == 1
+    assert len(puts) - exit_puts > 1
+
+
+@pytest.mark.asyncio
+async def test_transient_fields_not_persisted(mock_settings):
+    """Test answers and sources are returned but not checkpointed; history carries over."""
+    from src.state.graph_state import TRANSIENT_FIELDS
+
+    saver, _ = _saver()
+    graph = _build_graph(mock_settings, _fake_llm("FAQ"), checkpointer=saver)
+    config = {"configurable": {"thread_id": "t2"}}
+
+    with patch("src.agents.faq_agent.run_faq_agent", side_effect=fake_faq):
+        first = await graph.ainvoke(
+            _initial_state("Qual a franquia?"), config=config, durability="exit"
+        )
+        second = await graph.ainvoke(
+            _initial_state("E para crianças?"), config=config, durability="exit"
+        )
+
+    assert first["sources"] == [{"type": "document", "title": "Manual"}]
+    assert second["sources"] == [{"type": "document", "title": "Manual"}]
+    assert second["final_response"].startswith("Franquia de 23kg.")
+    assert len(second["messages"]) == 4
+
+    saved = (await saver.aget_tuple(config)).checkpoint["channel_values"]
+    assert TRANSIENT_FIELDS.isdisjoint(saved)
+    assert len(saved["messages"]) == 4
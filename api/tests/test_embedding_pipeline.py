@@ -0,0 +1,107 @@
+"""Tests for the batched, checkpointed embedding stage."""
+
+from unittest.mock import patch
+
+import pytest
+from langchain_core.embeddings import DeterministicFakeEmbedding
+
+from src.rag.embedding_pipeline import BatchEmbedder, EmbeddingCheckpoint, make_batches
+
+
+class RateLimitError(Exception):
+    """Stand-in for the provider's 429 error."""
+
+    status_code = 429
+
+
+class ScriptedEmbeddings(DeterministicFakeEmbedding):
+    """Fake embeddings that record batches and fail on chosen calls."""
+
+    batches: list = []
+    failures: dict = {}
+
+    def embed_documents(self, texts):
+        call = len(self.batches)
+        self.batches.append(list(texts))
+        if call in self.failures:
+            raise self.failures[call]
+        return super().embed_documents(texts)
+
+
+def _collect(embedder, ids, texts):
+    vectors = {}
+    for batch_ids, batch_vectors in embedder.embed(ids, texts):
+        vectors.update(zip(batch_ids, batch_vectors))
+    return vectors
+
+
+def test_batches_respect_token_and_item_budgets():
+    """Test batches stay under both budgets and cover every text in order."""
+    texts = ["a" * 40] * 7 + ["b" * 400] + ["c"]
+    batches = make_batches(texts, max_tokens=40, max_items=3)
+
+    assert [i for batch in batches for i in batch] == list(range(len(texts)))
+    assert all(len(batch) <= 3 for batch in batches)
+    # The oversized text gets a batch of its own instead of being dropped
+    assert [7] in batches
+
+
+def test_embeds_all_texts_concurrently():
+    """Test every text is embedded exactly once across concurrent batches."""
+    upstream = ScriptedEmbeddings(size=4, batches=[])
+    embedder = BatchEmbedder(upstream, max_tokens=10, max_items=2, concurrency=3)
+    ids = [f"id{i}" for i in range(9)]
+
+    vectors = _collect(embedder, ids, [f"texto {i}" for i in range(9)])
+
+    assert set(vectors) == set(ids)
+    assert sorted(t for batch in upstream.batches for t in batch) == sorted(
+        f"texto {i}" for i in range(9)
+    )
+    assert embedder.batches == 5
+
+
+def test_backs_off_and_retries_on_rate_limit():
+    """Test a 429 pauses and retries the batch instead of failing the run."""
+    upstream = ScriptedEmbeddings(size=4, batches=[], failures={0: RateLimitError()})
+    embedder = BatchEmbedder(upstream, concurrency=1, base_delay=0.0)
+
+    with patch("src.rag.embedding_pipeline.time.sleep"):
+        vectors = _collect(embedder, ["a", "b"], ["bagagem", "pets"])
+
+    assert set(vectors) == {"a", "b"}
+    assert embedder.rate_limited == 1
+    assert len(upstream.batches) == 2
+
+
+def test_gives_up_after_max_retries():
+    """Test persistent rate limiting eventually surfaces the error."""
+    failures = {i: RateLimitError() for i in range(3)}
+    upstream = ScriptedEmbeddings(size=4, batches=[], failures=failures)
+    embedder = BatchEmbedder(upstream, max_retries=2, base_delay=0.0)
+
+    with pytest.raises(RateLimitError):
+        _collect(embedder, ["a"], ["bagagem"])
+
+
+def test_crashed_run_resumes_from_checkpoint(tmp_path):
+    """Test finished batches are not re-embedded after a failure."""
+    checkpoint = EmbeddingCheckpoint(str(tmp_path), "text-embedding-3-small")
+    ids = ["a", "b", "c"]
+    texts = ["bagagem", "check-in", "pets"]
+
+    failing = ScriptedEmbeddings(size=4, batches=[], failures={1: ValueError("boom")})
+    embedder = BatchEmbedder(failing, max_items=1, concurrency=1, checkpoint=checkpoint)
+    with pytest.raises(ValueError):
+        _collect(embedder, ids, texts)
+
+    upstream = ScriptedEmbeddings(size=4, batches=[])
+    resumed = BatchEmbedder(upstream, max_items=1, concurrency=1, checkpoint=checkpoint)
+    vectors = _collect(resumed, ids, texts)
+
+    assert set(vectors) == set(ids)
+    retried = [t for batch in upstream.batches for t in batch]
+    assert "check-in" in retried
+    assert "bagagem" not in retried
+    checkpoint.clear()
+    assert checkpoint.load() == {}
@@ -0,0 +1,107 @@
+"""Tests for the caching embeddings client."""
+
+import pytest
+from langchain_core.embeddings import Embeddings
+
+from src.rag.embeddings import CachedEmbeddings, DiskEmbeddingStore
+
+
+class CountingEmbeddings(Embeddings):
+    """Deterministic embeddings that count how many texts were sent upstream."""
+
+    def __init__(self):
+        self.calls = 0
+
+    def _vector(self, text: str) -> list[float]:
+        return [float(len(text)), float(sum(map(ord, text)) % 97), 1.0]
+
+    def embed_documents(self, texts):
+        self.calls += len(texts)
+        return [self._vector(t) for t in texts]
+
+    def embed_query(self, text):
+        self.calls += 1
+        return self._vector(text)
+
+
+def test_normalized_queries_share_one_embedding():
+    """Test case, whitespace and accent variants hit the cache."""
+    upstream = CountingEmbeddings()
+    cached = CachedEmbeddings(upstream, model="m")
+
+    first = cached.embed_query("Qual a franquia de bagagem?")
+    second = cached.embed_query("  qual a FRANQUIA   de bagágem? ")
+
+    assert first == second
+    assert upstream.calls == 1
+    assert cached.stats.memory_hits == 1
+    assert cached.stats.misses == 1
+
+
+def test_documents_only_embed_misses():
+    """Test a batch embeds only unseen, de-duplicated texts."""
+    upstream = CountingEmbeddings()
+    cached = CachedEmbeddings(upstream, model="m")
+
+    cached.embed_documents(["a", "b"])
+    vectors = cached.embed_documents(["a", "b", "c", "c"])
+
+    assert upstream.calls == 3
+    assert vectors[2] == vectors[3]
+
+
+def test_lru_is_bounded():
+    """Test the memory tier evicts past max_entries."""
+    upstream = CountingEmbeddings()
+    cached = CachedEmbeddings(upstream, model="m", max_entries=2)
+
+    cached.embed_documents(["a", "b", "c"])
+    cached.embed_documents(["a"])
+
+    assert upstream.calls == 4
+
+
+def test_model_is_part_of_the_key():
+    """Test embeddings from different models never collide."""
+    upstream = CountingEmbeddings()
+    store = {}
+
+    class DictStore:
+        def get_many(self, keys):
+            return [store.get(k) for k in keys]
+
+        def set_many(self, items):
+            store.update(items)
+
+    CachedEmbeddings(upstream, model="a", store=DictStore()).embed_query("x")
+    CachedEmbeddings(upstream, model="b", store=DictStore()).embed_query("x")
+
+    assert upstream.calls == 2
+
+
+def test_disk_store_survives_restart(tmp_path):
+    """Test the persistent tier serves embeddings to a fresh process."""
+    path = str(tmp_path / "emb")
+    CachedEmbeddings(CountingEmbeddings(), model="m", store=DiskEmbeddingStore(path)).embed_query(
+        "bagagem"
+    )
+
+    upstream = CountingEmbeddings()
+    cached = CachedEmbeddings(upstream, model="m", store=DiskEmbeddingStore(path))
+    vector = cached.embed_query("bagagem")
+
+    assert upstream.calls == 0
+    assert cached.stats.store_hits == 1
+    assert vector == pytest.approx(upstream._vector("bagagem"))
+
+
+@pytest.mark.asyncio
+async def test_async_query_uses_cache():
+    """Test aembed_query shares the cache with the sync path."""
+    upstream = CountingEmbeddings()
+    cached = CachedEmbeddings(upstream, model="m")
+
+    cached.embed_query("check-in")
+    await cached.aembed_query("Check-in")
+
+    assert upstream.calls == 1
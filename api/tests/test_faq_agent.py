@@ -22,17 +22,15 @@ async def test_faq_agent_with_documents(mock_settings):
         metadata={"page_number": 1, "section": "Seção 1.1", "source": "manual.pdf"},
     )
 
-    mock_vectorstore = MagicMock()
-    mock_retriever = AsyncMock()
-    mock_retriever.ainvoke.return_value = [mock_doc]
-    mock_vectorstore.as_retriever.return_value = mock_retriever
+    mock_engine = MagicMock()
+    mock_engine.aretrieve = AsyncMock(return_value=[mock_doc])
 
     state = {
         "user_query": "Qual o limite de bagagem de mão?",
         "sources": [],
     }
 
-    result = await run_faq_agent(state, mock_llm, mock_vectorstore, mock_settings)
+    result = await run_faq_agent(state, mock_llm, mock_engine, mock_settings)
 
     assert result["faq_response"] is not None
     assert "Bagagem" in result["faq_response"]
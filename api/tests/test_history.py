@@ -0,0 +1,140 @@
+"""Tests for conversation-history windows and the rolling summary."""
+
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import pytest
+from langchain_core.messages import AIMessage, HumanMessage, SystemMessage
+from langgraph.graph.message import add_messages
+
+from src.agents.history import estimate_tokens, select_history, update_history_summary
+
+
+def _conversation(turns: int, size: int = 400) -> list:
+    messages = []
+    for i in range(turns):
+        messages.append(HumanMessage(content=f"pergunta {i} " + "x" * size, id=f"h{i}"))
+        messages.append(AIMessage(content=f"resposta {i} " + "y" * size, id=f"a{i}"))
+    messages.append(HumanMessage(content="pergunta atual", id="current"))
+    return messages
+
+
+def test_window_respects_budget():
+    """Test only the most recent turns that fit the budget are kept."""
+    state = {"messages": _conversation(20)}
+
+    history = select_history(state, budget_tokens=300)
+
+    assert sum(estimate_tokens(m.content) for m in history) <= 300
+    assert history[-1].id == "a19"
+    assert all(m.id != "current" for m in history)
+
+
+def test_oversized_last_message_is_truncated():
+    """Test a tiny budget still carries the tail of the last message."""
+    state = {"messages": _conversation(1, size=4000)}
+
+    history = select_history(state, budget_tokens=50)
+
+    assert len(history) == 1
+    assert estimate_tokens(history[0].content) <= 52
+    assert history[0].content.endswith("y")
+
+
+def test_summary_is_prepended_and_summarized_turns_skipped():
+    """Test the summary replaces turns that were folded into it."""
+    state = {
+        "messages": _conversation(3, size=10),
+        "history_summary": "Cliente vai a Lisboa com um cachorro.",
+        "summarized_until": "a1",
+    }
+
+    history = select_history(state, budget_tokens=1000)
+
+    assert isinstance(history[0], SystemMessage)
+    assert "Lisboa" in history[0].content
+    assert [m.id for m in history[1:]] == ["h2", "a2"]
+    assert select_history(state, 1000, include_summary=False)[0].id == "h2"
+
+
+@pytest.mark.asyncio
+async def test_summary_not_updated_below_trigger(mock_settings):
+    """Test short sessions never pay for a summarization call."""
+    llm = AsyncMock()
+    state = {"messages": _conversation(2, size=10)}
+
+    assert await update_history_summary(state, llm, mock_settings) == {}
+    llm.ainvoke.assert_not_called()
+
+
+@pytest.mark.asyncio
+async def test_summary_folds_overflow(mock_settings):
+    """Test turns outside the agent window are folded into the summary."""
+    mock_settings.history_budget_agent_tokens = 500
+    mock_settings.history_summary_trigger_tokens = 200
+    llm = AsyncMock()
+    llm.ainvoke.return_value = MagicMock(content="Resumo novo")
+    state = {"messages": _conversation(10), "history_summary": "Resumo antigo"}
+
+    update = await update_history_summary(state, llm, mock_settings)
+
+    assert update["history_summary"] == "Resumo novo"
+    prompt = llm.ainvoke.call_args.args[0][1].content
+    assert "Resumo antigo" in prompt
+    assert "pergunta 0" in prompt
+
+    messages = add_messages(state["messages"], update["messages"])
+    window = select_history(
+        {**state, **update, "messages": messages}, budget_tokens=10_000, include_summary=False
+    )
+    assert sum(estimate_tokens(m.content) for m in window) <= 500
+    # Folded turns are pruned from the checkpointed history; the rest is kept
+    assert [m.id for m in messages] == [m.id for m in window] + ["current"]
+    assert messages[0].id != "h0"
+
+
+@pytest.mark.asyncio
+async def test_summary_keeps_messages_without_pruning(mock_settings):
+    """Test folded messages stay in ``messages`` when pruning is disabled."""
+    mock_settings.history_budget_agent_tokens = 500
+    mock_settings.history_summary_trigger_tokens = 200
+    mock_settings.checkpoint_prune_summarized = False
+    llm = AsyncMock()
+    llm.ainvoke.return_value = MagicMock(content="Resumo novo")
+
+    update = await update_history_summary(
+        {"messages": _conversation(10)}, llm, mock_settings
+    )
+
+    assert "messages" not in update
+    assert update["summarized_until"]
+
+
+@pytest.mark.asyncio
+async def test_summary_runs_after_the_graph_and_lands_in_checkpoint(mock_settings):
+    """Test the graph answers without summarizing and the scheduled summary is saved."""
+    from langgraph.checkpoint.memory import MemorySaver
+
+    from src.agents.history import HistorySummarizer
+    from tests.test_orchestrator import _build_graph, _fake_llm, _initial_state
+
+    mock_settings.history_budget_agent_tokens = 300
+    mock_settings.history_summary_trigger_tokens = 200
+    graph = _build_graph(mock_settings, _fake_llm("SEARCH"), checkpointer=MemorySaver())
+    config = {"configurable": {"thread_id": "s1"}}
+    state = {**_initial_state("pergunta atual"), "messages": _conversation(10)}
+
+    with patch("src.agents.search_agent.run_search_agent", AsyncMock(return_value={})):
+        result = await graph.ainvoke(state, config=config)
+    assert not result.get("history_summary")
+
+    summary_llm = AsyncMock()
+    summary_llm.ainvoke.return_value = MagicMock(content="Resumo novo")
+    summarizer = HistorySummarizer(graph, summary_llm, mock_settings)
+    summarizer.schedule(config)
+    summarizer.schedule(config)  # already running for this session
+    await summarizer.aclose()
+
+    saved = (await graph.aget_state(config)).values
+    assert saved["history_summary"] == "Resumo novo"
+    assert len(saved["messages"]) < len(result["messages"])
+    summary_llm.ainvoke.assert_awaited_once()
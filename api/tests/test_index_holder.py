@@ -0,0 +1,128 @@
+"""Tests for the hot-swappable vectorstore holder and the admin reload endpoint."""
+
+import os
+import time
+from unittest.mock import MagicMock, patch
+
+import pytest
+from langchain_core.documents import Document
+
+from src.rag.index_holder import VectorStoreHolder
+
+
+@pytest.fixture
+def write_index(tmp_path, mock_settings, fake_embeddings):
+    """Persist an index of the given texts at a fresh vectorstore path."""
+    from langchain_community.vectorstores import FAISS
+
+    from src.rag.vectorstore import save_vectorstore
+
+    index_path = str(tmp_path / "index")
+    mock_settings.vectorstore_path = index_path
+
+    def write(*texts):
+        store = FAISS.from_documents([Document(page_content=t) for t in texts], fake_embeddings)
+        save_vectorstore(store, index_path, "fake-model")
+        # Make sure the fingerprint changes even on coarse mtime filesystems
+        future = time.time() + len(texts)
+        for name in os.listdir(index_path):
+            os.utime(os.path.join(index_path, name), (future, future))
+
+    return write
+
+
+@pytest.mark.asyncio
+async def test_reload_swaps_and_keeps_old_snapshot(write_index, mock_settings, fake_embeddings):
+    """Test a rebuilt index is swapped in while a held snapshot stays usable."""
+    holder = VectorStoreHolder()
+    write_index("bagagem")
+    with patch("src.rag.embeddings.get_embeddings", return_value=fake_embeddings):
+        assert await holder.reload(mock_settings)
+        in_flight = holder.current
+
+        write_index("bagagem", "check-in")
+        assert await holder.reload(mock_settings)
+
+    assert holder.current is not in_flight
+    assert holder.vectorstore.index.ntotal == 2
+    assert holder.version != in_flight.version
+    # A request that started before the swap still searches the old index
+    old = in_flight.vectorstore.similarity_search("bagagem", k=5)
+    assert [d.page_content for d in old] == ["bagagem"]
+
+
+@pytest.mark.asyncio
+async def test_reload_attaches_loaded_snapshot(write_index, mock_settings, fake_embeddings):
+    """Test reload serves the snapshot it loaded instead of rebuilding its engine."""
+    from src.rag.index_holder import load_snapshot
+
+    holder = VectorStoreHolder()
+    write_index("bagagem")
+    loaded = []
+
+    def load(settings):
+        loaded.append(load_snapshot(settings))
+        return loaded[-1]
+
+    with (
+        patch("src.rag.embeddings.get_embeddings", return_value=fake_embeddings),
+        patch("src.rag.index_holder.load_snapshot", side_effect=load),
+    ):
+        assert await holder.reload(mock_settings)
+
+    assert holder.current is loaded[0]
+    assert holder.current.engine is not None
+
+
+@pytest.mark.asyncio
+async def test_reload_is_noop_when_version_unchanged(write_index, mock_settings, fake_embeddings):
+    """Test polling an unchanged index does not reload it."""
+    holder = VectorStoreHolder()
+    write_index("bagagem")
+    with patch("src.rag.embeddings.get_embeddings", return_value=fake_embeddings):
+        await holder.reload(mock_settings)
+        assert not await holder.reload(mock_settings)
+
+    assert holder.swaps == 1
+
+
+@pytest.mark.asyncio
+async def test_reload_without_index_keeps_degraded_mode(tmp_path, mock_settings):
+    """Test reload leaves an empty holder empty when nothing is on disk."""
+    mock_settings.vectorstore_path = str(tmp_path / "missing")
+    holder = VectorStoreHolder()
+
+    assert not await holder.reload(mock_settings)
+    assert not holder.ready
+
+
+@pytest.mark.asyncio
+async def test_admin_reload_requires_token(client):
+    """Test the reload endpoint is hidden without a token and rejects a wrong one."""
+    app = client._transport.app
+    app.state.settings.admin_token.get_secret_value.return_value = ""
+    assert (await client.post("/api/v1/admin/reload-index")).status_code == 404
+
+    app.state.settings.admin_token.get_secret_value.return_value = "s3cret"
+    response = await client.post("/api/v1/admin/reload-index", headers={"X-Admin-Token": "nope"})
+    assert response.status_code == 403
+
+
+@pytest.mark.asyncio
+async def test_admin_reload_swaps_index(client):
+    """Test an authorized reload reports the new and previous versions."""
+    app = client._transport.app
+    app.state.settings.admin_token.get_secret_value.return_value = "s3cret"
+    holder = app.state.vectorstore_holder
+
+    async def fake_reload(settings, force=False):
+        holder.attach(MagicMock(), "v2")
+        return True
+
+    with patch.object(holder, "reload", side_effect=fake_reload):
+        response = await client.post(
+            "/api/v1/admin/reload-index", headers={"X-Admin-Token": "s3cret"}
+        )
+
+    assert response.status_code == 200
+    assert response.json() == {"reloaded": True, "version": "v2", "previous_version": "test"}
@@ -0,0 +1,128 @@
+"""Tests for incremental, content-hashed ingestion."""
+
+import os
+from unittest.mock import patch
+
+import pytest
+from langchain_core.documents import Document
+
+from src.rag.embeddings import CachedEmbeddings
+from tests.conftest import CountingEmbeddings
+
+
+def _chunks(*texts):
+    return [
+        Document(page_content=text, metadata={"page_number": i + 1, "source": "manual.pdf"})
+        for i, text in enumerate(texts)
+    ]
+
+
+@pytest.fixture
+def build(tmp_path, mock_settings):
+    """Run build_vectorstore against tmp_path with fresh counting embeddings."""
+    from src.rag.ingest import build_vectorstore
+
+    mock_settings.vectorstore_path = str(tmp_path / "index")
+    mock_settings.embedding_checkpoint_path = str(tmp_path / "checkpoint")
+
+    def run(chunks):
+        upstream = CountingEmbeddings(size=8)
+        # No memory tier carry-over between runs: reuse must come from the index
+        embeddings = CachedEmbeddings(upstream, model=mock_settings.embedding_model)
+        with patch("src.rag.embeddings.get_embeddings", return_value=embeddings):
+            report = build_vectorstore(chunks, mock_settings)
+        return report, upstream.calls
+
+    return run
+
+
+def test_first_build_embeds_everything(build):
+    """Test a fresh build embeds every chunk."""
+    report, calls = build(_chunks("bagagem", "check-in", "pets"))
+
+    assert (report.embedded, report.reused, calls) == (3, 0, 3)
+
+
+def test_one_page_edit_embeds_one_chunk(build, mock_settings):
+    """Test only the changed chunk is re-embedded and the removed one dropped."""
+    from src.rag.vectorstore import load_vectorstore
+
+    build(_chunks("bagagem", "check-in", "pets"))
+    report, calls = build(_chunks("bagagem", "check-in online"))
+
+    assert calls == 1
+    assert (report.embedded, report.reused, report.removed) == (1, 1, 2)
+
+    loaded = load_vectorstore(mock_settings)
+    contents = sorted(d.page_content for d in loaded.docstore._dict.values())
+    assert contents == ["bagagem", "check-in online"]
+    assert loaded.index.ntotal == 2
+
+
+def test_unchanged_corpus_leaves_index_untouched(build, tmp_path):
+    """Test a no-op rebuild neither embeds nor rewrites (index version is stable)."""
+    from src.rag.vectorstore import get_index_version
+
+    build(_chunks("bagagem", "check-in"))
+    version = get_index_version(str(tmp_path / "index"))
+    report, calls = build(_chunks("bagagem", "check-in"))
+
+    assert not report.changed
+    assert calls == 0
+    assert get_index_version(str(tmp_path / "index")) == version
+
+
+def test_embedding_model_change_reembeds(build, mock_settings):
+    """Test vectors from another embedding model are never reused."""
+    build(_chunks("bagagem", "check-in"))
+    mock_settings.embedding_model = "text-embedding-3-large"
+
+    report, calls = build(_chunks("bagagem", "check-in"))
+
+    assert calls == 2
+    assert report.reused == 0
+
+
+PDF_PATH = os.path.join(os.path.dirname(__file__), "..", "data", "manual-politicas-viagem-blis.pdf")
+
+
+@pytest.mark.skipif(not os.path.exists(PDF_PATH), reason="sample PDF not available")
+def test_parallel_extraction_matches_serial():
+    from src.rag import ingest
+
+    serial = ingest.extract_pages_with_tables(PDF_PATH, workers=1)
+    # Force several small shards so the merge order is exercised
+    with patch.object(ingest, "PAGES_PER_SHARD_MIN", 2):
+        parallel = ingest.extract_pages_with_tables(PDF_PATH, workers=3)
+
+    assert [d.page_content for d in parallel] == [d.page_content for d in serial]
+    assert [d.metadata for d in parallel] == [d.metadata for d in serial]
+    assert [d.metadata["page_number"] for d in parallel] == sorted(
+        d.metadata["page_number"] for d in parallel
+    )
+
+
+@pytest.mark.skipif(not os.path.exists(PDF_PATH), reason="sample PDF not available")
+def test_parallel_extraction_from_a_thread_spawns_workers():
+    """Test the pool works from a worker thread, as in auto-ingestion, without forking."""
+    from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+
+    from src.rag import ingest
+
+    contexts = []
+
+    def pool(*args, **kwargs):
+        contexts.append(kwargs["mp_context"].get_start_method())
+        return ProcessPoolExecutor(*args, **kwargs)
+
+    with (
+        patch.object(ingest, "PAGES_PER_SHARD_MIN", 4),
+        patch.object(ingest, "ProcessPoolExecutor", side_effect=pool),
+        ThreadPoolExecutor(max_workers=1) as thread,
+    ):
+        documents = thread.submit(ingest.extract_pages_with_tables, PDF_PATH, 2).result(timeout=120)
+
+    assert contexts == ["spawn"]
+    assert [d.metadata["page_number"] for d in documents] == list(
+        range(1, len(documents) + 1)
+    )
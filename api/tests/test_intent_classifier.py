@@ -0,0 +1,71 @@
+"""Tests for the local fast-path intent classifier."""
+
+import pytest
+
+from src.agents.intent_classifier import IntentStats, KeywordIntentClassifier
+from src.state.graph_state import AgentRoute
+
+
+@pytest.mark.parametrize(
+    ("query", "expected"),
+    [
+        ("Qual o limite de bagagem de mão?", AgentRoute.FAQ),
+        ("Como funciona o check-in online?", AgentRoute.FAQ),
+        ("Qual a política de reembolso?", AgentRoute.FAQ),
+        ("Quanto está a passagem SP-Lisboa em março?", AgentRoute.SEARCH),
+        ("Tem promoção LATAM para Orlando?", AgentRoute.SEARCH),
+        (
+            "Qual a franquia de bagagem da LATAM e quanto custa despachar extra "
+            "no voo pra Orlando?",
+            AgentRoute.BOTH,
+        ),
+    ],
+)
+def test_confident_queries_are_classified(query, expected):
+    """Test queries with clear keyword signals skip the LLM."""
+    assert KeywordIntentClassifier(threshold=0.8).classify(query) == expected
+
+
+def test_unknown_query_falls_back():
+    """Test queries without signals return None so the LLM decides."""
+    assert KeywordIntentClassifier().classify("Olá, tudo bem?") is None
+
+
+def test_weak_mixed_signals_fall_back():
+    """Test ambiguous prose below the threshold goes to the LLM."""
+    prediction = KeywordIntentClassifier().predict("Preciso de documento para viajar?")
+    assert prediction.confidence < 0.8
+
+
+def test_follow_up_with_history_falls_back():
+    """Test context-dependent follow-ups are never resolved locally."""
+    classifier = KeywordIntentClassifier()
+    assert classifier.classify("e a bagagem?", has_history=True) is None
+    assert classifier.classify("e a bagagem?", has_history=False) == AgentRoute.FAQ
+    assert classifier.classify("Então, e a bagagem?", has_history=True) is None
+
+
+def test_standalone_question_with_history_keeps_fast_path():
+    """Test the verb "é" is not mistaken for the follow-up conjunction "e"."""
+    classifier = KeywordIntentClassifier()
+    assert classifier.classify("Qual é a franquia de bagagem?", has_history=True) == AgentRoute.FAQ
+    query = "É permitido levar bagagem de mão?"
+    assert classifier.classify(query, has_history=True) == AgentRoute.FAQ
+
+
+def test_threshold_is_configurable():
+    """Test raising the threshold sends borderline cases to the LLM."""
+    query = "Qual o limite de bagagem de mão?"
+    assert KeywordIntentClassifier(threshold=0.99).classify(query) is None
+
+
+def test_stats_hit_and_fallback_rate():
+    """Test counters report hit rate and fallback rate."""
+    stats = IntentStats()
+    stats.record("FAQ", fast_path=True)
+    stats.record("FAQ", fast_path=True)
+    stats.record("BOTH", fast_path=False)
+    assert stats.total == 3
+    assert stats.hit_rate == pytest.approx(2 / 3)
+    assert stats.fallback_rate == pytest.approx(1 / 3)
+    assert stats.by_route == {"FAQ": 2, "BOTH": 1}
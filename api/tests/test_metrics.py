@@ -0,0 +1,89 @@
+"""Tests for the Prometheus metrics and the /metrics endpoint."""
+
+import asyncio
+
+import pytest
+from prometheus_client import REGISTRY
+
+from tests.test_orchestrator import _build_graph, _fake_llm, _initial_state
+
+
+def _sample(name, **labels):
+    return REGISTRY.get_sample_value(name, labels) or 0.0
+
+
+@pytest.mark.asyncio
+async def test_nodes_observed_with_route_and_cache(mock_settings):
+    """Test each node is timed with the request's route and answer-cache status."""
+    from unittest.mock import patch
+
+    from src.core.metrics import record_answer_cache, start_request
+
+    async def fake_faq(state, *args):
+        record_answer_cache(hit=True)
+        return {"faq_response": "Franquia de 23kg.", "sources": []}
+
+    node_count = "blis_graph_node_seconds_count"
+    before_faq = _sample(node_count, node="faq_agent", route="FAQ", cache="hit")
+    before_synth = _sample(node_count, node="synthesize_response", route="FAQ", cache="hit")
+
+    graph = _build_graph(mock_settings, _fake_llm("FAQ"))
+
+    async def request():
+        labels = start_request()
+        await graph.ainvoke(_initial_state("Qual a franquia de bagagem?"))
+        return labels
+
+    with patch("src.agents.faq_agent.run_faq_agent", side_effect=fake_faq):
+        labels = await asyncio.create_task(request())
+
+    assert (labels.route, labels.cache) == ("FAQ", "hit")
+    assert _sample(node_count, node="faq_agent", route="FAQ", cache="hit") == before_faq + 1
+    assert (
+        _sample(node_count, node="synthesize_response", route="FAQ", cache="hit")
+        == before_synth + 1
+    )
+
+
+@pytest.mark.asyncio
+async def test_checkpointer_operations_observed(mock_settings):
+    """Test checkpoint reads and writes are timed without changing the saver type."""
+    from unittest.mock import patch
+
+    from langgraph.checkpoint.memory import MemorySaver
+
+    from src.core.metrics import instrument_checkpointer
+
+    async def fake_search(state, llm, settings):
+        return {"search_response": "Resultado.", "sources": []}
+
+    checkpointer = instrument_checkpointer(MemorySaver())
+    before_get = _sample("blis_checkpointer_seconds_count", operation="get")
+    before_put = _sample("blis_checkpointer_seconds_count", operation="put")
+
+    graph = _build_graph(mock_settings, _fake_llm("SEARCH"), checkpointer=checkpointer)
+    with patch("src.agents.search_agent.run_search_agent", side_effect=fake_search):
+        await graph.ainvoke(
+            _initial_state("Preço da passagem?"), config={"configurable": {"thread_id": "m1"}}
+        )
+
+    assert isinstance(checkpointer, MemorySaver)
+    assert _sample("blis_checkpointer_seconds_count", operation="get") > before_get
+    assert _sample("blis_checkpointer_seconds_count", operation="put") > before_put
+
+
+@pytest.mark.asyncio
+async def test_metrics_endpoint(client):
+    """Test /metrics exposes the histograms in the Prometheus text format."""
+    await client.post(
+        "/api/v1/chat", json={"session_id": "metrics", "message": "Qual o limite de bagagem?"}
+    )
+
+    response = await client.get("/metrics")
+
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/plain")
+    assert 'blis_chat_request_seconds_count{cache="none",endpoint="chat",route=""}' in (
+        response.text
+    )
+    assert "blis_external_call_seconds" in response.text
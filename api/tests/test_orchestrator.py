@@ -63,3 +63,240 @@ def test_route_by_intent_both():
     else:
         result = "faq_agent"
     assert result == "both_faq"
+
+
+def _fake_llm(route: str):
+    """LLM mock that classifies as ``route`` and echoes a synthesized answer."""
+    from unittest.mock import AsyncMock, MagicMock
+
+    from src.rag.prompts import CLASSIFY_INTENT_SYSTEM
+
+    async def ainvoke(messages, *args, **kwargs):
+        if messages[0].content == CLASSIFY_INTENT_SYSTEM:
+            return MagicMock(content=route)
+        return MagicMock(content="Resposta sintetizada")
+
+    llm = MagicMock()
+    llm.ainvoke = AsyncMock(side_effect=ainvoke)
+    return llm
+
+
+def _build_graph(mock_settings, llm, checkpointer=None, fast_path=False, vectorstore=...):
+    """Build the real graph around a fake LLM; the keyword fast path is off by default.
+
+    Unless given, the knowledge base is a ready holder around a mock vectorstore.
+    """
+    from unittest.mock import MagicMock, patch
+
+    from src.agents.orchestrator import build_graph
+    from src.rag.index_holder import VectorStoreHolder
+
+    if vectorstore is ...:
+        vectorstore = VectorStoreHolder(MagicMock(), "test")
+    mock_settings.intent_fast_path_enabled = fast_path
+    with patch("src.agents.orchestrator.ChatOpenAI", return_value=llm):
+        return build_graph(mock_settings, vectorstore, checkpointer)
+
+
+def _initial_state(query: str) -> dict:
+    from langchain_core.messages import HumanMessage
+
+    return {
+        "messages": [HumanMessage(content=query)],
+        "user_query": query,
+        "route": "",
+        "faq_response": None,
+        "search_response": None,
+        "final_response": "",
+        "sources": None,
+    }
+
+
+@pytest.mark.asyncio
+async def test_both_route_runs_agents_concurrently(mock_settings):
+    """Test BOTH route fans out to FAQ and Search at once and merges their sources."""
+    import asyncio
+    from unittest.mock import patch
+
+    faq_started = asyncio.Event()
+    search_started = asyncio.Event()
+
+    async def fake_faq(state, *args):
+        faq_started.set()
+        await asyncio.wait_for(search_started.wait(), timeout=1)
+        return {"faq_response": "FAQ", "sources": [{"type": "document", "title": "Doc"}]}
+
+    async def fake_search(state, llm, settings):
+        search_started.set()
+        await asyncio.wait_for(faq_started.wait(), timeout=1)
+        return {"search_response": "WEB", "sources": [{"type": "web", "title": "Web"}]}
+
+    graph = _build_graph(mock_settings, _fake_llm("BOTH"))
+    with (
+        patch("src.agents.faq_agent.run_faq_agent", side_effect=fake_faq),
+        patch("src.agents.search_agent.run_search_agent", side_effect=fake_search),
+    ):
+        result = await graph.ainvoke(_initial_state("Pet para Portugal?"))
+
+    assert result["final_response"] == "Resposta sintetizada"
+    assert sorted(s["type"] for s in result["sources"]) == ["document", "web"]
+
+
+@pytest.mark.asyncio
+async def test_both_route_search_timeout_keeps_faq_answer(mock_settings):
+    """Test a slow Search branch is cut off while the FAQ answer still comes back."""
+    import asyncio
+    from unittest.mock import patch
+
+    mock_settings.search_branch_timeout = 0.05
+
+    async def fake_faq(state, *args):
+        return {"faq_response": "Resposta do manual", "sources": []}
+
+    async def slow_search(state, llm, settings):
+        await asyncio.sleep(5)
+
+    graph = _build_graph(mock_settings, _fake_llm("BOTH"))
+    with (
+        patch("src.agents.faq_agent.run_faq_agent", side_effect=fake_faq),
+        patch("src.agents.search_agent.run_search_agent", side_effect=slow_search),
+    ):
+        result = await graph.ainvoke(_initial_state("Pet para Portugal?"))
+
+    assert result["final_response"] == "Resposta do manual"
+
+
+@pytest.mark.asyncio
+async def test_sources_reset_between_turns(mock_settings):
+    """Test sources from a previous turn do not leak into the next one."""
+    from unittest.mock import patch
+
+    from langgraph.checkpoint.memory import MemorySaver
+
+    async def fake_faq(state, *args):
+        return {"faq_response": "FAQ", "sources": [{"type": "document", "title": "Doc"}]}
+
+    graph = _build_graph(mock_settings, _fake_llm("FAQ"), MemorySaver())
+    config = {"configurable": {"thread_id": "s1"}}
+    with patch("src.agents.faq_agent.run_faq_agent", side_effect=fake_faq):
+        await graph.ainvoke(_initial_state("Bagagem?"), config=config)
+        result = await graph.ainvoke(_initial_state("E check-in?"), config=config)
+
+    assert len(result["sources"]) == 1
+
+
+@pytest.mark.asyncio
+async def test_fast_path_skips_llm_router(mock_settings):
+    """Test a confident keyword match routes without calling the LLM classifier."""
+    from unittest.mock import patch
+
+    from src.rag.prompts import CLASSIFY_INTENT_SYSTEM
+
+    async def fake_search(state, llm, settings):
+        return {"search_response": "R$3.500", "sources": []}
+
+    llm = _fake_llm("FAQ")
+    graph = _build_graph(mock_settings, llm, fast_path=True)
+    with patch("src.agents.search_agent.run_search_agent", side_effect=fake_search):
+        result = await graph.ainvoke(_initial_state("Quanto custa a passagem SP-Lisboa?"))
+
+    assert result["route"] == "SEARCH"
+    prompts = [call.args[0][0].content for call in llm.ainvoke.call_args_list]
+    assert CLASSIFY_INTENT_SYSTEM not in prompts
+
+
+@pytest.mark.asyncio
+async def test_degraded_mode_routes_to_search_until_attached(mock_settings):
+    """Test an empty holder sends FAQ questions to search, then FAQ once attached."""
+    from unittest.mock import MagicMock, patch
+
+    from src.rag.index_holder import VectorStoreHolder
+
+    async def fake_faq(state, *args):
+        return {"faq_response": "Franquia de 23kg.", "sources": []}
+
+    async def fake_search(state, llm, settings):
+        return {"search_response": "Resultado da web.", "sources": []}
+
+    holder = VectorStoreHolder()
+    llm = _fake_llm("FAQ")
+    graph = _build_graph(mock_settings, llm, vectorstore=holder)
+    with (
+        patch("src.agents.faq_agent.run_faq_agent", side_effect=fake_faq),
+        patch("src.agents.search_agent.run_search_agent", side_effect=fake_search),
+    ):
+        degraded = await graph.ainvoke(_initial_state("Qual a franquia de bagagem?"))
+        holder.attach(MagicMock(), "v1")
+        attached = await graph.ainvoke(_initial_state("Qual a franquia de bagagem?"))
+
+    assert degraded["route"] == "SEARCH"
+    assert degraded["final_response"] == "Resultado da web."
+    assert attached["route"] == "FAQ"
+    assert attached["final_response"] == "Franquia de 23kg."
+
+
+@pytest.mark.asyncio
+async def test_both_branches_use_non_streaming_model(mock_settings):
+    """Test BOTH branches get the non-streaming model; single routes get the streaming one."""
+    from unittest.mock import patch
+
+    from src.agents.orchestrator import build_graph
+    from src.rag.index_holder import VectorStoreHolder
+
+    streaming, quiet = _fake_llm("BOTH"), _fake_llm("BOTH")
+    used = []
+
+    async def fake_faq(state, llm, *args):
+        used.append(("faq", llm))
+        return {"faq_response": "FAQ", "sources": []}
+
+    async def fake_search(state, llm, settings):
+        used.append(("search", llm))
+        return {"search_response": "WEB", "sources": []}
+
+    def chat_openai(**kwargs):
+        return quiet if kwargs.get("disable_streaming") else streaming
+
+    mock_settings.intent_fast_path_enabled = False
+    with patch("src.agents.orchestrator.ChatOpenAI", side_effect=chat_openai):
+        graph = build_graph(mock_settings, VectorStoreHolder(_fake_llm("FAQ"), "test"))
+    with (
+        patch("src.agents.faq_agent.run_faq_agent", side_effect=fake_faq),
+        patch("src.agents.search_agent.run_search_agent", side_effect=fake_search),
+    ):
+        await graph.ainvoke(_initial_state("Pet para Portugal?"))
+
+    assert sorted(name for name, _ in used) == ["faq", "search"]
+    assert all(llm is quiet for _, llm in used)
+    # The router ran on the quiet model; only synthesis streamed
+    assert quiet.ainvoke.await_count == 1
+    assert streaming.ainvoke.await_count == 1
+
+
+@pytest.mark.asyncio
+async def test_injected_llm_replaces_openai(mock_settings):
+    """Test a given chat model is used instead of ChatOpenAI, unstreamed where quiet."""
+    from unittest.mock import patch
+
+    from langchain_core.language_models.fake_chat_models import GenericFakeChatModel
+    from langchain_core.messages import AIMessage
+
+    from src.agents.orchestrator import build_graph
+    from src.rag.index_holder import VectorStoreHolder
+
+    used = []
+
+    async def fake_search(state, llm, settings):
+        used.append(llm)
+        return {"search_response": "Resultado da web.", "sources": []}
+
+    llm = GenericFakeChatModel(messages=iter([AIMessage(content="SEARCH")]))
+    mock_settings.intent_fast_path_enabled = False
+    with patch("src.agents.orchestrator.ChatOpenAI", side_effect=AssertionError):
+        graph = build_graph(mock_settings, VectorStoreHolder(), llm=llm)
+    with patch("src.agents.search_agent.run_search_agent", side_effect=fake_search):
+        result = await graph.ainvoke(_initial_state("Qual o preço da passagem?"))
+
+    assert result["route"] == "SEARCH"
+    assert used == [llm]
+    assert not llm.disable_streaming
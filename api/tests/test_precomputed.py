@@ -0,0 +1,130 @@
+"""Tests for the precomputed canonical answers built at ingestion time."""
+
+from unittest.mock import AsyncMock, MagicMock
+
+import pytest
+from langchain_core.documents import Document
+
+from src.rag.bm25 import BM25Index
+from src.rag.index_holder import IndexSnapshot
+from src.rag.precomputed import (
+    ANSWERS_FILE,
+    PrecomputedAnswer,
+    PrecomputedAnswers,
+    build_precomputed_answers,
+    chunk_fingerprint,
+    read_questions,
+)
+from src.rag.prompts import FAQ_AGENT_SYSTEM
+from tests.test_retrieval import CHUNKS
+
+SOURCES = [{"type": "document", "content_preview": "Franquia...", "page": 2}]
+
+
+def _answers(ids=("a", "b")) -> PrecomputedAnswers:
+    entries = [
+        PrecomputedAnswer("Qual a franquia?", "23 kg", SOURCES),
+        PrecomputedAnswer("Posso levar pet?", "Sim, na cabine", []),
+    ]
+    return PrecomputedAnswers(entries, [[1.0, 0.0], [0.0, 1.0]], chunk_fingerprint(list(ids)), "m")
+
+
+def test_round_trip_and_match(tmp_path):
+    """Test the artifact survives save/load and matches by cosine similarity."""
+    _answers().save(str(tmp_path))
+    loaded = PrecomputedAnswers.load(str(tmp_path), ["a", "b"], "m")
+
+    assert len(loaded) == 2
+    hit = loaded.match([0.99, 0.05], threshold=0.95)
+    assert (hit.answer, hit.sources) == ("23 kg", SOURCES)
+    assert loaded.match([0.7, 0.7], threshold=0.95) is None
+
+
+def test_stale_artifact_is_ignored(tmp_path):
+    """Test answers built from another index or embedding model are never served."""
+    _answers().save(str(tmp_path))
+
+    assert PrecomputedAnswers.load(str(tmp_path), ["a", "c"], "m") is None
+    assert PrecomputedAnswers.load(str(tmp_path), ["a", "b"], "other-model") is None
+    assert PrecomputedAnswers.load(str(tmp_path / "missing"), ["a", "b"], "m") is None
+    assert (tmp_path / ANSWERS_FILE).exists()
+
+
+def test_read_questions_skips_comments_and_blanks(tmp_path):
+    path = tmp_path / "questions.txt"
+    path.write_text("# comentário\nQual a franquia?\n\n  Posso levar pet?  \n", encoding="utf-8")
+
+    assert read_questions(str(path)) == ["Qual a franquia?", "Posso levar pet?"]
+
+
+@pytest.mark.asyncio
+async def test_faq_agent_serves_precomputed_answer(mock_settings):
+    """Test a close first-turn question skips the answer cache, retrieval and the LLM."""
+    from src.agents.faq_agent import run_faq_agent
+
+    mock_engine = MagicMock()
+    mock_engine.vectorstore.embeddings.aembed_query = AsyncMock(return_value=[1.0, 0.02])
+    mock_engine.aretrieve = AsyncMock()
+    answer_cache = MagicMock()
+    mock_llm = AsyncMock()
+    state = {"user_query": "qual a franquia de bagagem?", "messages": [], "sources": []}
+
+    result = await run_faq_agent(
+        state, mock_llm, mock_engine, mock_settings, answer_cache, _answers()
+    )
+
+    assert result == {"faq_response": "23 kg", "sources": SOURCES}
+    mock_llm.ainvoke.assert_not_called()
+    mock_engine.aretrieve.assert_not_called()
+    answer_cache.lookup.assert_not_called()
+
+
+@pytest.mark.asyncio
+async def test_precomputed_miss_without_answer_cache(mock_settings):
+    """Test a miss falls through to retrieval when the answer cache is disabled."""
+    from src.agents.faq_agent import run_faq_agent
+
+    mock_engine = MagicMock()
+    mock_engine.vectorstore.embeddings.aembed_query = AsyncMock(return_value=[0.7, 0.7])
+    mock_engine.aretrieve = AsyncMock(return_value=[Document(page_content="Pets na cabine.")])
+    mock_llm = AsyncMock()
+    mock_llm.ainvoke.return_value = MagicMock(content="Sim, até 10 kg.")
+    state = {"user_query": "posso levar meu gato?", "messages": [], "sources": []}
+
+    result = await run_faq_agent(state, mock_llm, mock_engine, mock_settings, None, _answers())
+
+    assert result["faq_response"] == "Sim, até 10 kg."
+    mock_engine.aretrieve.assert_awaited_once()
+
+
+@pytest.mark.asyncio
+async def test_build_answers_questions_over_snapshot(mock_settings, fake_embeddings):
+    """Test the stage answers deduplicated questions via the FAQ route, skipping failures."""
+    from langchain_community.vectorstores import FAISS
+
+    vectorstore = FAISS.from_documents([Document(page_content=c) for c in CHUNKS], fake_embeddings)
+    snapshot = IndexSnapshot.create(vectorstore, "v1", BM25Index.build(CHUNKS))
+    mock_settings.embedding_model = "fake"
+
+    async def ainvoke(messages, *args, **kwargs):
+        assert messages[0].content.startswith(FAQ_AGENT_SYSTEM.split("{")[0])
+        if messages[1].content == "Falha?":
+            raise RuntimeError("upstream error")
+        return MagicMock(content=f"Resposta: {messages[1].content}")
+
+    llm = MagicMock()
+    llm.model_copy.return_value = llm
+    llm.ainvoke = AsyncMock(side_effect=ainvoke)
+    questions = ["Qual a franquia?", "qual a franquia", "Falha?", "Como funciona o check-in?"]
+
+    answers = await build_precomputed_answers(mock_settings, snapshot, questions, llm)
+
+    questions = [e.question for e in answers.entries]
+    assert questions == ["Qual a franquia?", "Como funciona o check-in?"]
+    assert answers.entries[0].answer == "Resposta: Qual a franquia?"
+    assert answers.entries[0].sources[0]["type"] == "document"
+    ids = [vectorstore.index_to_docstore_id[row] for row in range(vectorstore.index.ntotal)]
+    assert answers.fingerprint == chunk_fingerprint(ids)
+    # Served back for the exact question: same embedding, cosine 1
+    vector = fake_embeddings.embed_query("Como funciona o check-in?")
+    assert answers.match(vector, 0.99).answer == "Resposta: Como funciona o check-in?"
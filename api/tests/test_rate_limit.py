@@ -0,0 +1,103 @@
+"""Tests for the shared sliding-window rate limiter."""
+
+from unittest.mock import AsyncMock
+
+import pytest
+
+from src.core.rate_limit import Quota, RateLimiter
+
+WINDOW_START = 6000.0  # a multiple of the 60 s window
+
+
+def _quotas(session="s1", ip_limit=20, session_limit=3):
+    return [Quota("ip", "10.0.0.1", ip_limit), Quota("session", session, session_limit)]
+
+
+@pytest.mark.asyncio
+async def test_session_quota_is_enforced_separately_from_ip():
+    """Test one session is capped while other sessions from the same IP go through."""
+    limiter = RateLimiter(window_seconds=60)
+
+    decisions = [await limiter.hit(_quotas(), now=WINDOW_START + i) for i in range(4)]
+    other = await limiter.hit(_quotas(session="s2"), now=WINDOW_START + 5)
+
+    assert [d.allowed for d in decisions] == [True, True, True, False]
+    assert decisions[-1].scope == "session"
+    assert decisions[-1].retry_after == 57
+    assert other.allowed
+
+
+@pytest.mark.asyncio
+async def test_rejected_request_is_not_counted():
+    """Test a request rejected by one quota does not consume the others."""
+    limiter = RateLimiter(window_seconds=60)
+    for i in range(3):
+        await limiter.hit(_quotas(ip_limit=4), now=WINDOW_START + i)
+    assert not (await limiter.hit(_quotas(ip_limit=4), now=WINDOW_START + 3)).allowed
+
+    # The IP has used 3 of 4; the rejected session request did not take the last one
+    assert (await limiter.hit(_quotas(session="s2", ip_limit=4), now=WINDOW_START + 4)).allowed
+
+
+@pytest.mark.asyncio
+async def test_previous_window_is_weighted_by_overlap():
+    """Test the window slides: requests from the previous window fade out linearly."""
+    limiter = RateLimiter(window_seconds=60)
+    for i in range(3):
+        await limiter.hit(_quotas(), now=WINDOW_START + 50 + i)
+
+    # 15 s into the next window, 3 * 0.75 = 2.25 still count: no room for another
+    assert not (await limiter.hit(_quotas(), now=WINDOW_START + 75)).allowed
+    # 45 s in, 3 * 0.25 = 0.75 count: one more fits
+    assert (await limiter.hit(_quotas(), now=WINDOW_START + 105)).allowed
+
+
+@pytest.mark.asyncio
+async def test_redis_script_checks_all_quotas_in_one_call():
+    """Test every quota goes to Redis in a single script call."""
+    limiter = RateLimiter(window_seconds=60, redis_url="redis://localhost:6379")
+    limiter._script = AsyncMock(return_value=2)
+
+    decision = await limiter.hit(_quotas(), now=WINDOW_START + 15)
+
+    limiter._script.assert_awaited_once()
+    kwargs = limiter._script.await_args.kwargs
+    assert kwargs["keys"] == [
+        "blis:ratelimit:ip:10.0.0.1:100",
+        "blis:ratelimit:ip:10.0.0.1:99",
+        "blis:ratelimit:session:s1:100",
+        "blis:ratelimit:session:s1:99",
+    ]
+    assert kwargs["args"] == [0.75, 120, 20, 3]
+    assert (decision.allowed, decision.scope) == (False, "session")
+    await limiter.aclose()
+
+
+@pytest.mark.asyncio
+async def test_falls_back_to_local_counters_when_redis_is_down():
+    """Test a Redis error switches to memory and Redis is not retried right away."""
+    limiter = RateLimiter(window_seconds=60, redis_url="redis://localhost:6379")
+    limiter._script = AsyncMock(side_effect=ConnectionError("refused"))
+
+    decisions = [await limiter.hit(_quotas(), now=WINDOW_START + i) for i in range(4)]
+
+    assert [d.allowed for d in decisions] == [True, True, True, False]
+    assert limiter._script.await_count == 1
+    await limiter.aclose()
+
+
+@pytest.mark.asyncio
+async def test_chat_endpoint_returns_429_with_retry_after(client):
+    """Test the chat endpoint rejects a session over quota with Retry-After."""
+    app = client._transport.app
+    app.state.rate_limiter = RateLimiter(window_seconds=60)
+    app.state.settings.rate_limit_ip_requests = 20
+    app.state.settings.rate_limit_session_requests = 2
+
+    payload = {"session_id": "limited", "message": "Qual o limite de bagagem?"}
+    statuses = [(await client.post("/api/v1/chat", json=payload)).status_code for _ in range(3)]
+    rejected = await client.post("/api/v1/chat", json=payload)
+
+    assert statuses == [200, 200, 429]
+    assert rejected.status_code == 429
+    assert int(rejected.headers["Retry-After"]) >= 1
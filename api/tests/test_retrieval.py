@@ -0,0 +1,126 @@
+"""Tests for BM25, vectorized MMR and the hybrid retrieval engine."""
+
+import numpy as np
+import pytest
+from langchain_core.documents import Document
+
+from src.rag.bm25 import BM25Index, tokenize
+from src.rag.retrieval import RetrievalEngine, mmr_select, reciprocal_rank_fusion
+
+CHUNKS = [
+    "Bagagem de mão: até 10 kg e 115 cm lineares em todas as companhias.",
+    "Bagagem despachada: franquia de 23kg na classe Econômica Plus.",
+    "Animais de estimação (PET) viajam na cabine em caixa de transporte.",
+    "Check-in online abre 48 horas antes do voo.",
+    "Reembolso em até 7 dias úteis para tarifas flexíveis.",
+]
+
+
+@pytest.fixture
+def store(fake_embeddings):
+    from langchain_community.vectorstores import FAISS
+
+    chunks = [Document(page_content=c) for c in CHUNKS]
+    vectorstore = FAISS.from_documents(chunks, fake_embeddings)
+    return vectorstore, BM25Index.build(CHUNKS), fake_embeddings
+
+
+def test_tokenize_splits_units_and_drops_stopwords():
+    """Test "23kg" also matches "23 kg" and accents/stopwords are normalized away."""
+    assert tokenize("Franquia de 23kg") == ["franquia", "23kg", "23", "kg"]
+    assert tokenize("Mão") == ["mao"]
+
+
+def test_bm25_ranks_exact_terms_first():
+    """Test a rare exact term outranks documents matching only common words."""
+    index = BM25Index.build(CHUNKS)
+    hits = index.search("Posso levar meu PET?", k=3)
+
+    assert hits[0].row == 2
+    assert index.search("xyz inexistente", k=3) == []
+
+
+def test_bm25_round_trips_to_disk(tmp_path):
+    """Test the persisted index scores identically after loading."""
+    index = BM25Index.build(CHUNKS)
+    index.save(str(tmp_path))
+    loaded = BM25Index.load(str(tmp_path))
+
+    query = "franquia 23 kg"
+    assert [(h.row, round(h.score, 5)) for h in loaded.search(query, k=5)] == [
+        (h.row, round(h.score, 5)) for h in index.search(query, k=5)
+    ]
+    assert BM25Index.load(str(tmp_path / "missing")) is None
+
+
+def test_rrf_rewards_agreement():
+    """Test ids ranked by both lists beat ids ranked high by only one."""
+    fused = reciprocal_rank_fusion([["a", "b", "c"], ["c", "b", "d"]], k=60)
+
+    assert set(fused[:2]) == {"b", "c"}
+    assert set(fused) == {"a", "b", "c", "d"}
+
+
+@pytest.mark.asyncio
+async def test_hybrid_surfaces_keyword_match(store, mock_settings):
+    """Test the exact-term chunk is retrieved even when dense ranking misses it."""
+    vectorstore, bm25, _ = store
+    mock_settings.retrieval_top_k = 2
+
+    engine = RetrievalEngine(vectorstore, bm25)
+    docs = await engine.aretrieve("franquia de 23kg", mock_settings)
+
+    assert CHUNKS[1] in [d.page_content for d in docs]
+    assert len(docs) == 2
+
+
+@pytest.mark.asyncio
+async def test_sparse_fast_path_skips_query_embedding(store, mock_settings):
+    """Test a full keyword match is answered without embedding the query."""
+    vectorstore, bm25, embeddings = store
+    mock_settings.retrieval_sparse_fast_path = True
+
+    engine = RetrievalEngine(vectorstore, bm25)
+    docs = await engine.aretrieve("PET na cabine", mock_settings)
+
+    assert docs[0].page_content == CHUNKS[2]
+    assert embeddings.queries == 0
+
+
+@pytest.mark.asyncio
+async def test_dense_only_without_bm25(store, mock_settings):
+    """Test retrieval is dense-only when the version has no BM25 index."""
+    vectorstore, _, embeddings = store
+
+    docs = await RetrievalEngine(vectorstore).aretrieve("bagagem", mock_settings)
+
+    assert len(docs) == mock_settings.retrieval_top_k
+    assert embeddings.queries == 1
+
+
+@pytest.mark.parametrize("lambda_mult", [0.0, 0.6, 1.0])
+def test_mmr_matches_langchain_selection(lambda_mult):
+    """Test the vectorized MMR picks the same candidates as LangChain's loop."""
+    from langchain_community.vectorstores.utils import maximal_marginal_relevance
+
+    rng = np.random.default_rng(7)
+    candidates = rng.normal(size=(60, 16)).astype(np.float32)
+    query = rng.normal(size=16).astype(np.float32)
+
+    expected = maximal_marginal_relevance(query, list(candidates), lambda_mult, k=8)
+
+    assert mmr_select(query, candidates, k=8, lambda_mult=lambda_mult) == expected
+
+
+@pytest.mark.asyncio
+async def test_per_request_overrides(store, mock_settings):
+    """Test ``k`` and ``lambda_mult`` can be overridden per call."""
+    vectorstore, _, _ = store
+    engine = RetrievalEngine(vectorstore)
+
+    docs = await engine.aretrieve("bagagem", mock_settings, k=3, lambda_mult=0.2)
+    expected = vectorstore.max_marginal_relevance_search(
+        "bagagem", k=3, fetch_k=15, lambda_mult=0.2
+    )
+
+    assert [d.page_content for d in docs] == [d.page_content for d in expected]
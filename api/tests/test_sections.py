@@ -0,0 +1,123 @@
+"""Tests for section-aware chunking and parent-section context expansion."""
+
+import os
+
+import pytest
+from langchain_core.documents import Document
+
+from src.rag.sections import (
+    PARENT_KEY,
+    ParentStore,
+    chunk_sections,
+    expand_to_parents,
+    split_sections,
+    write_parent_store,
+)
+from tests.test_ingest import PDF_PATH
+
+PAGES = [
+    Document(
+        page_content=(
+            "# 1. Políticas de Bagagem\n"
+            "## 1.1 Bagagem de Mão\n"
+            "A bagagem de mão é limitada a 10 kg e 115 cm.\n"
+            "## 1.2 Bagagem Despachada\n"
+            "A franquia depende da classe tarifária."
+        ),
+        metadata={"page_number": 2, "source": "manual.pdf"},
+    ),
+    Document(
+        page_content=(
+            "Na Executiva são 2 x 32 kg.\n"
+            "## 1.3 Excesso de Bagagem\n"
+            "O excesso é cobrado por quilo."
+        ),
+        metadata={"page_number": 3, "source": "manual.pdf"},
+    ),
+]
+
+
+def _child(text, parent_id=None):
+    metadata = {"page_number": 1, "section": "S"}
+    if parent_id:
+        metadata[PARENT_KEY] = parent_id
+    return Document(page_content=text, metadata=metadata)
+
+
+def test_sections_start_at_headings_and_span_pages():
+    sections = split_sections(PAGES)
+
+    # The chapter heading has no text of its own before 1.1
+    assert [s.heading for s in sections] == [
+        "1.1 Bagagem de Mão", "1.2 Bagagem Despachada", "1.3 Excesso de Bagagem"
+    ]
+    assert "Na Executiva são 2 x 32 kg." in sections[1].text()
+    assert [page for _, page in sections[1].pages] == [2, 3]
+
+
+def test_children_point_to_their_section():
+    """Test small children carry their heading, page and the id of a stored parent."""
+    children, parents = chunk_sections(PAGES, child_size=40, child_overlap=0)
+    store = ParentStore.build(parents)
+
+    assert len(store) == 3
+    despachada = [c for c in children if c.metadata["section"] == "1.2 Bagagem Despachada"]
+    assert len(despachada) > 1
+    assert all("1.2 Bagagem Despachada" in c.page_content for c in despachada)
+    assert despachada[-1].metadata["page_number"] == 3
+    parent = store.get(despachada[-1].metadata[PARENT_KEY])
+    assert parent.metadata["page_number"] == 2
+    assert "Na Executiva são 2 x 32 kg." in parent.page_content
+
+
+def test_expansion_dedupes_sections_within_budget():
+    """Test sibling children expand to one section and big sections fall back."""
+    store = ParentStore({"a": _child("seção A " * 20), "b": _child("seção B " * 200)})
+    docs = [_child("filho A1", "a"), _child("filho A2", "a"), _child("filho B1", "b")]
+
+    context = expand_to_parents(docs, store, budget_tokens=100)
+
+    # Section B (~400 tokens) does not fit next to A: its matched child is used instead
+    assert [d.page_content for d in context] == ["seção A " * 20, "filho B1"]
+    assert expand_to_parents(docs, store, budget_tokens=1000)[1].page_content == "seção B " * 200
+
+
+def test_parent_store_round_trips(tmp_path):
+    _, parents = chunk_sections(PAGES)
+    write_parent_store(parents, str(tmp_path))
+
+    loaded = ParentStore.load(str(tmp_path))
+    built = ParentStore.build(parents)
+    assert len(loaded) == len(built) == 3
+    assert ParentStore.load(str(tmp_path / "missing")) is None
+
+
+@pytest.mark.asyncio
+async def test_engine_returns_sections_for_child_hits(mock_settings, fake_embeddings):
+    from langchain_community.vectorstores import FAISS
+
+    from src.rag.bm25 import BM25Index
+    from src.rag.retrieval import RetrievalEngine
+
+    children, parents = chunk_sections(PAGES, child_size=40, child_overlap=0)
+    vectorstore = FAISS.from_documents(children, fake_embeddings)
+    bm25 = BM25Index.build([c.page_content for c in children])
+    engine = RetrievalEngine(vectorstore, bm25, ParentStore.build(parents))
+
+    docs = await engine.aretrieve("excesso cobrado por quilo", mock_settings)
+
+    assert PARENT_KEY not in docs[0].metadata
+    assert docs[0].metadata["section"] == "1.3 Excesso de Bagagem"
+    assert len({d.page_content for d in docs}) == len(docs)
+
+
+@pytest.mark.skipif(not os.path.exists(PDF_PATH), reason="sample PDF not available")
+def test_manual_headings_marked_and_tables_inline_once():
+    """Test extraction marks the manual's headings and keeps each table row once."""
+    from src.rag.ingest import extract_pages_with_tables
+
+    page = extract_pages_with_tables(PDF_PATH)[1]
+
+    assert "## 1.1 Bagagem de Mão" in page.page_content
+    assert page.page_content.count("LATAM") == 2  # one row in each of the two tables
+    assert page.page_content.index("| LATAM | 115 cm") < page.page_content.index("## 1.2")
@@ -0,0 +1,203 @@
+"""Tests for the structured table store and table-first FAQ answers."""
+
+import os
+from unittest.mock import AsyncMock, MagicMock
+
+import pytest
+
+from src.rag.tables import (
+    TABLES_FILE,
+    TableStore,
+    collect_table_rows,
+    rows_from_tables,
+    write_table_store,
+)
+from tests.test_ingest import PDF_PATH
+
+FRANCHISE = [
+    ["Companhia", "Econômica", "Executiva"],
+    ["LATAM", "1 x 23 kg", "2 x 32 kg"],
+    ["GOL", "1 x 23 kg", "2 x 32 kg"],
+    ["", "", ""],
+]
+CARRY_ON = [
+    ["Companhia", "Peso Máximo"],
+    ["LATAM", "10 kg"],
+    ["", "12 kg (Top)"],
+]
+
+# The manual's documentation table, cut by the break between pages 4 and 5
+DOCUMENTS_PAGE_4 = [
+    ["Destino", "Documento mínimo aceito", "Visto necessário", "Observações"],
+    ["Bolívia", "Passaporte", "Não (até 90 dias)", "RG não é aceito"],
+    ["Peru", "Passaporte", "Não (até 183 dias)", "RG não é aceito"],
+]
+DOCUMENTS_PAGE_5 = [
+    ["Colômbia", "Passaporte", "Não (até 180 dias)", "RG não é aceito"],
+    ["Venezuela", "Passaporte", "Não (até 90 dias)", "—"],
+    ["Equador", "Passaporte", "Não (até 90 dias)", "—"],
+]
+CONTENTS = [
+    ["Seção", "Conteúdo", "Pág."],
+    ["1", "Políticas de Bagagem", "2"],
+    ["2", "Documentação para Viagem", "6"],
+]
+
+
+def _page(number, *tables):
+    from langchain_core.documents import Document
+
+    from src.rag.ingest import TABLES_KEY
+
+    return Document(page_content="", metadata={"page_number": number, TABLES_KEY: list(tables)})
+
+
+@pytest.fixture
+def store(tmp_path):
+    rows = rows_from_tables([FRANCHISE], page=2, section="1. Políticas de Bagagem")
+    rows += rows_from_tables([CARRY_ON], page=3, section="1.2 Bagagem de Mão", first_table_no=1)
+    write_table_store(rows, str(tmp_path))
+    return TableStore.load(str(tmp_path))
+
+
+def test_rows_keep_header_and_fill_merged_key_cells():
+    rows = rows_from_tables([CARRY_ON], page=3, section="Bagagem de Mão")
+
+    assert [row.cells for row in rows] == [["LATAM", "10 kg"], ["LATAM", "12 kg (Top)"]]
+    assert rows[0].pairs() == [("Companhia", "LATAM"), ("Peso Máximo", "10 kg")]
+
+
+def test_table_continued_on_next_page_keeps_its_header(tmp_path):
+    """Test a table cut by a page break is one table, and the contents page is skipped."""
+    rows = collect_table_rows([
+        _page(1, CONTENTS), _page(4, DOCUMENTS_PAGE_4), _page(5, DOCUMENTS_PAGE_5, FRANCHISE)
+    ])
+
+    documents = [row for row in rows if row.header == DOCUMENTS_PAGE_4[0]]
+    assert [row.cells[0] for row in documents] == [
+        "Bolívia", "Peru", "Colômbia", "Venezuela", "Equador"
+    ]
+    assert {row.table_no for row in documents} == {1}
+    assert [row.page for row in documents] == [4, 4, 5, 5, 5]
+    assert not any(row.cells[0] in ("1", "2") for row in rows)
+
+    write_table_store(rows, str(tmp_path))
+    hit = TableStore.load(str(tmp_path)).lookup("Colômbia precisa de visto", min_coverage=0.6)
+    assert hit.row.pairs()[2] == ("Visto necessário", "Não (até 180 dias)")
+
+
+def test_new_table_on_next_page_is_not_a_continuation():
+    rows = collect_table_rows([_page(2, FRANCHISE), _page(3, CARRY_ON)])
+
+    assert rows[-1].header == ["Companhia", "Peso Máximo"]
+    assert len({row.table_no for row in rows}) == 2
+
+
+def test_rows_with_values_split_across_cells_are_not_intact():
+    header = ["Companhia", "Dimensão Máxima (C+L+A)", "Peso Máximo", "Itens Permitidos"]
+    split = ["Azul", "115 cm 10", "kg (Top/TudoAzul Gold: 14", "kg) 1 mala + 1 item pessoal"]
+    clean = ["LATAM", "115 cm", "10 kg", "1 mala + 1 item pessoal"]
+
+    assert not rows_from_tables([[header, split]], page=2, section="")[0].intact()
+    assert rows_from_tables([[header, clean]], page=2, section="")[0].intact()
+
+
+def test_lookup_returns_the_row_the_query_names(store):
+    """Test the row named by its key and covering the query terms is found."""
+    hit = store.lookup("franquia da executiva na LATAM", min_coverage=0.6)
+
+    assert (hit.row.page, hit.row.cells) == (2, ["LATAM", "1 x 23 kg", "2 x 32 kg"])
+    # "franquia" is in no table: two of the three terms
+    assert hit.coverage == pytest.approx(2 / 3)
+
+
+def test_lookup_misses_without_key_tie_or_coverage(store):
+    # No airline: header terms alone match every row
+    assert store.lookup("bagagem executiva", min_coverage=0.5) is None
+    # Both LATAM rows of the carry-on table match equally
+    assert store.lookup("peso máximo LATAM", min_coverage=0.5) is None
+    # LATAM named, but most of the question is not in any table
+    assert store.lookup("LATAM aceita pet cachorro grande", min_coverage=0.6) is None
+    assert store.lookup("LATAM", min_coverage=0.0) is None
+
+
+def test_missing_store_loads_as_none(tmp_path):
+    assert TableStore.load(str(tmp_path)) is None
+    assert not os.path.exists(tmp_path / TABLES_FILE)
+
+
+@pytest.mark.asyncio
+async def test_faq_agent_answers_from_table_row(store, mock_settings):
+    """Test a table hit skips retrieval and answers from the row with a tiny prompt."""
+    from src.agents.faq_agent import run_faq_agent
+
+    mock_engine = MagicMock()
+    mock_engine.aretrieve = AsyncMock()
+    mock_llm = AsyncMock()
+    mock_llm.ainvoke.return_value = MagicMock(content="Na Executiva da LATAM: 2 x 32 kg.")
+    state = {"user_query": "franquia da executiva na LATAM", "messages": [], "sources": []}
+
+    result = await run_faq_agent(state, mock_llm, mock_engine, mock_settings, tables=store)
+
+    assert result["faq_response"] == "Na Executiva da LATAM: 2 x 32 kg."
+    title = "Manual de Políticas - Página 2 (1. Políticas de Bagagem)"
+    assert result["sources"][0]["title"] == title
+    mock_engine.aretrieve.assert_not_called()
+    system = mock_llm.ainvoke.call_args.args[0][0].content
+    assert "| LATAM | 1 x 23 kg | 2 x 32 kg |" in system
+    assert "GOL" not in system
+
+
+@pytest.mark.asyncio
+async def test_table_answer_without_llm_uses_template(store, mock_settings):
+    from src.agents.faq_agent import run_faq_agent
+
+    mock_settings.table_lookup_use_llm = False
+    mock_llm = AsyncMock()
+    state = {"user_query": "franquia da executiva na LATAM", "messages": [], "sources": []}
+
+    result = await run_faq_agent(state, mock_llm, MagicMock(), mock_settings, tables=store)
+
+    assert result["faq_response"] == (
+        "Segundo o manual de políticas (1. Políticas de Bagagem, página 2): "
+        "Companhia: LATAM; Econômica: 1 x 23 kg; Executiva: 2 x 32 kg."
+    )
+    mock_llm.ainvoke.assert_not_called()
+
+
+@pytest.mark.asyncio
+async def test_template_falls_back_to_retrieval_for_split_row(tmp_path, mock_settings):
+    """Test a garbled row is not templated: the question goes through retrieval."""
+    from langchain_core.documents import Document
+
+    from src.agents.faq_agent import run_faq_agent
+
+    split = [["Companhia", "Peso Máximo"], ["Azul", "10 kg (Top: 14"], ["GOL", "10 kg"]]
+    write_table_store(rows_from_tables([split], page=2, section=""), str(tmp_path))
+    store = TableStore.load(str(tmp_path))
+    mock_settings.table_lookup_use_llm = False
+    mock_engine = MagicMock()
+    mock_engine.aretrieve = AsyncMock(return_value=[Document(page_content="Azul: 10 kg")])
+    mock_llm = AsyncMock()
+    mock_llm.ainvoke.return_value = MagicMock(content="10 kg na Azul.")
+    state = {"user_query": "peso máximo Azul", "messages": [], "sources": []}
+
+    result = await run_faq_agent(state, mock_llm, mock_engine, mock_settings, tables=store)
+
+    assert result["faq_response"] == "10 kg na Azul."
+    mock_engine.aretrieve.assert_called_once()
+
+
+@pytest.mark.skipif(not os.path.exists(PDF_PATH), reason="sample PDF not available")
+def test_manual_tables_are_kept_whole_and_off_chunks():
+    """Test ingestion keeps the manual's tables as rows and chunks don't carry them."""
+    from src.rag.ingest import TABLES_KEY, chunk_documents, extract_pages_with_tables
+
+    documents = extract_pages_with_tables(PDF_PATH)
+    rows = collect_table_rows(documents)
+
+    assert any(row.cells[0] == "LATAM" and "2 x 32 kg" in row.cells for row in rows)
+    colombia = next(row for row in rows if row.cells[0] == "Colômbia")
+    assert colombia.header[0] == "Destino"
+    assert not any(row.header[0] == "Seção" for row in rows)
+    assert all(TABLES_KEY not in chunk.metadata for chunk in chunk_documents(documents))
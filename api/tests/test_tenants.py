@@ -0,0 +1,230 @@
+"""Tests for per-tenant indexes: lazy loading, LRU eviction and request routing."""
+
+import copy
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import pytest
+from langchain_core.documents import Document
+
+from src.rag.tenants import (
+    TenantRegistry,
+    UnknownTenantError,
+    current_tenant,
+    index_size,
+    tenant_settings,
+)
+
+
+@pytest.fixture
+def tenants(tmp_path, mock_settings, fake_embeddings):
+    """Settings whose tenants live under tmp_path, and a writer for tenant indexes."""
+    from langchain_community.vectorstores import FAISS
+
+    from src.rag.vectorstore import save_vectorstore
+
+    mock_settings.tenants_path = str(tmp_path)
+
+    def model_copy(update):
+        clone = copy.copy(mock_settings)
+        for name, value in update.items():
+            setattr(clone, name, value)
+        return clone
+
+    mock_settings.model_copy.side_effect = model_copy
+
+    def write(tenant_id, *texts):
+        store = FAISS.from_documents([Document(page_content=t) for t in texts], fake_embeddings)
+        path = tenant_settings(mock_settings, tenant_id).vectorstore_path
+        save_vectorstore(store, path, "fake-model")
+        return store
+
+    with patch("src.rag.embeddings.get_embeddings", return_value=fake_embeddings):
+        yield write
+
+
+@pytest.mark.asyncio
+async def test_tenant_index_loads_once_on_first_use(tenants, mock_settings):
+    """Test a tenant's index is loaded on its first request and then kept resident."""
+    tenants("agencia-a", "Franquia de 23 kg na agência A.")
+    registry = TenantRegistry(mock_settings)
+
+    assert registry.resident == []
+    first = await registry.get("agencia-a")
+    again = await registry.get("agencia-a")
+
+    assert first is again
+    assert first.holder.vectorstore.index.ntotal == 1
+    assert first.settings.vectorstore_path.endswith("agencia-a/vectorstore")
+    assert registry.resident == ["agencia-a"]
+    assert await registry.get(None) is None
+    assert await registry.get("default") is None
+
+
+@pytest.mark.asyncio
+async def test_unknown_or_invalid_tenant_is_rejected(tenants, mock_settings):
+    registry = TenantRegistry(mock_settings)
+
+    with pytest.raises(UnknownTenantError):
+        await registry.get("sem-indice")
+    with pytest.raises(UnknownTenantError):
+        await registry.get("../vectorstore")
+
+
+@pytest.mark.asyncio
+async def test_least_recently_used_tenant_is_evicted(tenants, mock_settings):
+    """Test the resident set stays within the budget, evicting the coldest tenant."""
+    for tenant_id in ("a", "b", "c"):
+        tenants(tenant_id, f"Manual da agência {tenant_id}.")
+    registry = TenantRegistry(mock_settings)
+    a = await registry.get("a")
+    # Room for two tenants of this size
+    registry.budget_bytes = 2 * a.size
+
+    await registry.get("b")
+    await registry.get("a")  # "b" is now the least recently used
+    await registry.get("c")
+
+    assert registry.resident == ["a", "c"]
+    assert registry.resident_bytes <= registry.budget_bytes
+    reloaded = await registry.get("b")
+    assert reloaded.holder.vectorstore.index.ntotal == 1
+    assert registry.resident == ["c", "b"]
+
+
+@pytest.mark.asyncio
+async def test_redis_answer_caches_share_one_client(tenants, mock_settings):
+    """Test reloading evicted tenants reuses one Redis pool and counts the cache."""
+    from src.rag.answer_cache import answer_cache_bytes
+
+    mock_settings.answer_cache_backend = "redis"
+    for tenant_id in ("a", "b"):
+        tenants(tenant_id, f"Manual da agência {tenant_id}.")
+    registry = TenantRegistry(mock_settings)
+
+    a = await registry.get("a")
+    registry.budget_bytes = a.size  # room for one tenant
+    b = await registry.get("b")
+    reloaded = await registry.get("a")
+
+    assert registry.resident == ["a"]
+    assert a.answer_cache._redis is b.answer_cache._redis is reloaded.answer_cache._redis
+    assert (a.answer_cache.prefix, b.answer_cache.prefix) == (
+        "blis:answer_cache:a", "blis:answer_cache:b"
+    )
+    assert a.size == index_size(a.holder.current) + answer_cache_bytes(a.settings, 16)
+    await registry.aclose()
+
+
+@pytest.mark.asyncio
+async def test_chat_runs_graph_on_tenant_index(client, mock_graph):
+    """Test the request's tenant is bound for the graph run and scopes the session."""
+    app = client._transport.app
+    tenant = MagicMock()
+    seen = {}
+
+    async def ainvoke(state, config, **kwargs):
+        seen["tenant"] = current_tenant()
+        seen["thread_id"] = config["configurable"]["thread_id"]
+        return {"route": "FAQ", "final_response": "ok", "sources": []}
+
+    mock_graph.ainvoke.side_effect = ainvoke
+    registry = MagicMock()
+
+    async def get(tenant_id):
+        if tenant_id == "agencia-a":
+            return tenant
+        raise UnknownTenantError(tenant_id)
+
+    registry.get = get
+    app.state.tenant_registry = registry
+
+    payload = {"session_id": "s1", "message": "Franquia?", "tenant_id": "agencia-a"}
+    response = await client.post("/api/v1/chat", json=payload)
+    assert response.status_code == 200
+    assert seen == {"tenant": tenant, "thread_id": "agencia-a:s1"}
+
+    payload["tenant_id"] = "agencia-b"
+    assert (await client.post("/api/v1/chat", json=payload)).status_code == 404
+    payload["tenant_id"] = "../etc"
+    assert (await client.post("/api/v1/chat", json=payload)).status_code == 422
+
+
+@pytest.mark.asyncio
+async def test_batch_answers_from_tenant_index(client, mock_settings):
+    """Test a batch's tenant is bound while answering and picks the tenant's engine."""
+    from src.agents.batch import BatchAnswerer
+    from src.rag.index_holder import VectorStoreHolder
+    from src.rag.tenants import TenantIndex
+    from src.state.graph_state import AgentRoute
+
+    app = client._transport.app
+    app.state.settings.admin_token.get_secret_value.return_value = "s3cret"
+    app.state.settings.batch_max_items = 10
+    tenant_holder = VectorStoreHolder()
+    tenant_holder.attach(MagicMock(), "a1")
+    tenant = TenantIndex("agencia-a", mock_settings, tenant_holder, answer_cache=None)
+    registry = MagicMock()
+
+    async def get(tenant_id):
+        if tenant_id == "agencia-a":
+            return tenant
+        raise UnknownTenantError(tenant_id)
+
+    registry.get = get
+    app.state.tenant_registry = registry
+    answerer = BatchAnswerer(mock_settings, VectorStoreHolder(), llm=MagicMock())
+    routes = []
+
+    async def answer(semaphore, item):
+        routes.append(item.route)
+        return {"id": item.question.id, "response": "ok", "agent_used": "faq", "sources": []}
+
+    answerer._answer = answer
+    tenant_holder.current.engine.aretrieve_batch = AsyncMock(return_value=[[]])
+    app.state.batch_answerer = answerer
+    headers = {"X-Admin-Token": "s3cret"}
+    payload = {"items": [{"message": "Qual a franquia de bagagem?"}], "tenant_id": "agencia-a"}
+
+    response = await client.post("/api/v1/chat/batch", json=payload, headers=headers)
+
+    assert response.status_code == 200
+    # The default holder is empty: without the tenant the question would go to search
+    assert routes == [AgentRoute.FAQ]
+    tenant_holder.current.engine.aretrieve_batch.assert_awaited_once()
+
+    payload["tenant_id"] = "agencia-b"
+    response = await client.post("/api/v1/chat/batch", json=payload, headers=headers)
+    assert response.status_code == 404
+
+
+@pytest.mark.asyncio
+async def test_graph_reads_the_bound_tenant_index(mock_settings):
+    """Test a run bound to a tenant uses its index while the default one is empty."""
+    import asyncio
+
+    from src.rag.index_holder import VectorStoreHolder
+    from src.rag.tenants import TenantIndex, bind_tenant
+    from tests.test_orchestrator import _build_graph, _fake_llm, _initial_state
+
+    engines = []
+
+    async def fake_faq(state, llm, engine, *args):
+        engines.append(engine)
+        return {"faq_response": "Franquia da agência A.", "sources": []}
+
+    tenant_holder = VectorStoreHolder()
+    tenant_holder.attach(MagicMock(), "a1")
+    tenant = TenantIndex("agencia-a", mock_settings, tenant_holder, answer_cache=None)
+    graph = _build_graph(mock_settings, _fake_llm("FAQ"), vectorstore=VectorStoreHolder())
+
+    async def run():
+        bind_tenant(tenant)
+        return await graph.ainvoke(_initial_state("Qual a franquia de bagagem?"))
+
+    with patch("src.agents.faq_agent.run_faq_agent", side_effect=fake_faq):
+        result = await asyncio.create_task(run())
+
+    assert result["route"] == "FAQ"
+    assert engines == [tenant_holder.current.engine]
+    # The binding stays with the request's task
+    assert current_tenant() is None
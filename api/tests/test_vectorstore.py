@@ -0,0 +1,58 @@
+"""Tests for pickle-free vectorstore persistence and memory-mapped loading."""
+
+import os
+from unittest.mock import patch
+
+import pytest
+from langchain_core.documents import Document
+
+
+def _build(tmp_path, mock_settings, fake_embeddings):
+    from langchain_community.vectorstores import FAISS
+
+    from src.rag.vectorstore import save_vectorstore
+
+    docs = [
+        Document(page_content=f"Política {i}", metadata={"page_number": i, "section": f"S{i}"})
+        for i in range(1, 6)
+    ]
+    store = FAISS.from_documents(docs, fake_embeddings)
+    mock_settings.vectorstore_path = str(tmp_path)
+    save_vectorstore(store, str(tmp_path), "fake-model")
+    return store
+
+
+def test_save_writes_no_pickle(tmp_path, mock_settings, fake_embeddings):
+    """Test the persisted format is the FAISS file plus JSON sidecars."""
+    _build(tmp_path, mock_settings, fake_embeddings)
+
+    assert sorted(os.listdir(tmp_path)) == ["bm25.json", "chunks.json", "index.faiss"]
+
+
+def test_round_trip_preserves_documents_and_order(tmp_path, mock_settings, fake_embeddings):
+    """Test a loaded store returns the same chunks for the same vector."""
+    from src.rag.vectorstore import load_vectorstore
+
+    original = _build(tmp_path, mock_settings, fake_embeddings)
+    with patch("src.rag.embeddings.get_embeddings", return_value=fake_embeddings):
+        loaded = load_vectorstore(mock_settings)
+
+    vector = fake_embeddings.embed_query("Política 3")
+    expected = original.similarity_search_by_vector(vector, k=3)
+    actual = loaded.similarity_search_by_vector(vector, k=3)
+
+    assert [d.page_content for d in actual] == [d.page_content for d in expected]
+    assert actual[0].metadata == expected[0].metadata
+    assert loaded.index.ntotal == 5
+
+
+def test_legacy_pickle_format_is_not_loaded(tmp_path, mock_settings):
+    """Test an index with only the pickled docstore asks for re-ingestion."""
+    from src.rag.vectorstore import load_vectorstore
+
+    (tmp_path / "index.faiss").write_bytes(b"")
+    (tmp_path / "index.pkl").write_bytes(b"")
+    mock_settings.vectorstore_path = str(tmp_path)
+
+    with pytest.raises(FileNotFoundError, match="legacy"):
+        load_vectorstore(mock_settings)
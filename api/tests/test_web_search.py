@@ -0,0 +1,82 @@
+"""Tests for the cached, coalescing web search client."""
+
+import asyncio
+import time
+
+import pytest
+
+from src.tools.web_search import CachedSearchClient, StubSearchBackend
+
+
+@pytest.mark.asyncio
+async def test_repeated_query_served_from_cache():
+    """Test normalized-identical queries hit the backend once."""
+    backend = StubSearchBackend()
+    client = CachedSearchClient(backend, max_results=3)
+
+    first = await client.search("Promoção LATAM Orlando")
+    second = await client.search("  promocao latam   ORLANDO ")
+
+    assert first == second
+    assert len(first) == 3
+    assert backend.calls == 1
+    assert client.hits == 1
+
+
+@pytest.mark.asyncio
+async def test_concurrent_identical_queries_coalesce():
+    """Test N concurrent identical queries share one outbound request."""
+    backend = StubSearchBackend(latency=0.05)
+    client = CachedSearchClient(backend)
+
+    results = await asyncio.gather(*(client.search("voos para Lisboa") for _ in range(10)))
+
+    assert backend.calls == 1
+    assert client.coalesced == 9
+    assert all(r == results[0] for r in results)
+
+
+@pytest.mark.asyncio
+async def test_ttl_expiry(monkeypatch):
+    """Test results older than the TTL are fetched again."""
+    backend = StubSearchBackend()
+    client = CachedSearchClient(backend, ttl_seconds=60)
+    await client.search("hotel em Paris")
+
+    now = time.monotonic()
+    monkeypatch.setattr(time, "monotonic", lambda: now + 61)
+    await client.search("hotel em Paris")
+
+    assert backend.calls == 2
+
+
+@pytest.mark.asyncio
+async def test_failures_are_not_cached():
+    """Test a backend error propagates and the next call retries."""
+
+    class FlakyBackend(StubSearchBackend):
+        failures = 1
+
+        async def search(self, query, max_results):
+            if self.failures:
+                self.failures -= 1
+                raise RuntimeError("API unavailable")
+            return await super().search(query, max_results)
+
+    backend = FlakyBackend()
+    client = CachedSearchClient(backend)
+
+    with pytest.raises(RuntimeError):
+        await client.search("passagem Rio-Miami")
+    assert await client.search("passagem Rio-Miami")
+    assert backend.calls == 1
+
+
+@pytest.mark.asyncio
+async def test_cached_results_are_copies():
+    """Test callers cannot mutate the cached results."""
+    client = CachedSearchClient(StubSearchBackend())
+    results = await client.search("seguro viagem")
+    results[0]["title"] = "alterado"
+
+    assert (await client.search("seguro viagem"))[0]["title"] != "alterado"